@@ -0,0 +1 @@
+# Benchmark scripts – run with ``python -m bench.<name>`` from the project root.
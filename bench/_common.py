@@ -0,0 +1,81 @@
+# =============================================================
+# Filename: bench/_common.py
+# =============================================================
+"""Helpers shared by the benchmark scripts (headless server side)."""
+from __future__ import annotations
+import contextlib, io, pathlib, time
+from typing import Iterator
+
+import server.bootstrap as bootstrap          # sys.path + graphics stubs
+
+
+class NullSocket:
+    """Stand-in for a WebSocket that swallows every frame it is sent."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes  = 0
+
+    async def send(self, data) -> None:
+        self.frames += 1
+        self.bytes  += len(data)
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """Silence the engine's debug prints while measuring."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def add_asset_args(parser) -> None:
+    parser.add_argument("--pieces", type=pathlib.Path, default=bootstrap.graphics_root,
+                        help="piece templates folder (default: %(default)s)")
+    parser.add_argument("--board", type=pathlib.Path, default=bootstrap.csv_path,
+                        help="board layout CSV (default: %(default)s)")
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:7.1f} {unit}"
+        n /= 1024
+    return f"{n:7.1f} TiB"
+
+
+class Stopwatch:
+    """Wall + CPU time of a ``with`` block."""
+
+    def __enter__(self) -> "Stopwatch":
+        self.wall0, self.cpu0 = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.wall = time.perf_counter() - self.wall0
+        self.cpu  = time.process_time() - self.cpu0
+
+
+# ───────────── scripted play ──────────────────────────────────
+def random_command(game, rng, now_ms: int):
+    """A plausible Move for a random idle piece (the engine may still refuse it)."""
+    from core.engine.Command import Command
+
+    idle = [p for p in game.pieces
+            if not p.is_captured and p.current_state.state_name == "idle"]
+    rng.shuffle(idle)
+    for piece in idle:
+        src   = piece.get_cell()
+        color = "WHITE" if piece.piece_id[1] == "W" else "BLACK"
+        dests = [d for d in piece.moves.get_moves(*src) if not piece._is_ally_on_cell(d, game)]
+        if dests:
+            return piece, Command.create_move_command(piece.piece_id, src, rng.choice(dests),
+                                                      now_ms, color)
+    return None, None
+
+
+def step(game, now_ms: int) -> None:
+    """One server tick: physics, collisions, win check."""
+    for p in game.pieces:
+        p.update(now_ms)
+    game._resolve_collisions()
+    game._is_win()
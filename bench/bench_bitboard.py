@@ -0,0 +1,80 @@
+# =============================================================
+# Filename: bench/bench_bitboard.py
+# =============================================================
+"""Positions per second for full move generation: scan vs. index vs. bitboards.
+
+"Move generation" here is every Move target of every live piece that
+``Piece.on_command`` would accept (in the move table, path clear, no ally
+on the target).  It runs three ways on the same mid-game positions:
+
+* ``scan``     – ``game.occupancy = None``: the original list scans
+* ``index``    – the cell index without bitboards (``geometry = None``)
+* ``bitboard`` – :meth:`Occupancy.reachable`, one mask per piece
+
+    python -m bench.bench_bitboard --sizes 8 16 32
+"""
+from __future__ import annotations
+import argparse, random, timeit
+
+from bench._common import add_asset_args, quiet
+from bench.bench_occupancy import _play, build_board
+
+
+def _per_dest(game):
+    live = [p for p in game.pieces if not p.is_captured]
+    return sum(1 for p in live for d in p.moves.get_moves(*p.get_cell())
+               if not p._is_path_blocked(p.get_cell(), d, game)
+               and not p._is_ally_on_cell(d, game))
+
+
+def _bitboard(game):
+    occ  = game.occupancy
+    live = [p for p in game.pieces if not p.is_captured]
+    return sum(occ.reachable(p, p.get_cell()).bit_count() for p in live)
+
+
+def _measure(n: int, args) -> dict:
+    with quiet():
+        game = build_board(n, args.pieces)
+        game.start()
+        _play(game, random.Random(args.seed), args.warmup, game.game_start_ms)
+    occ, geo = game.occupancy, game.occupancy.geometry
+    out = {}
+
+    def run(mode, fn):
+        out[mode + "_moves"] = fn(game)
+        best = min(timeit.repeat(lambda: fn(game), number=args.calls, repeat=args.repeat))
+        out[mode] = args.calls / best
+
+    game.occupancy = None
+    run("scan", _per_dest)
+    game.occupancy, occ.geometry = occ, None
+    run("index", _per_dest)
+    occ.geometry = geo
+    occ.set_colors(game.pieces, game._color_by_team)       # refill the bitboards
+    run("bitboard", _bitboard)
+    assert out["scan_moves"] == out["index_moves"] == out["bitboard_moves"]
+    out["pieces"] = sum(not p.is_captured for p in game.pieces)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--warmup", type=int, default=600, help="random-play steps first")
+    ap.add_argument("--calls", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{'board':>6} {'live':>5} {'moves':>6} {'scan pos/s':>11} {'index pos/s':>12} "
+          f"{'bitboard pos/s':>15} {'vs scan':>8}")
+    for n in args.sizes:
+        r = _measure(n, args)
+        print(f"{n:>3}x{n:<2} {r['pieces']:>5} {r['bitboard_moves']:>6} {r['scan']:>11.0f} "
+              f"{r['index']:>12.0f} {r['bitboard']:>15.0f} {r['bitboard'] / r['scan']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
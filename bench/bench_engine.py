@@ -0,0 +1,190 @@
+# =============================================================
+# Filename: bench/bench_engine.py
+# =============================================================
+"""Headless simulation harness – the yardstick for engine performance work.
+
+Builds ``--games`` games from the board CSV through ``PieceFactory`` (graphics
+stubbed), drives them with random legal Moves or a scripted command stream
+through ``Piece.on_command`` and steps them on a *simulated* clock – no
+sleeping, so the numbers are pure engine cost.  Every tick is split into
+phases, each timed separately:
+
+* ``update``      – ``Piece.update`` for every piece
+* ``collisions``  – ``Game._resolve_collisions``
+* ``win``         – ``Game._is_win``
+* ``encode``      – snapshot delta + binary frame, every ``--encode-every`` ticks
+
+A second, shorter pass runs under ``tracemalloc`` for allocations per tick.
+
+    python -m bench.bench_engine --games 1 10 100 --ticks 3000
+    python -m bench.bench_engine --script moves.jsonl   # {"t": ms, "piece_id", "type", "params"}
+"""
+from __future__ import annotations
+import argparse, functools, json, pathlib, random, sys, time, tracemalloc
+from typing import Dict, List, Optional
+
+from bench._common import add_asset_args, quiet, random_command
+from core.engine.Command import Command
+from protocol import SnapshotEncoder, binary_codec_for, encode_frame
+from rooms import build_game
+
+PHASES = ("update", "collisions", "win", "encode")
+
+
+class SimClock:
+    """Game time that only moves when the harness says so."""
+
+    def __init__(self, start_ms: int = 0) -> None:
+        self.now = start_ms
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, ms: int) -> None:
+        self.now += ms
+
+
+def load_script(path: pathlib.Path) -> List[dict]:
+    """One JSON command per line; ``t`` is ms after the start of the run."""
+    with path.open(encoding="utf-8") as fh:
+        cmds = [json.loads(line) for line in fh if line.strip()]
+    return sorted(cmds, key=lambda c: c["t"])
+
+
+class Simulation:
+    """*n* games stepped in lock-step on one simulated clock."""
+
+    def __init__(self, n_games: int, factory, *, tick_hz: float = 60.0, seed: int = 1,
+                 moves_per_sec: float = 2.0, script: Optional[List[dict]] = None,
+                 encode_every: int = 1) -> None:
+        self.dt_ms        = int(round(1000 / tick_hz))
+        self.rng          = random.Random(seed)
+        self.move_p       = moves_per_sec * self.dt_ms / 1000.0   # per game per tick
+        self.script       = script
+        self.encode_every = max(1, encode_every)
+        self.clock        = SimClock()
+        self.phase_ns: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.ticks = self.commands = self.accepted = self.frames = self.frame_bytes = 0
+
+        with quiet():
+            self.games = [factory() for _ in range(n_games)]
+            for g in self.games:
+                g.game_time_ms = self.clock             # every engine read of "now" is simulated
+                g.start()
+        self.t0        = self.clock.now
+        self.encoders  = [SnapshotEncoder() for _ in self.games]
+        self.codecs    = [binary_codec_for(g) for g in self.games]
+        self._next_cmd = 0
+
+    # ------------------------------------------------ input
+    def _feed(self, game, now: int) -> None:
+        if self.script is not None:
+            return
+        if self.rng.random() < self.move_p:
+            piece, cmd = random_command(game, self.rng, now)
+            if piece:
+                self.commands += 1
+                self.accepted += bool(piece.on_command(cmd, now, game))
+
+    def _feed_script(self, now: int) -> None:
+        script = self.script
+        while self._next_cmd < len(script) and script[self._next_cmd]["t"] <= now - self.t0:
+            c = script[self._next_cmd]
+            self._next_cmd += 1
+            for game in self.games:
+                piece = next((p for p in game.pieces if p.piece_id == c["piece_id"]), None)
+                if piece is None:
+                    continue
+                params = [tuple(x) if isinstance(x, list) else x for x in c.get("params", [])]
+                cmd = Command(now, c["piece_id"], c["type"], params, c.get("player_id"))
+                self.commands += 1
+                self.accepted += bool(piece.on_command(cmd, now, game))
+
+    # ------------------------------------------------ one tick of every game
+    def tick(self) -> None:
+        self.clock.advance(self.dt_ms)
+        now, ns, clk = self.clock.now, self.phase_ns, time.perf_counter_ns
+        if self.script is not None:
+            self._feed_script(now)
+        encode = self.ticks % self.encode_every == 0
+        for i, game in enumerate(self.games):
+            self._feed(game, now)
+            t0 = clk()
+            for p in game.pieces:
+                p.update(now)
+            t1 = clk()
+            game._resolve_collisions()
+            t2 = clk()
+            game._is_win()
+            t3 = clk()
+            ns["update"] += t1 - t0; ns["collisions"] += t2 - t1; ns["win"] += t3 - t2
+            if encode:
+                payload = self.encoders[i].next_frame(game)
+                if payload is not None:
+                    frame = encode_frame("state", payload, self.codecs[i])
+                    self.frames += 1
+                    self.frame_bytes += len(frame)
+                ns["encode"] += clk() - t3
+        self.ticks += 1
+
+    def run(self, ticks: int) -> float:
+        """Step *ticks* times; returns the wall time in seconds."""
+        start = time.perf_counter()
+        with quiet():
+            for _ in range(ticks):
+                self.tick()
+        return time.perf_counter() - start
+
+
+def _alloc_per_tick(sim: Simulation, ticks: int) -> Dict[str, float]:
+    """Peak transient bytes, retained bytes and net memory blocks per tick."""
+    peak = kept = 0
+    blocks0 = sys.getallocatedblocks()
+    tracemalloc.start()
+    with quiet():
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            sim.tick()
+            cur, top = tracemalloc.get_traced_memory()
+            peak += top - before
+            kept += cur - before
+    tracemalloc.stop()
+    return {"peak_b": peak / ticks, "kept_b": kept / ticks,
+            "blocks": (sys.getallocatedblocks() - blocks0) / ticks}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--games", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--ticks", type=int, default=3000, help="simulated ticks per run")
+    ap.add_argument("--alloc-ticks", type=int, default=200, help="ticks under tracemalloc")
+    ap.add_argument("--hz", type=float, default=60.0)
+    ap.add_argument("--moves-per-sec", type=float, default=2.0, help="random Moves per game")
+    ap.add_argument("--encode-every", type=int, default=1, help="ticks per snapshot")
+    ap.add_argument("--script", type=pathlib.Path, help="JSONL command stream instead of random play")
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    script  = load_script(args.script) if args.script else None
+    factory = functools.partial(build_game, args.board, args.pieces)
+    print(f"{'games':>6} {'ticks/s':>9} {'game-ticks/s':>13} "
+          + " ".join(f"{p + ' µs':>14}" for p in PHASES)
+          + f" {'cmds ok':>9} {'B/frame':>8} {'alloc B/tick':>13} {'kept B/tick':>12}")
+    for n in args.games:
+        sim  = Simulation(n, factory, tick_hz=args.hz, seed=args.seed, script=script,
+                          moves_per_sec=args.moves_per_sec, encode_every=args.encode_every)
+        wall = sim.run(args.ticks)
+        per_game_tick = sim.ticks * n
+        phases = " ".join(f"{sim.phase_ns[p] / 1000 / per_game_tick:>14.1f}" for p in PHASES)
+        rate   = sim.ticks / wall
+        alloc  = _alloc_per_tick(sim, args.alloc_ticks)        # after the timed run
+        print(f"{n:>6} {rate:>9.0f} {rate * n:>13.0f} {phases} "
+              f"{sim.accepted:>4}/{sim.commands:<4} {sim.frame_bytes / max(1, sim.frames):>8.0f} "
+              f"{alloc['peak_b'] / n:>13.0f} {alloc['kept_b'] / n:>12.0f}")
+    print("phase columns: µs per game per tick; alloc columns: bytes per game per tick")
+
+
+if __name__ == "__main__":
+    main()
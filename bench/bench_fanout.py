@@ -0,0 +1,98 @@
+# =============================================================
+# Filename: bench/bench_fanout.py
+# =============================================================
+"""Frame fan-out with some clients on a bad link: ``gather`` vs. outboxes.
+
+One room broadcasts ``--frames`` state deltas at ``--hz`` to ``--clients``
+sockets, ``--slow`` of which take ``--slow-ms`` per send.  ``gather`` is the
+old fan-out (await every ``ws.send`` of a frame together); ``outbox`` is
+the current one (:class:`outbox.Outbox` per socket, each on its own
+adaptive rate).  Reported: how long the room is held up per broadcast, the
+latency of the *fast* clients – measured from each frame's scheduled time,
+so a broadcaster that falls behind shows up – and the frame rate the slow
+clients end up on.
+
+    python -m bench.bench_fanout --clients 50 --slow 0 2 5
+"""
+from __future__ import annotations
+import argparse, asyncio, json, statistics, time
+
+import bench._common                                     # noqa: F401 – sys.path
+from outbox import Outbox, RateController
+
+
+class TimedSocket:
+    """Records how long each frame took from its scheduled time to delivery."""
+
+    def __init__(self, delay_s: float) -> None:
+        self.delay_s = delay_s
+        self.lat_ms: list[float] = []
+
+    async def send(self, frame: str) -> None:
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        self.lat_ms.append(1000 * (time.perf_counter() - json.loads(frame)["ts"]))
+
+
+def _delta(seq: int, ts: float) -> dict:
+    return {"seq": seq, "key": False, "ts": ts,
+            "pieces": [{"id": "PW_6_0", "cell": [6, 0], "pixel": [32, seq % 400],
+                        "state": "move", "captured": False}]}
+
+
+async def _run(mode: str, args, n_slow: int) -> dict:
+    sockets = [TimedSocket(args.slow_ms / 1000 if i < n_slow else 0.0)
+               for i in range(args.clients)]
+    boxes = [Outbox(ws, lambda state, events: json.dumps(state),
+                    lambda: {"seq": 0, "key": True, "board": {}, "pieces": [], "ts": time.perf_counter()},
+                    rate=RateController(args.min_hz, args.hz))
+             for ws in sockets]
+    if mode == "outbox":
+        for b in boxes:
+            b.start()
+
+    hold_ms, start = [], time.perf_counter()
+    for i in range(args.frames):
+        due = start + i / args.hz                        # the snapshot clock's deadline
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        payload = _delta(i + 1, due)
+        t0 = time.perf_counter()
+        frame = json.dumps(payload)
+        if mode == "gather":
+            await asyncio.gather(*(ws.send(frame) for ws in sockets))
+        else:
+            for b in boxes:
+                b.post_state(payload, frame)
+        hold_ms.append(1000 * (time.perf_counter() - t0))
+    wall = time.perf_counter() - start
+
+    for b in boxes:
+        await b.stop()
+    fast = [x for ws in sockets[n_slow:] for x in ws.lat_ms]
+    return {"hold": statistics.mean(hold_ms),
+            "p50": statistics.median(fast) if fast else 0.0,
+            "p99": sorted(fast)[int(0.99 * (len(fast) - 1))] if fast else 0.0,
+            "slow_hz": sum(len(ws.lat_ms) for ws in sockets[:n_slow]) / max(1, n_slow) / wall}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clients", type=int, default=50)
+    ap.add_argument("--slow", type=int, nargs="+", default=[0, 2, 5])
+    ap.add_argument("--slow-ms", type=float, default=100.0, help="send time of a slow client")
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--hz", type=float, default=20.0, help="room snapshot rate (max per client)")
+    ap.add_argument("--min-hz", type=float, default=5.0, help="lowest adaptive rate")
+    args = ap.parse_args()
+
+    print(f"{'mode':>7} {'slow':>5} {'room held ms/frame':>19} {'fast p50 ms':>12} "
+          f"{'fast p99 ms':>12} {'slow frames/s':>14}")
+    for n_slow in args.slow:
+        for mode in ("gather", "outbox"):
+            r = asyncio.run(_run(mode, args, n_slow))
+            print(f"{mode:>7} {n_slow:>5} {r['hold']:>19.2f} {r['p50']:>12.2f} "
+                  f"{r['p99']:>12.2f} {r['slow_hz']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# =============================================================
+# Filename: bench/bench_ingest.py
+# =============================================================
+"""Inbound command frames per second on one core: old path vs. ``ingest``.
+
+``legacy`` is what ``rooms.serve_connection`` used to do with every frame –
+``json.loads`` + ``protocol.decode_message`` (``Message`` →
+``Command.from_dict`` → ``_lt``), with errors caught so a bad frame costs
+the same as it would have before dropping the socket.  ``ingest`` is
+:meth:`ingest.CommandIngest.parse` + :meth:`~ingest.CommandIngest.command`.
+``--bad`` is the share of garbage in the corpus: oversized, non-JSON and
+schema-breaking frames in equal parts.
+
+    python -m bench.bench_ingest --bad 0 0.1 0.5
+"""
+from __future__ import annotations
+import argparse, json, random, time
+
+import bench._common                                     # noqa: F401 – sys.path
+from ingest import CommandIngest, IngestError
+from protocol import decode_message
+
+
+def _corpus(n: int, bad: float, rng: random.Random) -> list[str]:
+    out = []
+    for i in range(n):
+        r, c = rng.randrange(8), rng.randrange(8)
+        cmd = {"timestamp": 1_700_000_000_000 + i, "piece_id": f"PW_{r}_{c}", "type": "Move",
+               "params": [[r, c], [max(0, r - 1), c]], "player_id": "WHITE",
+               "metadata": {"move_type": "normal"}}
+        if rng.random() < bad:
+            kind = i % 3
+            if kind == 0:
+                cmd["metadata"] = {"pad": "x" * 4096}
+            elif kind == 1:
+                out.append('{"type": "command", "payload": {"piece_id": ')
+                continue
+            else:
+                cmd["params"] = [[r, c]]
+        out.append(json.dumps({"type": "command", "payload": cmd, "ts": 0}))
+    return out
+
+
+def _legacy(frames: list[str]) -> int:
+    ok = 0
+    for raw in frames:
+        try:
+            decode_message(json.loads(raw))
+            ok += 1
+        except (ValueError, TypeError, KeyError):
+            pass
+    return ok
+
+
+def _ingest(frames: list[str]) -> int:
+    ing = CommandIngest(rate_hz=1e9, burst=1e9)             # measure parsing, not throttling
+    ok = 0
+    for raw in frames:
+        try:
+            ing.command(None, ing.parse(raw).get("payload"))
+            ok += 1
+        except IngestError:
+            pass
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--frames", type=int, default=200_000)
+    ap.add_argument("--bad", type=float, nargs="+", default=[0.0, 0.1, 0.5])
+    args = ap.parse_args()
+
+    print(f"{'bad':>5} {'path':>7} {'accepted':>9} {'cmds/s':>11}")
+    for bad in args.bad:
+        frames = _corpus(args.frames, bad, random.Random(7))
+        for name, fn in (("legacy", _legacy), ("ingest", _ingest)):
+            t0 = time.process_time()
+            ok = fn(frames)
+            cpu = time.process_time() - t0
+            print(f"{bad:>5.2f} {name:>7} {ok:>9} {len(frames) / cpu:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# =============================================================
+# Filename: bench/bench_memory.py
+# =============================================================
+"""Bytes per room: shared state specs vs. every piece owning its whole FSM.
+
+``flyweight`` builds rooms the way the server does: piece-type templates are
+loaded once per process (:class:`engine.State.MachineSpec`) and a piece only
+builds the states it enters.  ``eager`` reproduces the old per-room cost –
+templates reloaded from disk for every room and all states of every piece
+built up front.  Memory is what ``tracemalloc`` sees allocated and still
+alive after building the rooms.
+
+    python -m bench.bench_memory --rooms 1 1000
+"""
+from __future__ import annotations
+import argparse, gc, tracemalloc
+
+from bench._common import Stopwatch, add_asset_args, fmt_bytes, quiet
+from core.pieces import PieceFactory as factory_mod
+from rooms import build_game
+
+
+def _build(mode: str, args):
+    if mode == "eager":
+        factory_mod._SPECS.clear()                       # reload templates per room
+    game = build_game(args.board, args.pieces)
+    if mode == "eager":
+        for p in game.pieces:
+            m = p.current_state.machine
+            for name in m.spec.states:
+                m.state(name)
+    return game
+
+
+def _measure(mode: str, n: int, args) -> dict:
+    with quiet():
+        _build("flyweight", args)                        # imports + process-wide specs
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        with Stopwatch() as sw:
+            rooms = [_build(mode, args) for _ in range(n)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+    states = sum(len(p.current_state.machine.states) for g in rooms for p in g.pieces)
+    return {"bytes": used / n, "states": states / n, "ms": 1000 * sw.wall / n}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, nargs="+", default=[1, 1000])
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{'mode':>10} {'rooms':>6} {'per room':>12} {'states/room':>12} {'build ms/room':>14}")
+    for n in args.rooms:
+        for mode in ("eager", "flyweight"):
+            r = _measure(mode, n, args)
+            print(f"{mode:>10} {n:>6} {fmt_bytes(r['bytes']):>12} {r['states']:>12.0f} {r['ms']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
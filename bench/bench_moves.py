@@ -0,0 +1,78 @@
+# =============================================================
+# Filename: bench/bench_moves.py
+# =============================================================
+"""``Moves.get_moves`` cost: per-call rule loop vs. the shared move tables.
+
+``legacy`` is the old ``get_moves`` body (closure + bounds check per rule);
+``table`` is the current lookup into :class:`engine.Moves.MoveTable`.  The
+second part builds ``--rooms`` games and counts how many tables they share.
+
+    python -m bench.bench_moves --sizes 8 16 32 --rooms 50
+"""
+from __future__ import annotations
+import argparse, timeit
+
+from bench._common import Stopwatch, add_asset_args, quiet
+from core.engine import Moves as moves_mod
+from rooms import build_game
+
+
+def _legacy_get_moves(m, r, c, *, capture_only=None, first_move=None):
+    def rule_ok(rule):
+        if capture_only is True and rule.tag != "capture": return False
+        if capture_only is False and rule.tag == "capture": return False
+        if first_move is True and rule.tag != "1st": return False
+        return True
+
+    moves = []
+    for rule in m.rules:
+        if not rule_ok(rule): continue
+        nr, nc = rule.target_cell(r, c)
+        if 0 <= nr < m.rows and 0 <= nc < m.cols:
+            moves.append((nr, nc))
+    return moves
+
+
+def _per_call_us(fn, m, cells, args) -> float:
+    batch = lambda: [fn(m, r, c) for r, c in cells]
+    return 1e6 * min(timeit.repeat(batch, number=args.calls, repeat=args.repeat)) / (args.calls * len(cells))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--rooms", type=int, default=50)
+    ap.add_argument("--calls", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=5)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{'board':>6} {'piece':>6} {'legacy µs':>10} {'table µs':>9} {'speed-up':>9}")
+    for n in args.sizes:
+        cells = [(r, c) for r in range(n) for c in range(n)]
+        for kind in ("QW", "NB", "PW"):
+            m = moves_mod.Moves(args.pieces / kind / "moves.txt", (n, n), kind.endswith("B"))
+            legacy = _per_call_us(_legacy_get_moves, m, cells, args)
+            table  = _per_call_us(moves_mod.Moves.get_moves, m, cells, args)
+            print(f"{n:>3}x{n:<2} {kind:>6} {legacy:>10.2f} {table:>9.2f} {legacy / table:>8.1f}x")
+
+    before = len(moves_mod._TABLES)
+    with quiet(), Stopwatch() as sw:
+        games = [build_game(args.board, args.pieces) for _ in range(args.rooms)]
+    owners = {id(st.moves) for g in games for p in g.pieces for st in _states(p.current_state)}
+    print(f"\n{args.rooms} rooms: {len(owners)} Moves objects, "
+          f"{len(moves_mod._TABLES) - before} new move tables, {1000 * sw.wall / args.rooms:.1f} ms per room")
+
+
+def _states(root):
+    seen, todo = {}, [root]
+    while todo:
+        st = todo.pop()
+        if id(st) not in seen:
+            seen[id(st)] = st
+            todo.extend(st.transitions.values())
+    return seen.values()
+
+
+if __name__ == "__main__":
+    main()
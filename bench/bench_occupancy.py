@@ -0,0 +1,108 @@
+# =============================================================
+# Filename: bench/bench_occupancy.py
+# =============================================================
+"""Board-query cost: occupancy index vs. scanning ``game.pieces``.
+
+Builds square boards of ``--sizes`` cells with two full armies (back rank
++ pawn row per side, scaled to the width) and times each board query
+the engine makes, once through :class:`game.occupancy.Occupancy` and once
+with ``game.occupancy = None`` (the old scans).  ``tick`` is a whole server
+step with random play, so it includes keeping the index up to date.
+
+    python -m bench.bench_occupancy --sizes 8 16 32
+"""
+from __future__ import annotations
+import argparse, random, timeit
+
+from bench._common import add_asset_args, quiet, random_command, step
+from core.engine.Board import Board
+from core.game.game import Game
+from core.pieces.Pawn import Pawn
+from core.pieces.PieceFactory import PieceFactory
+
+BACK_RANK = "RNBQKBNR"
+
+
+def build_board(n: int, pieces_root) -> Game:
+    """An n×n game: one king per side, the rest of the back rank cycles RNBQ…"""
+    board   = Board(64, 64, n, n)
+    factory = PieceFactory(board, pieces_root)
+    rank    = [BACK_RANK[c % 8] if BACK_RANK[c % 8] != "K" or c == 4 else "Q" for c in range(n)]
+    pieces  = []
+    for color, back, front in (("B", 0, 1), ("W", n - 1, n - 2)):
+        for c in range(n):
+            pieces.append(factory.create_piece(f"{rank[c]}{color}", (back, c)))
+            pieces.append(factory.create_piece(f"P{color}", (front, c)))
+    game = Game(pieces, board); board.game = game
+    return game
+
+
+def _queries(game: Game, rng: random.Random):
+    """The call sites the index replaced, each over a fixed random sample."""
+    n     = game.board.H_cells
+    live  = [p for p in game.pieces if not p.is_captured]
+    cells = [(rng.randrange(n), rng.randrange(n)) for _ in range(64)]
+    pawns = [p for p in live if isinstance(p, Pawn)][:32]
+    rays  = [(p, p.get_cell(), (rng.randrange(n), p.get_cell()[1])) for p in live[:32]]
+    owned = [(p, c) for p, c in zip(live, cells)]
+    return {
+        "_piece_at":        lambda: [game._piece_at(*c) for c in cells],
+        "_is_ally_on_cell": lambda: [p._is_ally_on_cell(c, game) for p, c in owned],
+        "_is_path_blocked": lambda: [p._is_path_blocked(s, d, game) for p, s, d in rays],
+        "_legal_dests":     lambda: [p._legal_dests(game, p.get_cell()) for p in pawns],
+        "_resolve_collisions": game._resolve_collisions,
+    }
+
+
+def _per_call_us(fn, calls: int, repeat: int) -> float:
+    return 1e6 * min(timeit.repeat(fn, number=calls, repeat=repeat)) / calls
+
+
+def _play(game: Game, rng: random.Random, steps: int, t0: int = 0) -> int:
+    """Random play so the board is mid-game (pieces moving, some captured)."""
+    for i in range(steps):
+        now = t0 + i * 16
+        if rng.random() < 0.3:
+            piece, cmd = random_command(game, rng, now)
+            if piece:
+                piece.on_command(cmd, now, game)
+        step(game, now)
+    return t0 + steps * 16
+
+
+def _measure(n: int, indexed: bool, args) -> dict:
+    with quiet():
+        game = build_board(n, args.pieces)
+        if not indexed:
+            game.occupancy = None
+        game.start()
+        rng = random.Random(args.seed)
+        t   = _play(game, rng, args.warmup, game.game_start_ms)
+        out = {name: _per_call_us(fn, args.calls, args.repeat)
+               for name, fn in _queries(game, random.Random(args.seed)).items()}
+        out["tick"] = min(timeit.repeat(lambda: _play(game, rng, 1, t), number=args.calls,
+                                        repeat=args.repeat)) * 1e6 / args.calls
+    out["pieces"] = len(game.pieces)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--warmup", type=int, default=600, help="random-play steps first")
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{'board':>6} {'pieces':>7} {'query (µs per batch)':<22} {'scan':>9} {'index':>9} {'speed-up':>9}")
+    for n in args.sizes:
+        scan, idx = _measure(n, False, args), _measure(n, True, args)
+        for name in (k for k in idx if k != "pieces"):
+            print(f"{n:>3}x{n:<2} {idx['pieces']:>7} {name:<22} {scan[name]:>9.1f} "
+                  f"{idx[name]:>9.1f} {scan[name] / idx[name]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# =============================================================
+# Filename: bench/bench_rooms.py
+# =============================================================
+"""Per-room CPU and memory cost as the number of rooms in one process grows.
+
+Every room runs its real tick / snapshot / event tasks; ``--watchers`` fake
+sockets per room make the snapshot fan-out part of the measurement.
+
+    python -m bench.bench_rooms --rooms 1 10 100 300 --seconds 5
+"""
+from __future__ import annotations
+import argparse, asyncio, functools, gc, tracemalloc
+
+from bench._common import NullSocket, Stopwatch, add_asset_args, fmt_bytes, quiet
+from rooms import RoomManager, build_game
+
+
+async def _measure(n_rooms: int, watchers: int, seconds: float, factory) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+
+    mgr = RoomManager(factory, max_rooms=n_rooms)
+    sockets = []
+    with quiet():
+        for i in range(n_rooms):
+            room = mgr.open(f"bench-{i}")
+            for _ in range(watchers):
+                ws = NullSocket(); sockets.append(ws)
+                await room.add(ws)
+    built, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with quiet(), Stopwatch() as sw:
+        await asyncio.sleep(seconds)
+
+    with quiet():
+        await mgr.stop()
+    return {
+        "rooms":    n_rooms,
+        "mem_room": (built - base) / n_rooms,
+        "cpu_pct":  100.0 * sw.cpu / sw.wall,
+        "cpu_room": 1000.0 * sw.cpu / sw.wall / n_rooms,   # ms of CPU per room-second
+        "mbit_s":   8 * sum(s.bytes for s in sockets) / sw.wall / 1e6,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 50, 100])
+    ap.add_argument("--watchers", type=int, default=2, help="fake sockets per room")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    factory = functools.partial(build_game, args.board, args.pieces)
+    print(f"{'rooms':>6} {'mem/room':>12} {'cpu %':>7} {'cpu ms/room·s':>14} {'egress Mbit/s':>14}")
+    for n in args.rooms:
+        r = asyncio.run(_measure(n, args.watchers, args.seconds, factory))
+        print(f"{r['rooms']:>6} {fmt_bytes(r['mem_room']):>12} {r['cpu_pct']:>7.1f} "
+              f"{r['cpu_room']:>14.2f} {r['mbit_s']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# =============================================================
+# Filename: bench/bench_shards.py
+# =============================================================
+"""Load test: aggregate frame throughput of the gateway for 1…N workers.
+
+For every worker count a fresh ``server.gateway`` is started; ``--rooms``
+matches each get a WHITE and a BLACK WebSocket client that keep jumping
+random pawns, so every room produces state / event frames continuously.
+Clients run in ``--client-procs`` processes so the load generator is not
+the bottleneck.  Near-linear scaling needs at least as many free cores as
+gateway + workers + client processes.
+
+    python -m bench.bench_shards --workers 1 2 4 --rooms 200 --seconds 10
+"""
+from __future__ import annotations
+import argparse, asyncio, json, multiprocessing, os, random, socket, subprocess, sys, time
+
+import websockets
+
+from bench._common import add_asset_args
+from server.bootstrap import ROOT
+
+PAWN_ROW = {"WHITE": ("PW", 6), "BLACK": ("PB", 1)}
+
+
+def _jump(color: str, rng: random.Random) -> str:
+    code, row = PAWN_ROW[color]
+    col = rng.randrange(8)
+    cmd = {"timestamp": 0, "piece_id": f"{code}_{row}_{col}", "type": "Jump",
+           "params": [[row, col]], "player_id": color, "metadata": {}}
+    return json.dumps({"type": "command", "payload": cmd, "ts": 0})
+
+
+async def _player(port: int, room: str, color: str, cmd_hz: float,
+                  t_start: float, t_end: float, stats: dict) -> None:
+    rng = random.Random(f"{room}-{color}")
+    async with websockets.connect(f"ws://127.0.0.1:{port}", max_queue=None,
+                                  subprotocols=["kfc.bin.1", "kfc.json"]) as ws:
+        await ws.send(json.dumps({"type": "join",
+                                  "payload": {"name": color, "color": color, "room": room}}))
+
+        async def _commands():
+            while time.time() < t_end:
+                await asyncio.sleep(rng.expovariate(cmd_hz))
+                await ws.send(_jump(color, rng))
+
+        sender = asyncio.create_task(_commands())
+        try:
+            while (left := t_end - time.time()) > 0:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), left)
+                except asyncio.TimeoutError:
+                    break
+                if time.time() >= t_start:
+                    stats["frames"] += 1
+                    stats["bytes"]  += len(raw)
+        finally:
+            sender.cancel()
+
+
+def _client_proc(port: int, rooms: list, cmd_hz: float, t_start: float, t_end: float) -> dict:
+    stats = {"frames": 0, "bytes": 0}
+
+    async def run():
+        await asyncio.gather(*(_player(port, r, c, cmd_hz, t_start, t_end, stats)
+                               for r in rooms for c in PAWN_ROW), return_exceptions=True)
+    asyncio.run(run())
+    return stats
+
+
+def _wait_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"gateway did not come up on port {port}")
+
+
+def _measure(workers: int, args) -> dict:
+    gw = subprocess.Popen([sys.executable, "-m", "server.gateway", "--workers", str(workers),
+                           "--port", str(args.port), "--pieces", str(args.pieces),
+                           "--board", str(args.board)],
+                          cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_port(args.port)
+        rooms   = [f"load-{i}" for i in range(args.rooms)]
+        slices  = [rooms[i::args.client_procs] for i in range(args.client_procs)]
+        t_start = time.time() + args.warmup
+        t_end   = t_start + args.seconds
+        with multiprocessing.Pool(args.client_procs) as pool:
+            parts = pool.starmap(_client_proc, [(args.port, s, args.cmd_hz, t_start, t_end)
+                                                for s in slices])
+    finally:
+        gw.terminate()
+        gw.wait(timeout=10)
+    frames = sum(p["frames"] for p in parts)
+    return {"workers": workers,
+            "fps": frames / args.seconds,
+            "fps_room": frames / args.seconds / args.rooms,
+            "mbit_s": 8 * sum(p["bytes"] for p in parts) / args.seconds / 1e6}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--rooms", type=int, default=200)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--warmup", type=float, default=3.0, help="seconds before counting")
+    ap.add_argument("--cmd-hz", type=float, default=2.0, help="jumps per player per second")
+    ap.add_argument("--client-procs", type=int, default=max(1, min(4, (os.cpu_count() or 1) // 2)))
+    ap.add_argument("--port", type=int, default=8790)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.rooms} rooms, {args.client_procs} client procs")
+    print(f"{'workers':>8} {'frames/s':>10} {'frames/room·s':>14} {'Mbit/s':>8} {'speed-up':>9}")
+    base = None
+    for w in args.workers:
+        r = _measure(w, args)
+        base = base or r["fps"]
+        print(f"{r['workers']:>8} {r['fps']:>10.0f} {r['fps_room']:>14.1f} "
+              f"{r['mbit_s']:>8.2f} {r['fps'] / base:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# =============================================================
+# Filename: bench/bench_slots.py
+# =============================================================
+"""Memory and tick-path cost of the hot engine objects.
+
+Reports the bytes one instance of each hot class really takes (the object
+plus its ``__dict__``, if it has one), the ``tracemalloc`` bytes per room
+after some random play, and ``timeit`` numbers for the tick path
+``Piece.update → State.update → physics.update`` over a whole room.  Run it
+before and after a layout change to compare.
+
+    python -m bench.bench_slots --rooms 200
+"""
+from __future__ import annotations
+import argparse, gc, random, sys, timeit, tracemalloc
+
+from bench._common import add_asset_args, fmt_bytes, quiet, random_command, step
+from core.engine.events import StateChanged
+from rooms import build_game
+
+
+def _size(obj) -> int:
+    d = getattr(obj, "__dict__", None)
+    return sys.getsizeof(obj) + (sys.getsizeof(d) if d is not None else 0)
+
+
+def _play(game, rng: random.Random, steps: int, t0: int) -> int:
+    for i in range(steps):
+        now = t0 + i * 16
+        if rng.random() < 0.3:
+            piece, cmd = random_command(game, rng, now)
+            if piece:
+                piece.on_command(cmd, now, game)
+        step(game, now)
+    return t0 + steps * 16
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=200)
+    ap.add_argument("--steps", type=int, default=300, help="random-play steps per room")
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+
+    with quiet():
+        game = build_game(args.board, args.pieces)
+        game.start()
+        t = _play(game, rng, args.steps, game.game_start_ms)
+    pawn  = next(p for p in game.pieces if type(p).__name__ == "Pawn")
+    piece = next(p for p in game.pieces if type(p).__name__ == "Piece")
+    state = piece.current_state
+    print("instance sizes (object + __dict__):")
+    for name, obj in (("Piece", piece), ("Pawn", pawn), ("State", state),
+                      ("IdlePhysics", state.physics),
+                      ("SlidePhysics", next((p.current_state.physics for p in game.pieces
+                                             if type(p.current_state.physics).__name__ == "SlidePhysics"),
+                                            None)),
+                      ("Board", game.board), ("StateChanged", StateChanged("PW_6_0", "idle", 0))):
+        if obj is not None:
+            print(f"  {name:<13} {_size(obj):>5} B")
+
+    with quiet():
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        rooms = []
+        for _ in range(args.rooms):
+            g = build_game(args.board, args.pieces)
+            g.start()
+            _play(g, rng, args.steps, g.game_start_ms)
+            rooms.append(g)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+    print(f"\nper room after {args.steps} steps of play: {fmt_bytes(used / args.rooms)}")
+
+    live  = [p for p in game.pieces if not p.is_captured]
+    phys  = live[0].current_state.physics
+    tick  = lambda: [p.update(t) for p in live]
+    reads = lambda: (phys.current_cell, phys.current_pixel_pos, phys._moving, phys.start_time_ms)
+    with quiet():
+        us_tick = 1e6 * min(timeit.repeat(tick, number=args.calls, repeat=5)) / args.calls
+    us_read = 1e9 * min(timeit.repeat(reads, number=100_000, repeat=5)) / 100_000
+    print(f"tick path, {len(live)} live pieces: {us_tick:.1f} µs per room step")
+    print(f"4 physics attribute reads: {us_read:.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
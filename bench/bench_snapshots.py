@@ -0,0 +1,64 @@
+# =============================================================
+# Filename: bench/bench_snapshots.py
+# =============================================================
+"""Bytes and encode CPU per frame: full ``encode_state`` vs delta snapshots.
+
+Plays random moves on the real board for ``--seconds`` of simulated time at
+60 Hz and encodes every tick both ways.
+
+    python -m bench.bench_snapshots --seconds 60 --moves-per-sec 4
+"""
+from __future__ import annotations
+import argparse, json, random, time
+
+from bench._common import add_asset_args, quiet, random_command, step
+from protocol import SnapshotEncoder, encode_state
+from rooms import build_game
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=60.0, help="simulated match length")
+    ap.add_argument("--moves-per-sec", type=float, default=4.0)
+    ap.add_argument("--keyframe-every", type=int, default=120)
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    with quiet():
+        game = build_game(args.board, args.pieces)
+    enc  = SnapshotEncoder(args.keyframe_every)
+
+    frames = int(args.seconds * 60)
+    full_b = full_t = delta_b = delta_t = sent = 0
+    now = 0
+    with quiet():
+        for i in range(frames):
+            now = i * 1000 // 60
+            if rng.random() < args.moves_per_sec / 60:
+                piece, cmd = random_command(game, rng, now)
+                if piece:
+                    piece.on_command(cmd, now, game)
+            step(game, now)
+
+            t0 = time.perf_counter()
+            full = json.dumps({"type": "state", "payload": encode_state(game)})
+            t1 = time.perf_counter()
+            frame = enc.next_frame(game)
+            delta = json.dumps({"type": "state", "payload": frame}) if frame else ""
+            t2 = time.perf_counter()
+
+            full_b += len(full);  full_t += t1 - t0
+            delta_b += len(delta); delta_t += t2 - t1
+            sent += bool(frame)
+
+    print(f"ticks: {frames}   delta frames sent: {sent}   keyframe every {args.keyframe_every}")
+    print(f"{'':>8} {'bytes/tick':>11} {'µs/tick':>9}")
+    print(f"{'full':>8} {full_b / frames:>11.0f} {1e6 * full_t / frames:>9.1f}")
+    print(f"{'delta':>8} {delta_b / frames:>11.0f} {1e6 * delta_t / frames:>9.1f}")
+    print(f"{'ratio':>8} {full_b / max(1, delta_b):>10.1f}x {full_t / max(1e-9, delta_t):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# =============================================================
+# Filename: bench/bench_spectators.py
+# =============================================================
+"""What spectators cost the game process: in-process watchers vs. the ring.
+
+One room of the real board broadcasts ``--frames`` state deltas at ``--hz``.
+``inproc`` attaches ``--spectators`` watcher sockets to the room itself
+(one :class:`outbox.Outbox` each, as ``server.main`` does); ``ring`` only
+publishes into a :class:`ring.FrameRing`, which ``server/fanout.py``
+processes read.  Reported: CPU time the game process spends per second –
+flat for ``ring``, growing with the spectator count for ``inproc``.
+
+    python -m bench.bench_spectators --spectators 0 100 1000
+"""
+from __future__ import annotations
+import argparse, asyncio, os, time
+
+import bench._common as common
+from rooms import Room, build_game
+from ring import FrameRing, ring_name
+
+
+async def _run(mode: str, n: int, args) -> float:
+    with common.quiet():
+        room = Room("bench", build_game(args.board, args.pieces))
+    if mode == "ring":
+        room.publish(FrameRing.create(ring_name(f"bench-{n}", f"kfcb{os.getpid()}")))
+    else:
+        with common.quiet():
+            for _ in range(n):
+                await room.add(common.NullSocket())
+    payload = room.snapshots.keyframe(room.game)
+
+    start = time.perf_counter()
+    with common.Stopwatch() as sw:
+        for i in range(args.frames):
+            await asyncio.sleep(max(0.0, start + i / args.hz - time.perf_counter()))
+            room._broadcast_batch(dict(payload, seq=payload["seq"] + i + 1,
+                                       key=False, base=payload["seq"] + i), [])
+        await asyncio.sleep(0.2)                         # let the outboxes drain
+    with common.quiet():
+        await room.stop()
+    return 1000 * sw.cpu / sw.wall
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--spectators", type=int, nargs="+", default=[0, 100, 1000])
+    ap.add_argument("--frames", type=int, default=40)
+    ap.add_argument("--hz", type=float, default=20.0)
+    common.add_asset_args(ap)
+    args = ap.parse_args()
+
+    print(f"{'mode':>7} {'spectators':>11} {'game CPU ms/s':>14}")
+    for n in args.spectators:
+        for mode in ("inproc", "ring"):
+            print(f"{mode:>7} {n:>11} {asyncio.run(_run(mode, n, args)):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
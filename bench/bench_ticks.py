@@ -0,0 +1,98 @@
+# =============================================================
+# Filename: bench/bench_ticks.py
+# =============================================================
+"""Achieved tick rate under load: sleep-after-work loop vs fixed-step scheduler.
+
+Runs ``--rooms`` real rooms in one process with random play and a fake
+watcher each, once with the old ``work; sleep(1/hz)`` loop and once with
+:class:`scheduler.FixedStepScheduler`.  The legacy loop's ``steps/s`` is its
+real tick rate; the scheduler holds the target grid (see ``skipped`` and
+``late``) and only runs the steps in which something can change.
+
+    python -m bench.bench_ticks --rooms 10 50 100 --seconds 5
+"""
+from __future__ import annotations
+import argparse, asyncio, functools, random
+
+from bench._common import NullSocket, Stopwatch, add_asset_args, quiet, random_command
+from rooms import Room, build_game
+
+
+async def _legacy(room: Room, hz: float, counts: dict) -> None:
+    """The pre-scheduler loop: step every piece with the wall clock, then sleep."""
+    game = room.game
+    while True:
+        now = game.game_time_ms()
+        for p in game.pieces:
+            p.update(now)
+        game._resolve_collisions()
+        game._is_win()
+        room._dirty.set()
+        counts[room.room_id] += 1
+        await asyncio.sleep(1.0 / hz)
+
+
+async def _players(rooms, moves_per_sec: float, rng: random.Random) -> None:
+    while True:
+        await asyncio.sleep(rng.expovariate(moves_per_sec * len(rooms)))
+        room = rng.choice(rooms)
+        piece, cmd = random_command(room.game, rng, room.now_ms())
+        if piece:
+            piece.on_command(cmd, room.now_ms(), room.game)
+
+
+async def _measure(mode: str, n_rooms: int, args, factory) -> dict:
+    rng = random.Random(args.seed)
+    with quiet():
+        rooms = [Room(f"bench-{i}", factory(), tick_hz=args.hz) for i in range(n_rooms)]
+    counts = {r.room_id: 0 for r in rooms}
+    tasks  = []
+    for room in rooms:
+        with quiet():
+            await room.add(NullSocket())
+        tick = room.scheduler.run() if mode == "scheduler" else _legacy(room, args.hz, counts)
+        tasks += [asyncio.create_task(tick),
+                  asyncio.create_task(room._snapshot_loop(1.0 / room.snapshot_hz))]
+    tasks.append(asyncio.create_task(_players(rooms, args.moves_per_sec, rng)))
+
+    with quiet(), Stopwatch() as sw:
+        await asyncio.sleep(args.seconds)
+    wall = sw.wall
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    if mode == "scheduler":
+        stats = [r.scheduler.stats for r in rooms]
+        steps = sum(s.ticks for s in stats)
+        late  = max(s.late_ms_max for s in stats)
+        skip  = sum(s.skipped for s in stats)
+    else:
+        steps, late, skip = sum(counts.values()), float("nan"), 0
+    return {"mode": mode, "rooms": n_rooms, "hz": steps / wall / n_rooms,
+            "cpu_room": 1000.0 * sw.cpu / wall / n_rooms,
+            "skipped": skip, "late_max": late}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, nargs="+", default=[10, 50, 100])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--hz", type=float, default=60.0)
+    ap.add_argument("--moves-per-sec", type=float, default=2.0, help="per room")
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    factory = functools.partial(build_game, args.board, args.pieces)
+    print(f"{'mode':>10} {'rooms':>6} {'steps/s':>8} {'skipped':>8} "
+          f"{'late max ms':>12} {'cpu ms/room·s':>14}")
+    for n in args.rooms:
+        for mode in ("legacy", "scheduler"):
+            r = asyncio.run(_measure(mode, n, args, factory))
+            print(f"{r['mode']:>10} {r['rooms']:>6} {r['hz']:>8.1f} "
+                  f"{r['skipped']:>8} {r['late_max']:>12.1f} {r['cpu_room']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# =============================================================
+# Filename: bench/bench_wire.py
+# =============================================================
+"""Bytes per frame and encode / decode cost: JSON vs the binary wire format.
+
+Frames come from random play on the real board (keyframes, deltas and the
+events the engine publishes), so the mix matches what a room sends.
+
+    python -m bench.bench_wire --seconds 30
+"""
+from __future__ import annotations
+import argparse, random, time
+
+from bench._common import add_asset_args, quiet, random_command, step
+from protocol import (SnapshotEncoder, binary_codec_for, decode_frame, encode_event,
+                      encode_frame)
+from rooms import BROADCAST_EVENTS, build_game
+
+
+def _collect(args) -> tuple[list, object]:
+    rng = random.Random(args.seed)
+    with quiet():
+        game = build_game(args.board, args.pieces)
+    events: list = []
+    for cls in BROADCAST_EVENTS:
+        game.bus.subscribe(cls, events.append)
+
+    enc, frames = SnapshotEncoder(args.keyframe_every), []
+    with quiet():
+        for i in range(int(args.seconds * 60)):
+            now = i * 1000 // 60
+            if rng.random() < args.moves_per_sec / 60:
+                piece, cmd = random_command(game, rng, now)
+                if piece:
+                    piece.on_command(cmd, now, game)
+            step(game, now)
+            frames.extend(("event", encode_event(e)) for e in events)
+            events.clear()
+            if (snap := enc.next_frame(game)) is not None:
+                frames.append(("state", snap))
+    return frames, binary_codec_for(game)
+
+
+def _run(frames, codec, reps: int) -> dict:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        wire = [encode_frame(tp, payload, codec) for tp, payload in frames]
+    t1 = time.perf_counter()
+    for _ in range(reps):
+        for raw in wire:
+            decode_frame(raw, codec)
+    t2 = time.perf_counter()
+    n = len(frames) * reps
+    return {"bytes": sum(len(w) for w in wire) / len(frames),
+            "enc_us": 1e6 * (t1 - t0) / n, "dec_us": 1e6 * (t2 - t1) / n}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=30.0, help="simulated match length")
+    ap.add_argument("--moves-per-sec", type=float, default=4.0)
+    ap.add_argument("--keyframe-every", type=int, default=120)
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    add_asset_args(ap)
+    args = ap.parse_args()
+
+    frames, codec = _collect(args)
+    for tp in ("state", "event"):
+        subset = [f for f in frames if f[0] == tp]
+        if not subset:
+            continue
+        js, bn = _run(subset, None, args.reps), _run(subset, codec, args.reps)
+        print(f"{tp} frames: {len(subset)}")
+        print(f"  {'':>6} {'bytes':>8} {'enc µs':>8} {'dec µs':>8}")
+        for name, r in (("json", js), ("binary", bn)):
+            print(f"  {name:>6} {r['bytes']:>8.1f} {r['enc_us']:>8.2f} {r['dec_us']:>8.2f}")
+        print(f"  {'ratio':>6} {js['bytes'] / bn['bytes']:>7.1f}x "
+              f"{js['enc_us'] / bn['enc_us']:>7.1f}x {js['dec_us'] / bn['dec_us']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
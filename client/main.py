@@ -32,6 +32,7 @@ from client.ui.login_screen import LoginScreen
 
 from core.engine.events import *
 from shared.constants import *
+from shared.message_schema import unbatch
 
 # ───────── pygame init ─────────
 pygame.init()
@@ -44,8 +45,18 @@ set_window_icon("Kungfu-Chess – Client")
 clock = pygame.time.Clock()
 
 # ───────── Login (blocks until user picks name+color) ─────────
-login  = LoginScreen(screen)
-player_name, player_color = login.run()  # returns ("Michal", "WHITE"/"BLACK")
+_argv     = sys.argv[1:]
+REPLAY    = _argv[_argv.index("--replay") + 1] if "--replay" in _argv[:-1] else None
+ARGS      = [a for a in _argv if not a.startswith("--") and a != REPLAY]
+SPECTATE  = "--spectate" in _argv          # python -m client.main <room> --spectate
+room_name = ARGS[0] if ARGS else "default"  # python -m client.main <room>
+if REPLAY:                                  # python -m client.main --replay FILE
+    player_name, player_color = "replay", "WHITE"
+elif SPECTATE:
+    player_name, player_color = "spectator", "WHITE"
+else:
+    login  = LoginScreen(screen)
+    player_name, player_color = login.run()  # returns ("Michal", "WHITE"/"BLACK")
 
 # ───────── Board Surface (background grid) ─────────
 board_surf = pygame.Surface((BOARD_W, BOARD_H))
@@ -84,9 +95,14 @@ def _get_anim(code: str, state: str) -> Graphics:
 
 # ───────── Core objects ─────────
 model = ClientModel()
-net = NetClient(model, player_name, player_color)  # ← matches client/net.py signature
-net.start()
-input_hdl = InputHandler(net, model)               # ← matches client/input_handler.py signature
+if REPLAY:
+    from replay import Replay, Playback            # server/replay.py – no server needed
+    player = Playback(Replay(REPLAY))
+    net = input_hdl = None
+else:
+    net = NetClient(model, player_name, player_color, room=room_name, spectate=SPECTATE)  # ← matches client/net.py signature
+    net.start()
+    input_hdl = InputHandler(net, model)           # ← matches client/input_handler.py signature
 bus = EventBus()
 ui = GameUI(model, MoveLogUI(bus), ScoreUI(bus), Overlay(bus),
             player_name=player_name,
@@ -101,6 +117,19 @@ def _decode_event(d: dict):
     cls = _EVENT_MAP.get(d.get("_event_type") or d.get("type"))
     return cls(**{k: v for k, v in d.items() if k not in ("_event_type", "type")}) if cls else None
 
+def _replay_seek(ts: float) -> None:
+    """Jump the replay to *ts*: a fresh timeline from one merged snapshot."""
+    model.reset_timeline()
+    for m in player.seek(ts):
+        if m["type"] == "state":
+            model.load_snapshot(m["payload"], m["payload"]["ts"])
+        else:                                  # fast-forwarded: no sounds, no log
+            model.apply_event(m["payload"].get("payload", m["payload"]))
+
+REPLAY_STEP_MS = 5_000
+if REPLAY:
+    _replay_seek(player.replay.start_ms)
+
 KEY_MAP = {
     "WHITE": {pygame.K_UP:"UP", pygame.K_DOWN:"DOWN",
               pygame.K_LEFT:"LEFT", pygame.K_RIGHT:"RIGHT",
@@ -115,24 +144,44 @@ while RUN:
     for e in pygame.event.get():
         if e.type == pygame.QUIT:
             RUN = False
-        elif e.type == pygame.KEYDOWN and not model.game_over:
+        elif e.type == pygame.KEYDOWN and REPLAY:
+            if e.key == pygame.K_SPACE:
+                player.paused = not player.paused
+            elif e.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                step = REPLAY_STEP_MS if e.key == pygame.K_RIGHT else -REPLAY_STEP_MS
+                _replay_seek(player.position + step)
+            elif e.key == pygame.K_UP:
+                player.faster()
+            elif e.key == pygame.K_DOWN:
+                player.slower()
+        elif e.type == pygame.KEYDOWN and not model.game_over and not SPECTATE:
             cmap = KEY_MAP[player_color.upper()]
             if e.key in cmap:
                 input_hdl.enqueue(player_color.upper(), cmap[e.key])
 
     # Pump inputs only while game is active
-    if not model.game_over:
+    if input_hdl is not None and not model.game_over:
         input_hdl.pump_commands()
 
-    # Net pump
+    # Net pump (or the replay's frames up to its position)
     msgs: List[dict] = []
-    while not net.rx.empty():
-        msgs.append(net.rx.get())
+    if REPLAY:
+        msgs = player.advance(clock.get_time())
+        pygame.display.set_caption(f"Kungfu-Chess – Replay {player.position / 1000:.1f}s "
+                                   f"×{player.speed:g}{' (paused)' if player.paused else ''}")
+    else:
+        while not net.rx.empty():
+            msgs.extend(unbatch(net.rx.get()))     # a tick's state + events land together
 
     # snapshots first
+    recv_ms = pygame.time.get_ticks()
     for m in msgs:
         if m.get("type") == "state":
-            model.load_snapshot(m["payload"])
+            # a replay runs on recorded server time: arrival == ts
+            model.load_snapshot(m["payload"], m["payload"]["ts"] if REPLAY else recv_ms)
+    if model.resync_needed and net is not None:
+        net.request_resync()
+        model.resync_needed = False
     # then events
     for m in msgs:
         if m.get("type") == "event":
@@ -142,18 +191,19 @@ while RUN:
                 bus.publish(evt)
 
     # draw
-    now_ms = pygame.time.get_ticks()
+    now_ms = player.position if REPLAY else pygame.time.get_ticks()
     screen.fill((25, 25, 25))
     ui.draw_panels(screen)
     screen.blit(board_surf, board_pos.topleft)
 
+    pixels = model.render_pixels(now_ms)       # interpolated between snapshots
     for p in model.alive_pieces():
         code, state = p["id"][:2], p.get("state", "idle")
         anim = _get_anim(code, state)
         anim.update(now_ms)
         surf = pygame.surfarray.make_surface(anim.get_img().img.swapaxes(0, 1)).convert_alpha()
         if "pixel" in p:
-            px, py = p["pixel"]
+            px, py = pixels.get(p["id"], p["pixel"])
             x = board_pos.left + px - surf.get_width() // 2
             y = board_pos.top + py - surf.get_height() // 2
         else:
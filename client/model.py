@@ -2,19 +2,34 @@
 # client/model.py – client-side projection of game state
 # =============================================================
 from __future__ import annotations
-from typing import Dict, Tuple, Any, Iterable
+from collections import deque
+from typing import Deque, Dict, Tuple, Any, Iterable, Optional
 from math import hypot
+import time
 
 Cell = Tuple[int,int]
+Pixel = Tuple[float,float]
 CELL = 64
 
+#: states whose pixel keeps changing between snapshots (safe to extrapolate)
+MOVING_STATES = ("move", "jump")
+
 class ClientModel:
-    """Keeps the current board projection + UI state for the client."""
+    """Keeps the current board projection + UI state for the client.
+
+    Drawing uses :meth:`render_pixels`: piece positions from a short history
+    of snapshots, shown ``interp_delay_ms`` behind the server and blended
+    between the two snapshots around that time, so the server can send far
+    fewer than one snapshot per drawn frame.
+    """
 
-    def __init__(self):
+    def __init__(self, interp_delay_ms: int = 100, max_extrapolate_ms: int = 100,
+                 history: int = 32):
         self.board_rows = 8
         self.board_cols = 8
         self.ts = 0
+        self.seq: int | None = None         # last applied snapshot sequence
+        self.resync_needed = False
         self.pieces : Dict[str, Dict[str,Any]] = {}
         self.moving : Dict[str,bool] = {}
         self.player_names = {"WHITE": "", "BLACK": ""}
@@ -26,17 +41,51 @@ class ClientModel:
         self.last_pixel: Dict[str, tuple[float,float]] = {}
         self.last_state_ts: Dict[str, int] = {}
 
+        # interpolation buffer: (server ts, pixel of every piece) per snapshot
+        self.interp_delay_ms    = interp_delay_ms
+        self.max_extrapolate_ms = max_extrapolate_ms
+        self._history: Deque[Tuple[int, Dict[str, Pixel]]] = deque(maxlen=history)
+        self._clock_offset: Optional[float] = None      # server ts − local ms
+        self._frame_gap: Optional[int] = None           # shortest ts step seen
+
         # 🔒 Game over latch (client-side UX; server is authoritative)
         self.game_over: bool = False
         self.winner: str | None = None
 
     # ---------- sync ----------
-    def load_snapshot(self, snap:dict):
-        self.board_rows=snap["board"]["rows"]
-        self.board_cols=snap["board"]["cols"]
-        self.ts=snap["ts"]
+    def load_snapshot(self, snap:dict, recv_ms: float | None = None):
+        """Apply a ``state`` payload – a keyframe or a delta (see SnapshotEncoder).
+
+        Payloads without ``"key"`` are legacy full snapshots.  A delta applies
+        on top of ``base`` (``seq - 1`` unless the server merged several); one
+        whose base is ahead of us sets :attr:`resync_needed` and is dropped,
+        the next keyframe (periodic or requested) brings the projection back.
+        *recv_ms* is the local clock at arrival, the same clock later passed
+        to :meth:`render_pixels`.
+        """
+        seq = snap.get("seq")
+        key = snap.get("key", True)
+        if not key:
+            if self.seq is None or seq <= self.seq:
+                return                          # before first keyframe / stale
+            if snap.get("base", seq - 1) > self.seq:
+                self.resync_needed = True
+                return
+        elif seq is not None and self.seq is not None and seq < self.seq:
+            return                              # old keyframe overtaken by deltas
+        self.seq = seq
+        self.ts  = snap["ts"]
+
+        if key:
+            self.board_rows=snap["board"]["rows"]
+            self.board_cols=snap["board"]["cols"]
+            self.pieces={}
+            self.resync_needed = False
+        else:
+            # pieces left out of a delta did not move this frame
+            for pid in self.moving:
+                self.moving[pid] = False
 
-        self.pieces={ p["id"]:p for p in snap["pieces"] }
         for p in snap["pieces"]:
             pid = p["id"]
             self.pieces.setdefault(pid, {})
@@ -51,7 +100,82 @@ class ClientModel:
             dist = hypot(p["pixel"][0]-prev[0], p["pixel"][1]-prev[1])
             self.moving[pid] = dist >= 0.5
             self.last_pixel[pid] = p["pixel"]
-            self.pieces[pid]["state"] = p["state"]
+
+        self._record(self.ts, _local_ms() if recv_ms is None else recv_ms)
+
+    def reset_timeline(self) -> None:
+        """Forget the snapshots seen so far – a replay seek goes back in time.
+
+        The next keyframe is accepted whatever its ``seq``/``ts``.
+        """
+        self.seq, self.ts = None, 0
+        self.resync_needed = False
+        self._history.clear()
+        self._clock_offset = self._frame_gap = None
+        self.last_pixel.clear(); self.last_state_ts.clear()
+        self.game_over, self.winner = False, None
+
+    # ---------- interpolation ----------
+    def _record(self, ts: int, recv_ms: float) -> None:
+        offset = ts - recv_ms
+        if self._clock_offset is None or offset > self._clock_offset:
+            self._clock_offset = offset                 # least-delayed arrival wins
+        else:
+            self._clock_offset += (offset - self._clock_offset) * 0.05
+
+        pixels = {pid: p["pixel"] for pid, p in self.pieces.items()}
+        hist = self._history
+        if hist and ts <= hist[-1][0]:
+            hist[-1] = (hist[-1][0], pixels)            # join / resync keyframe
+            return
+        if hist:
+            gap = ts - hist[-1][0]
+            if self._frame_gap is not None and gap > 2 * self._frame_gap:
+                # the server sends only when something changed: nothing moved
+                # until one frame before this one
+                hist.append((ts - self._frame_gap, hist[-1][1]))
+            self._frame_gap = gap if self._frame_gap is None else min(self._frame_gap, gap)
+        hist.append((ts, pixels))
+
+    def render_pixels(self, now_ms: float | None = None) -> Dict[str, Pixel]:
+        """Pixel of every piece at ``server time − interp_delay_ms``.
+
+        Between two buffered snapshots positions are blended linearly; past
+        the newest one, pieces that are still moving are extrapolated for at
+        most ``max_extrapolate_ms`` and then held.
+        """
+        hist = self._history
+        if not hist or self._clock_offset is None:
+            return {pid: p["pixel"] for pid, p in self.pieces.items()}
+        now_ms = _local_ms() if now_ms is None else now_ms
+        t = now_ms + self._clock_offset - self.interp_delay_ms
+
+        t1, newest = hist[-1]
+        if t >= t1:
+            if len(hist) < 2:
+                return dict(newest)
+            t0, older = hist[-2]
+            dt = min(t - t1, self.max_extrapolate_ms) / (t1 - t0)
+            out = dict(newest)
+            for pid, (x1, y1) in newest.items():
+                piece = self.pieces.get(pid)
+                if pid in older and piece is not None and piece.get("state") in MOVING_STATES:
+                    x0, y0 = older[pid]
+                    out[pid] = (x1 + (x1 - x0) * dt, y1 + (y1 - y0) * dt)
+            return out
+
+        for i in range(len(hist) - 2, -1, -1):
+            t0, older = hist[i]
+            if t0 <= t:
+                t1, newer = hist[i + 1]
+                a = (t - t0) / (t1 - t0)
+                out = dict(newer)
+                for pid, (x1, y1) in newer.items():
+                    if pid in older:
+                        x0, y0 = older[pid]
+                        out[pid] = (x0 + (x1 - x0) * a, y0 + (y1 - y0) * a)
+                return out
+        return dict(hist[0][1])                          # older than the buffer
 
     def apply_event(self, evt: dict):
         et = evt.get("_event_type")
@@ -92,3 +216,7 @@ class ClientModel:
     @property
     def board_pix(self) -> tuple[int, int]:
         return (self.board_cols * CELL, self.board_rows * CELL)
+
+
+def _local_ms() -> float:
+    return time.monotonic() * 1000
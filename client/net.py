@@ -3,8 +3,12 @@
 # =============================================================
 """net – Thin async WebSocket client for Kungfu‑Chess.
 
-After connect, sends a JOIN with (name, color).
+After connect, sends a JOIN with (name, color, room) – or, for a spectator,
+a SPECTATE with just the room, following the server's ``redirect`` to a
+fan-out process if it sends one.
 Queues all inbound messages so the pygame thread can poll them.
+Offers the compact binary subprotocol (see shared/wire_codec) and falls back
+to JSON when the server does not pick it.
 """
 from __future__ import annotations
 import asyncio, json, threading, queue
@@ -13,15 +17,21 @@ from typing import Any, Dict
 
 from shared.command_dto import to_dict as cmd_to_dict
 from shared.message_schema import Message
+from shared.wire_codec import BinaryCodec, SUBPROTOCOL_JSON, SUBPROTOCOLS
 
 class NetClient:
     """Background thread → asyncio loop → WebSocket connection."""
 
     def __init__(self, model, my_name: str, my_color: str,
-                 url: str = "ws://127.0.0.1:8765") -> None:
+                 url: str = "ws://127.0.0.1:8765", room: str = "default",
+                 binary: bool = True, spectate: bool = False) -> None:
         self.model     = model
         self.my_name   = (my_name or "").strip() or "player"
         self.my_color  = (my_color or "ANY").upper()
+        self.room      = (room or "").strip() or "default"
+        self.binary    = binary
+        self.spectate  = spectate
+        self._codec: BinaryCodec | None = None     # set by the server's "dict" frame
         self.url       = url
         self._tx: "queue.Queue[Dict[str, Any]]" = queue.Queue()
         self.rx: "queue.Queue[Dict[str, Any]]" = queue.Queue()
@@ -31,18 +41,31 @@ class NetClient:
     def start(self): self._thread.start()
 
     async def _send_join(self, ws):
+        if self.spectate:
+            await ws.send(json.dumps({"type": "spectate", "payload": {"room": self.room}}))
+            return
         await ws.send(json.dumps({
             "type": "join",
-            "payload": {"name": self.my_name, "color": self.my_color}
+            "payload": {"name": self.my_name, "color": self.my_color,
+                        "room": self.room}
         }))
 
     def send_command(self, cmd):
         self._tx.put(Message("command", cmd_to_dict(cmd), 0).to_dict())
 
+    def request_resync(self):
+        """Ask the server for a keyframe after a missed delta snapshot."""
+        self._tx.put(Message("resync", {}, 0).to_dict())
+
     # --------------------------- internals ----------------------
     async def _ws_loop(self):
-        async with websockets.connect(self.url) as ws:
-            print("🔗 connected to", self.url)
+        while await self._session():            # True: redirected to self.url
+            self._codec = None
+
+    async def _session(self) -> bool:
+        protos = list(SUBPROTOCOLS) if self.binary else [SUBPROTOCOL_JSON]
+        async with websockets.connect(self.url, subprotocols=protos) as ws:
+            print("🔗 connected to", self.url, "–", ws.subprotocol or "json")
             await self._send_join(ws)
 
             async def _sender():
@@ -53,11 +76,30 @@ class NetClient:
             snd_task = asyncio.create_task(_sender())
             try:
                 async for raw in ws:
+                    if isinstance(raw, bytes):
+                        if self._codec is None:
+                            continue
+                        try:
+                            self.rx.put(self._codec.decode(raw))
+                        except ValueError as e:
+                            print("[CLIENT] bad binary frame:", e)
+                        continue
                     try:
                         raw_msg = json.loads(raw)
                     except json.JSONDecodeError:
                         continue
 
+                    # spectators are served by a fan-out process
+                    if raw_msg.get("type") == "redirect":
+                        self.url = raw_msg["payload"]["url"]
+                        print("[CLIENT] redirected to", self.url)
+                        return True
+
+                    # binary dictionary → piece ids / state names by index
+                    if raw_msg.get("type") == "dict":
+                        self._codec = BinaryCodec.from_dictionary(raw_msg["payload"])
+                        continue
+
                     # players list → update names on the model
                     if raw_msg.get("type") == "players":
                         payload = raw_msg.get("payload") or {}
@@ -69,6 +111,7 @@ class NetClient:
                     self.rx.put(raw_msg)
             finally:
                 snd_task.cancel("socket closed")
+        return False
 
     def _run_loop(self):
         asyncio.run(self._ws_loop())
@@ -0,0 +1,38 @@
+# =============================================================
+# Filename: server/bootstrap.py  (HEADLESS)
+# =============================================================
+"""Import-time setup shared by every headless entry point.
+
+Importing this module puts the server / client folders on ``sys.path``,
+swaps the graphics modules for no-op stubs and aliases ``core`` to
+``server.core`` – exactly what ``server/main.py`` used to do inline, so
+benchmarks and worker processes can reuse it.
+"""
+from __future__ import annotations
+import sys, pathlib, importlib, types
+
+# ───────────── bootstrap PYTHONPATH ───────────────────────────
+ROOT = pathlib.Path(__file__).resolve().parents[1]      # …/It1_interfaces
+PROJECT_ROOT = ROOT.parent                              # …/CTD25
+SERVER_DIR   = ROOT / "server"
+CLIENT_DIR   = ROOT / "client"
+
+for p in (SERVER_DIR, CLIENT_DIR, PROJECT_ROOT):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+# ───────────── inject no-op graphics stubs ────────────────────
+from server.graphics_stub import Graphics, ImgStub
+g_mod = types.ModuleType("client.graphics.Graphics"); g_mod.Graphics = Graphics
+sys.modules["client.graphics.Graphics"] = g_mod
+img_mod = types.ModuleType("client.graphics.img"); img_mod.Img = ImgStub
+sys.modules["client.graphics.img"] = img_mod
+
+sys.modules.setdefault("core", importlib.import_module("server.core"))
+
+# ───────────── asset locations ────────────────────────────────
+def _first_existing(*paths: pathlib.Path) -> pathlib.Path:
+    return next((p for p in paths if p.exists()), paths[-1])
+
+graphics_root = _first_existing(ROOT / "pieces", PROJECT_ROOT / "pieces")
+csv_path      = _first_existing(ROOT / "assets/board.csv", PROJECT_ROOT / "assets/board.csv")
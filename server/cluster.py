@@ -0,0 +1,168 @@
+# =============================================================
+# Filename: server/cluster.py  (HEADLESS)
+# =============================================================
+"""cluster – plumbing between the gateway and its room-hosting workers.
+
+``server/gateway.py`` terminates the WebSockets; every room lives in exactly
+one ``server/worker.py`` process, chosen by a :class:`HashRing` over the
+room id.  Gateway and worker talk over one local stream per worker (a Unix
+socket, loopback TCP on Windows) that multiplexes all client connections:
+
+    frame  : length:u32 conn:u32 op:u8  body[length]
+
+    OPEN   body = negotiated subprotocol (may be empty)
+    TEXT   body = UTF-8 text frame          (both directions)
+    BINARY body = binary frame              (worker → gateway)
+    CLOSE  body = empty                     (either side hangs up)
+
+On the worker side each connection becomes a :class:`ProxySocket`, which
+quacks like a WebSocket so :func:`rooms.serve_connection` and
+:class:`rooms.Room` run unchanged.
+"""
+from __future__ import annotations
+import asyncio, bisect, hashlib, os, struct, sys, tempfile
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+OPEN, TEXT, BINARY, CLOSE = 1, 2, 3, 4
+
+_HDR = struct.Struct("<IIB")
+MAX_FRAME = 1 << 24
+
+#: Unix sockets where available, loopback TCP otherwise (Windows).
+USE_UNIX = sys.platform != "win32" and hasattr(asyncio, "start_unix_server")
+
+
+# ───────────── consistent hashing ─────────────────────────────
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of room ids onto worker names.
+
+    Each node owns ``replicas`` points on the ring, so adding or removing
+    a worker only moves the rooms that hashed next to its points.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._points: List[Tuple[int, str]] = []
+        self._keys: List[int] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        for i in range(self.replicas):
+            bisect.insort(self._points, (_hash(f"{node}#{i}"), node))
+        self._keys = [h for h, _ in self._points]
+
+    def remove(self, node: str) -> None:
+        self._points = [pt for pt in self._points if pt[1] != node]
+        self._keys = [h for h, _ in self._points]
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted({n for _, n in self._points})
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("hash ring is empty")
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._points[i][1]
+
+
+# ───────────── link framing ───────────────────────────────────
+def write_frame(writer: asyncio.StreamWriter, conn: int, op: int, body: bytes = b"") -> None:
+    writer.writelines((_HDR.pack(len(body), conn, op), body))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """Next ``(conn, op, body)``; raises ``IncompleteReadError`` at EOF."""
+    size, conn, op = _HDR.unpack(await reader.readexactly(_HDR.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"link frame too large ({size} bytes)")
+    return conn, op, await reader.readexactly(size) if size else b""
+
+
+# ───────────── endpoints ──────────────────────────────────────
+def worker_endpoints(n: int, base_port: int = 9700) -> List[str]:
+    """Fresh listen addresses for *n* local workers."""
+    if USE_UNIX:
+        folder = tempfile.mkdtemp(prefix="kfc-workers-")
+        return [f"unix:{os.path.join(folder, f'worker-{i}.sock')}" for i in range(n)]
+    return [f"tcp:127.0.0.1:{base_port + i}" for i in range(n)]
+
+
+def remove_endpoints(endpoints: Iterable[str]) -> None:
+    """Delete the socket files (and their folder) left by :func:`worker_endpoints`."""
+    for ep in endpoints:
+        kind, _, addr = ep.partition(":")
+        if kind == "unix":
+            for path, rm in ((addr, os.unlink), (os.path.dirname(addr), os.rmdir)):
+                try:
+                    rm(path)
+                except OSError:
+                    pass
+
+
+async def serve_link(handler: Callable[..., Awaitable[None]], endpoint: str) -> asyncio.AbstractServer:
+    kind, _, addr = endpoint.partition(":")
+    if kind == "unix":
+        if os.path.exists(addr):
+            os.unlink(addr)
+        return await asyncio.start_unix_server(handler, addr)
+    host, _, port = addr.rpartition(":")
+    return await asyncio.start_server(handler, host, int(port))
+
+
+async def open_link(endpoint: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    kind, _, addr = endpoint.partition(":")
+    if kind == "unix":
+        return await asyncio.open_unix_connection(addr)
+    host, _, port = addr.rpartition(":")
+    return await asyncio.open_connection(host, int(port))
+
+
+# ───────────── worker-side socket stand-in ────────────────────
+class ProxySocket:
+    """One gateway client as seen by a worker.
+
+    Iterating yields the client's text frames (fed by the link reader);
+    :meth:`send` writes a TEXT / BINARY frame back over the shared link.
+    """
+
+    def __init__(self, conn_id: int, subprotocol: Optional[str],
+                 writer: asyncio.StreamWriter) -> None:
+        self.conn_id     = conn_id
+        self.subprotocol = subprotocol or None
+        self.closed      = False
+        self._writer     = writer
+        self._inbox: asyncio.Queue = asyncio.Queue()
+
+    def feed(self, raw: Optional[str]) -> None:
+        """Queue an incoming frame; *None* means the client is gone."""
+        if raw is None:
+            self.closed = True
+        self._inbox.put_nowait(raw)
+
+    def __aiter__(self) -> "ProxySocket":
+        return self
+
+    async def __anext__(self) -> str:
+        raw = await self._inbox.get()
+        if raw is None:
+            raise StopAsyncIteration
+        return raw
+
+    async def send(self, data: Any) -> None:
+        if self.closed or self._writer.is_closing():
+            return
+        if isinstance(data, (bytes, bytearray)):
+            write_frame(self._writer, self.conn_id, BINARY, bytes(data))
+        else:
+            write_frame(self._writer, self.conn_id, TEXT, data.encode("utf-8"))
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        """Hang up from the worker side (the room handler then exits)."""
+        self.feed(None)
@@ -8,7 +8,7 @@ if TYPE_CHECKING:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Board:
     cell_H_pix : int
     cell_W_pix : int
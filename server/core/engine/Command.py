@@ -19,6 +19,7 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 import json, time, copy
 from shared.constants import DIRS
+from core.engine.clock import Clock, WALL
 import time
 
 
@@ -36,9 +37,14 @@ VALID_TYPES = {
 #  Helpers               
 # ---------------------------------------------------------------------------
 
-def _now_ms() -> int:
-    """Current monotonic time in **milliseconds** – handy for stamps."""
-    return int(time.time() * 1000)
+def _now_ms(clock: Optional[Clock] = None) -> int:
+    """*clock*'s time in **milliseconds** (epoch time by default) – handy for stamps."""
+    return (clock or WALL).now_ms()
+
+
+def _stamp(ts: Optional[int], clock: Optional[Clock]) -> int:
+    """*ts* if given (0 is a valid game time), else the clock's time."""
+    return ts if ts is not None else _now_ms(clock)
 
 
 
@@ -76,15 +82,17 @@ class Command:
     # ---------------------------------------------------------------------
     @classmethod
     def move(cls, piece_id: str, from_pos: Tuple[int, int] | str, to_pos: Tuple[int, int] | str,
-             *, player: Optional[str] = None, ts: Optional[int] = None) -> "Command":
+             *, player: Optional[str] = None, ts: Optional[int] = None,
+             clock: Optional[Clock] = None) -> "Command":
         """Create a *Move* command."""
-        return cls(ts or _now_ms(), piece_id, "Move", [from_pos, to_pos], player)
+        return cls(_stamp(ts, clock), piece_id, "Move", [from_pos, to_pos], player)
 
     @classmethod
     def capture(cls, piece_id: str, from_pos: Tuple[int, int] | str, to_pos: Tuple[int, int] | str,
-                captured_id: str, *, player: Optional[str] = None, ts: Optional[int] = None) -> "Command":
+                captured_id: str, *, player: Optional[str] = None, ts: Optional[int] = None,
+                clock: Optional[Clock] = None) -> "Command":
         """Create a *Capture* command."""
-        return cls(ts or _now_ms(), piece_id, "Capture", [from_pos, to_pos, captured_id], player,
+        return cls(_stamp(ts, clock), piece_id, "Capture", [from_pos, to_pos, captured_id], player,
                    metadata={"captured_piece": captured_id})
 
     @classmethod
@@ -93,8 +101,9 @@ class Command:
                             from_pos: Any,
                             to_pos  : Any,
                             timestamp : Optional[int] = None,
-                            player_id : Optional[str] = None) -> "Command":
-        return cls(timestamp or int(time.time()*1000),
+                            player_id : Optional[str] = None,
+                            clock     : Optional[Clock] = None) -> "Command":
+        return cls(_stamp(timestamp, clock),
                    piece_id, "Move",
                    [from_pos, to_pos],
                    player_id,
@@ -107,8 +116,9 @@ class Command:
                                to_pos  : Any,
                                captured_piece_id: str,
                                timestamp : Optional[int] = None,
-                               player_id : Optional[str] = None) -> "Command":
-        return cls(timestamp or int(time.time()*1000),
+                               player_id : Optional[str] = None,
+                               clock     : Optional[Clock] = None) -> "Command":
+        return cls(_stamp(timestamp, clock),
                    piece_id, "Capture",
                    [from_pos, to_pos, captured_piece_id],
                    player_id,
@@ -119,8 +129,9 @@ class Command:
                             piece_id: str,
                             positions: List[Any],
                             timestamp : Optional[int] = None,
-                            player_id : Optional[str] = None) -> "Command":
-        return cls(timestamp or int(time.time()*1000),
+                            player_id : Optional[str] = None,
+                            clock     : Optional[Clock] = None) -> "Command":
+        return cls(_stamp(timestamp, clock),
                    piece_id, "Jump",
                    positions,
                    player_id,
@@ -184,7 +195,7 @@ class Command:
        # {'UP':(-1,0), ...}
 
     @staticmethod
-    def from_key(player: str, key: str, projection: dict):
+    def from_key(player: str, key: str, projection: dict, clock: Optional[Clock] = None):
         """
         Very-minimal conversion of keyboard → Command:
         - WHITE uses ENTER to move pawn forward
@@ -201,7 +212,7 @@ class Command:
                 src = piece.current_state.get_cell()
                 dr  = -1 if player == "WHITE" else +1
                 dst = (src[0] + dr, src[1])
-                ts  = int(time.time()*1000)
+                ts  = _now_ms(clock)
 
                 return Command.create_move_command(
                     piece_id  = piece.piece_id,
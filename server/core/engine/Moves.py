@@ -2,7 +2,12 @@
 from __future__ import annotations
 import pathlib
 from dataclasses import dataclass
-from typing import List, Tuple, Iterable
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Iterable
+
+from core.engine.bitboard import geometry
+
+Cell = Tuple[int, int]
 
 @dataclass(frozen=True)
 class MoveRule:
@@ -13,6 +18,92 @@ class MoveRule:
     def target_cell(self, r: int, c: int) -> Tuple[int, int]:
         return (r + self.dr, c + self.dc)
 
+
+def _rule_ok(rule: MoveRule, capture_only: Optional[bool], first_move: bool) -> bool:
+    if capture_only is True and rule.tag != "capture": return False
+    if capture_only is False and rule.tag == "capture": return False
+    if first_move and rule.tag != "1st": return False
+    return True
+
+
+def _destinations(rules, r: int, c: int, rows: int, cols: int,
+                  capture_only: Optional[bool], first_move: bool) -> List[Cell]:
+    moves = []
+    for rule in rules:
+        if not _rule_ok(rule, capture_only, first_move): continue
+        nr, nc = rule.target_cell(r, c)
+        if 0 <= nr < rows and 0 <= nc < cols:
+            moves.append((nr, nc))
+    return moves
+
+
+class MoveTable:
+    """Destinations of one rule set on one board size, indexed by ``r * cols + c``.
+
+    A rule set is what a piece type + colour boils down to (``invert_y`` is
+    already applied), so every :class:`Moves` of that type and board size –
+    in every room – shares one table via :func:`table_for`.
+    """
+
+    def __init__(self, rules: Tuple[MoveRule, ...], rows: int, cols: int) -> None:
+        self.rules, self.rows, self.cols = rules, rows, cols
+        self._dests: Dict[tuple, List[Tuple[Cell, ...]]] = {}
+        self._masks: Dict[tuple, List[int]] = {}
+
+    def dests(self, capture_only: Optional[bool], first_move: bool) -> List[Tuple[Cell, ...]]:
+        """Per-origin destination tuples for one tag filter (built on first use)."""
+        key = (capture_only, first_move)
+        table = self._dests.get(key)
+        if table is None:
+            table = self._dests[key] = [
+                tuple(_destinations(self.rules, r, c, self.rows, self.cols, capture_only, first_move))
+                for r in range(self.rows) for c in range(self.cols)]
+        return table
+
+    def masks(self, capture_only: Optional[bool], first_move: bool) -> List[int]:
+        key = (capture_only, first_move)
+        table = self._masks.get(key)
+        if table is None:
+            geo   = geometry(self.rows, self.cols)
+            table = self._masks[key] = [geo.mask(d) for d in self.dests(capture_only, first_move)]
+        return table
+
+
+_TABLES: Dict[tuple, MoveTable] = {}
+
+
+def table_for(rules: Iterable[MoveRule], rows: int, cols: int) -> MoveTable:
+    key = (tuple(rules), rows, cols)
+    table = _TABLES.get(key)
+    if table is None:
+        table = _TABLES.setdefault(key, MoveTable(key[0], rows, cols))
+    return table
+
+
+@lru_cache(maxsize=None)
+def _read_rules(txt_path: str, invert_y: bool) -> Tuple[MoveRule, ...]:
+    """Parse a ``moves.txt`` once per process."""
+    rules = []
+    with open(txt_path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            move_part, *tag_part = line.split(":", 1)
+            if "," not in move_part: continue
+            try:
+                dr_txt, dc_txt = move_part.split(",", 1)
+                dr = int(dr_txt.strip())
+
+                dc = int(dc_txt.strip())
+            except ValueError:
+                continue
+            tag = tag_part[0].strip() if tag_part else ""
+            rules.append(MoveRule(dr, dc, tag))
+    if invert_y:
+        rules = [MoveRule(-r.dr, r.dc, r.tag) for r in rules]
+    return tuple(rules)
+
+
 class Moves:
     def __init__(self, txt_path: pathlib.Path | None, board_size: Tuple[int, int], invert_y: bool = False):
         self.rows, self.cols = board_size
@@ -26,44 +117,36 @@ class Moves:
 
 
 
+
     def _load_moves_from_file(self, txt_path: pathlib.Path) -> None:
-        self.rules.clear()
-        with open(txt_path, encoding="utf-8") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line or line.startswith("#"): continue
-                move_part, *tag_part = line.split(":", 1)
-                if "," not in move_part: continue
-                try:
-                    dr_txt, dc_txt = move_part.split(",", 1)
-                    dr = int(dr_txt.strip())
-                    
-                    dc = int(dc_txt.strip())
-                except ValueError:
-                    continue
-                tag = tag_part[0].strip() if tag_part else ""
-                self.rules.append(MoveRule(dr, dc, tag))
-            if self.invert_y:
-                self.rules = [MoveRule(-r.dr, r.dc, r.tag) for r in self.rules]
+        self.rules = list(_read_rules(str(txt_path), self.invert_y))
+
+    # assign a new list to change the rules – the shared table is looked up here
+    @property
+    def rules(self) -> list[MoveRule]:
+        return self._rules
+
+    @rules.setter
+    def rules(self, value: list[MoveRule]) -> None:
+        self._rules = value
+        self._table = table_for(value, self.rows, self.cols)
 
 
     def get_moves(self, r: int, c: int,
                   *, capture_only: bool | None = None,
                      first_move: bool | None = None) -> List[Tuple[int, int]]:
-        def rule_ok(rule: MoveRule) -> bool:
-            if capture_only is True and rule.tag != "capture": return False
-            if capture_only is False and rule.tag == "capture": return False
-            if first_move is True and rule.tag != "1st": return False
-            return True
-
-        moves = []
-        for rule in self.rules:
-            if not rule_ok(rule): continue
-            nr, nc = rule.target_cell(r, c)
-            if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                moves.append((nr, nc))
-        return moves
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            return list(self._table.dests(capture_only, first_move is True)[r * self.cols + c])
+        return _destinations(self.rules, r, c, self.rows, self.cols, capture_only, first_move is True)
+
+    def target_mask(self, r: int, c: int,
+                    *, capture_only: bool | None = None,
+                       first_move: bool | None = None) -> int:
+        """``get_moves`` as a bitboard (see :mod:`engine.bitboard`)."""
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            return self._table.masks(capture_only, first_move is True)[r * self.cols + c]
+        return geometry(self.rows, self.cols).mask(
+            self.get_moves(r, c, capture_only=capture_only, first_move=first_move))
 
     def iter_rules(self) -> Iterable[MoveRule]:
         return iter(self.rules)
-
@@ -1,6 +1,9 @@
 """Finite-state-machine node for a single piece animation / behaviour."""
 from __future__ import annotations
-from typing import Dict, Optional, Sequence
+from collections.abc import MutableMapping
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Optional, Sequence
 
 from core.engine.Command import Command
 from core.engine.Moves   import Moves
@@ -28,9 +31,133 @@ def _bus(state):
     return getattr(game, "bus", None)
 
 
+# --------------------------------------------------------------------- specs
+@dataclass(frozen=True, eq=False, slots=True)
+class StateSpec:
+    """Immutable part of a state – shared by every piece of a type, in every room."""
+    state_name:       str
+    moves:            Moves
+    cfg:              Mapping
+    min_duration_ms:  int
+    next_state_name:  str
+    transitions:      Mapping[str, str]          # event → target state name
+    physics_cls:      type
+    speed_multiplier: float = 1.0
+    can_be_captured:  bool = True
+    can_capture:      bool = True
+    graphics:         object = None              # template, copied per state
+
+    @classmethod
+    def of(cls, st: "State") -> "StateSpec":
+        """Freeze a fully wired template state."""
+        ph = st.physics
+        return cls(st.state_name, st.moves, MappingProxyType(dict(st.cfg)),
+                   st.min_duration_ms, st.next_state_name,
+                   MappingProxyType({ev: tgt.state_name for ev, tgt in st.transitions.items()}),
+                   type(ph), getattr(ph, "speed_multiplier", 1.0),
+                   ph.can_be_captured(), ph.can_capture(), st.graphics)
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class MachineSpec:
+    """All state specs of one piece type plus the state a piece starts in."""
+    root:   str
+    states: Mapping[str, StateSpec]
+
+    @classmethod
+    def of(cls, root: "State") -> "MachineSpec":
+        states: Dict[str, StateSpec] = {}
+        todo = [root]
+        while todo:
+            st = todo.pop()
+            if st.state_name not in states:
+                states[st.state_name] = StateSpec.of(st)
+                todo.extend(st.transitions.values())
+        return cls(root.state_name, MappingProxyType(states))
+
+
+class Machine:
+    """Per-piece runtime record: the shared specs, the board, and the states
+    this piece has actually entered (built on first use)."""
+    __slots__ = ("spec", "board", "piece_id", "states")
+
+    def __init__(self, spec: MachineSpec, board, piece_id: Optional[str] = None) -> None:
+        self.spec     = spec
+        self.board    = board
+        self.piece_id = piece_id
+        self.states: Dict[str, "State"] = {}
+
+    def state(self, name: str) -> "State":
+        st = self.states.get(name)
+        if st is None:
+            spec = self.spec.states[name]
+            phys = spec.physics_cls((0, 0), self.board, spec.speed_multiplier)
+            phys.set_capturable(spec.can_be_captured)
+            phys.set_can_capture(spec.can_capture)
+            gfx = spec.graphics.copy() if spec.graphics else None
+            st  = self.states[name] = State._from_spec(spec, gfx, phys, self)
+            st.piece_id = self.piece_id
+        return st
+
+    def root(self) -> "State":
+        return self.state(self.spec.root)
+
+
+class _Transitions(MutableMapping):
+    """``State.transitions`` of a machine state: targets resolve on first access."""
+    __slots__ = ("_st",)
+
+    def __init__(self, st: "State") -> None:
+        self._st = st
+
+    def __getitem__(self, ev: str) -> "State":
+        st = self._st
+        if ev in st._links:
+            return st._links[ev]
+        return st.machine.state(st.spec.transitions[ev])
+
+    def __setitem__(self, ev: str, target: "State") -> None:
+        self._st._links[ev] = target
+
+    def __delitem__(self, ev: str) -> None:
+        del self._st._links[ev]
+
+    def __contains__(self, ev) -> bool:
+        return ev in self._st._links or ev in self._st.spec.transitions
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._st.spec.transitions
+        yield from (ev for ev in self._st._links if ev not in self._st.spec.transitions)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _spec_field(name: str) -> property:
+    """Read from the spec; a write replaces this state's spec only."""
+    def get(self):
+        return getattr(self.spec, name)
+
+    def set(self, value):
+        self.spec = replace(self.spec, **{name: value})
+    return property(get, set)
+
+
 # --------------------------------------------------------------------- State
 class State:
-    """A single node in the per-piece FSM."""
+    """A single node in the per-piece FSM.
+
+    The immutable part lives in :attr:`spec` (:class:`StateSpec`); a state only
+    owns its runtime fields – physics, graphics, piece id and timing.
+    """
+    __slots__ = ("spec", "machine", "physics", "graphics", "piece_id", "_links",
+                 "current_command", "state_start_time")
+
+    cfg             = _spec_field("cfg")
+    moves           = _spec_field("moves")
+    state_name      = _spec_field("state_name")
+    min_duration_ms = _spec_field("min_duration_ms")
+    next_state_name = _spec_field("next_state_name")
 
     def __init__(
         self,
@@ -41,19 +168,14 @@ class State:
     ) -> None:
 
         cfg = cfg or {}
-        self.cfg = cfg
-
-        self.moves, self.physics = moves, physics
+        self.physics  = physics
         self.graphics = graphics or Graphics()
 
-        self.state_name      = cfg.get("state_name", "idle")
-        self.piece_id: Optional[str] = None
-
-        rest_dur = {"short_rest": SHORT_REST_MS, "long_rest": LONG_REST_MS}
-        self.min_duration_ms  = rest_dur.get(self.state_name, cfg.get("min_duration_ms", 0))
-        self.next_state_name  = cfg.get("physics", {}).get("next_state_when_finished", "")
-        if self.next_state_name == self.state_name:
-            self.next_state_name = ""
+        state_name = cfg.get("state_name", "idle")
+        rest_dur   = {"short_rest": SHORT_REST_MS, "long_rest": LONG_REST_MS}
+        next_name  = cfg.get("physics", {}).get("next_state_when_finished", "")
+        if next_name == state_name:
+            next_name = ""
 
         # physics tweaks
         spd = cfg.get("physics", {}).get("speed_m_per_sec")
@@ -70,12 +192,30 @@ class State:
         if self.graphics:   
             self.graphics.loop = cfg.get("graphics", {}).get("is_loop", cfg.get("graphics", {}).get("loop", True))
 
-
-        # runtime fields
-        self.transitions : Dict[str, "State"] = {}
+        self.spec = StateSpec(state_name, moves, cfg,
+                              rest_dur.get(state_name, cfg.get("min_duration_ms", 0)),
+                              next_name, {}, type(physics))
+        self.machine: Optional[Machine] = None
+        self._init_runtime()
+
+    @classmethod
+    def _from_spec(cls, spec: StateSpec, graphics, physics: Physics, machine: Machine) -> "State":
+        st = cls.__new__(cls)
+        st.spec, st.machine = spec, machine
+        st.physics, st.graphics = physics, graphics
+        st._init_runtime()
+        return st
+
+    def _init_runtime(self) -> None:
+        self.piece_id: Optional[str] = None
+        self._links: Dict[str, "State"] = {}        # transitions added at runtime
         self.current_command : Command | None = None
         self.state_start_time: int | None = None
 
+    @property
+    def transitions(self) -> MutableMapping:
+        return self._links if self.machine is None else _Transitions(self)
+
     # ------------------------------------------------ deep-copy
     def _clone(self, memo: Dict[int, "State"]) -> "State":
         if id(self) in memo:
@@ -88,7 +228,7 @@ class State:
         phys_new.set_can_capture(self.physics.can_capture())
 
         graphics_copy = self.graphics.copy() if self.graphics else None
-        new = State(self.moves, graphics_copy, phys_new, self.cfg.copy())
+        new = State(self.moves, graphics_copy, phys_new, dict(self.cfg))
         memo[id(self)] = new
 
         new.next_state_name = self.next_state_name
@@ -97,6 +237,8 @@ class State:
         return new
 
     def copy(self) -> "State":
+        if self.machine is not None:            # a fresh runtime on the same specs
+            return Machine(self.machine.spec, self.machine.board, self.piece_id).state(self.state_name)
         return self._clone({})
 
     # ------------------------------------------------ transitions
@@ -0,0 +1,105 @@
+# ============================ bitboard.py ============================
+"""Bitboards – a set of cells as one Python int, bit ``r * cols + c``.
+
+On the default 8×8 board every mask fits in 64 bits; bigger boards simply
+use wider ints.  :class:`Geometry` holds the tables for one board size
+(direction rays, stepped-over paths) and is shared by every game of that
+size through :func:`geometry`.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# rook + bishop directions (dr, dc)
+DIRECTIONS: Tuple[Cell, ...] = ((-1, 0), (1, 0), (0, -1), (0, 1),
+                                (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def stepped_cells(src: Cell, dst: Cell) -> List[Cell]:
+    """Cells passed on the way from *src* to *dst*, stepping by the sign of
+    each delta – the walk ``Piece._is_path_blocked`` has always done."""
+    dr, dc = dst[0] - src[0], dst[1] - src[1]
+    steps  = max(abs(dr), abs(dc))
+    sr, sc = (dr > 0) - (dr < 0), (dc > 0) - (dc < 0)
+    return [(src[0] + sr * k, src[1] + sc * k) for k in range(1, steps)]
+
+
+class Geometry:
+    """Masks and lookup tables for a ``rows × cols`` board."""
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self.rows, self.cols = rows, cols
+        self.size  = rows * cols
+        self.full  = (1 << self.size) - 1
+        # rays[d][sq] – every cell from sq (exclusive) to the edge in direction d
+        self.rays: Dict[Cell, List[int]] = {d: [self._ray(sq, d) for sq in range(self.size)]
+                                            for d in DIRECTIONS}
+        self._paths: Dict[Tuple[Cell, Cell], int] = {}
+
+    # ------------------------------------------------ cells ↔ bits
+    def on_board(self, r: int, c: int) -> bool:
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def index(self, cell: Cell) -> Optional[int]:
+        r, c = cell
+        return r * self.cols + c if self.on_board(r, c) else None
+
+    def bit(self, cell: Cell) -> int:
+        """Single-cell mask (0 for a cell off the board)."""
+        r, c = cell
+        return 1 << (r * self.cols + c) if self.on_board(r, c) else 0
+
+    def mask(self, cells: Iterable[Cell]) -> int:
+        m = 0
+        for cell in cells:
+            m |= self.bit(cell)
+        return m
+
+    def cells(self, mask: int) -> Iterator[Cell]:
+        """Cells of *mask*, lowest bit first."""
+        while mask:
+            low = mask & -mask
+            yield divmod(low.bit_length() - 1, self.cols)
+            mask ^= low
+
+    # ------------------------------------------------ precomputed masks
+    def _ray(self, sq: int, d: Cell) -> int:
+        r, c = divmod(sq, self.cols)
+        m = 0
+        r, c = r + d[0], c + d[1]
+        while self.on_board(r, c):
+            m |= 1 << (r * self.cols + c)
+            r, c = r + d[0], c + d[1]
+        return m
+
+    def path(self, src: Cell, dst: Cell) -> int:
+        """Mask of :func:`stepped_cells` (cached per pair)."""
+        key = (tuple(src), tuple(dst))
+        m = self._paths.get(key)
+        if m is None:
+            m = self._paths[key] = self.mask(stepped_cells(*key))
+        return m
+
+    def slide(self, cell: Cell, occupied: int, directions: Iterable[Cell] = DIRECTIONS) -> int:
+        """Cells a slider on *cell* reaches, up to and including the first blocker."""
+        sq = self.index(cell)
+        if sq is None:
+            return 0
+        reach = 0
+        for d in directions:
+            ray      = self.rays[d][sq]
+            blockers = ray & occupied
+            if blockers:
+                # nearest blocker: lowest bit on rays towards higher indices
+                first = ((blockers & -blockers).bit_length() - 1
+                         if d[0] * self.cols + d[1] > 0 else blockers.bit_length() - 1)
+                ray  ^= self.rays[d][first]
+            reach |= ray
+        return reach
+
+
+@lru_cache(maxsize=None)
+def geometry(rows: int, cols: int) -> Geometry:
+    return Geometry(rows, cols)
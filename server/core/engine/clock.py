@@ -0,0 +1,80 @@
+"""Clock – where the engine gets "now" from.
+
+Nothing below :class:`core.game.game.Game` reads the time by itself:
+``State``, the physics models and ``Piece`` are pure functions of the
+``now_ms`` they are handed.  ``Game`` asks its clock (``Game.clock``) and
+passes the answer down, and :class:`core.engine.Command.Command` helpers ask
+the clock they are given when no timestamp is supplied.
+
+▶  Two implementations
+
+    RealClock()        # time.monotonic, in ms – the default for a Game
+    VirtualClock(0)    # moves only when told to – tests, bots, simulations
+
+    clock = VirtualClock()
+    game  = Game(pieces, board, clock=clock)
+    clock.advance(16)  # one frame later, without waiting for it
+
+``sleep`` is part of the interface so that loops pacing themselves on the
+clock (``Game.run``) run as fast as the CPU allows under a virtual clock.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Protocol
+
+
+class Clock(Protocol):
+    def now_ms(self) -> int: ...
+    def sleep(self, seconds: float) -> None: ...
+
+
+# ---------------------------------------------------------------------------
+#  Real time
+# ---------------------------------------------------------------------------
+
+class RealClock:
+    """Milliseconds of *source* (seconds, ``time.monotonic`` by default)."""
+
+    __slots__ = ("source",)
+
+    def __init__(self, source: Callable[[], float] = time.monotonic) -> None:
+        self.source = source
+
+    def now_ms(self) -> int:
+        return int(self.source() * 1000)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+#: the game clock of every ``Game`` built without one
+MONOTONIC = RealClock()
+#: epoch milliseconds – the default for ``Command`` timestamps
+WALL      = RealClock(time.time)
+
+
+# ---------------------------------------------------------------------------
+#  Virtual time
+# ---------------------------------------------------------------------------
+
+class VirtualClock:
+    """A clock that only moves through :meth:`advance` / :meth:`sleep`."""
+
+    __slots__ = ("_now",)
+
+    def __init__(self, start_ms: int = 0) -> None:
+        self._now = int(start_ms)
+
+    def now_ms(self) -> int:
+        return self._now
+
+    def advance(self, ms: int) -> int:
+        """Move forward by *ms* (≥ 0) and return the new time."""
+        if ms < 0:
+            raise ValueError("a clock does not run backwards")
+        self._now += int(ms)
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(round(seconds * 1000))
@@ -15,22 +15,22 @@ class EventBus:
             cb(event)
 
 # -------- basic events--------
-@dataclass
+@dataclass(slots=True)
 class MovePlayed:  time_ms: int; move: str; color: str
-@dataclass
+@dataclass(slots=True)
 class PieceTaken:
     piece_id: str
     cell: tuple[int, int]
     by_color: str
     value: int         # ← הוספה!
-@dataclass
+@dataclass(slots=True)
 class JumpPlayed:  time_ms: int; color: str
-@dataclass
+@dataclass(slots=True)
 class ErrorPlayed: time_ms: int; reason: str; piece: str
-@dataclass
+@dataclass(slots=True)
 class GameStarted: white: str;   black: str
-@dataclass
+@dataclass(slots=True)
 class GameEnded:   winner: str | None
 
-@dataclass
+@dataclass(slots=True)
 class StateChanged:  piece_id:  str;  new_state:  str; timestamp:  int   
\ No newline at end of file
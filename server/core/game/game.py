@@ -6,15 +6,21 @@ from typing         import List, Optional
 from core.engine.Board   import Board
 from core.pieces.Piece   import Piece
 from core.engine.Command import Command
+from core.engine.clock   import Clock, MONOTONIC
 from core.engine.events  import EventBus, GameStarted, GameEnded,PieceTaken,ErrorPlayed
+from core.engine.bitboard import geometry
+from core.game.occupancy import Occupancy
 from client.graphics.img   import Img
 from pathlib        import Path
 import cv2
 from shared.constants import PIECE_VALUE,DIRS
+from shared import slog
 from pathlib        import Path
 
 ...
 
+_log = slog.get_logger("game")
+
 
 # ---------------------------------------------------------------------------
 class Game:
@@ -22,7 +28,11 @@ class Game:
     Main game controller: coordinates all game logic, input, events, and UI updates.
     """
 
-    def __init__(self, pieces: List[Piece], board: Board):
+    #: ms between the king's capture and :meth:`_is_win` returning True
+    WIN_GRACE_MS = 2000
+
+    def __init__(self, pieces: List[Piece], board: Board, clock: Optional[Clock] = None):
+        self.clock   = clock or MONOTONIC          # a VirtualClock runs faster than real time
         self.pieces  = pieces
         self.board   = board
         self.background_img = None
@@ -41,6 +51,7 @@ class Game:
 
         self.white_pieces = [p for p in pieces if self._is_white_piece(p)]
         self.black_pieces = [p for p in pieces if self._is_black_piece(p)]
+        self.occupancy    = Occupancy(self.pieces, self._color_by_team, self._geometry())
         self.white_king   = next(p for p in self.white_pieces if p.piece_id.startswith("K"))
         self.black_king   = next(p for p in self.black_pieces if p.piece_id.startswith("K"))
 
@@ -49,7 +60,7 @@ class Game:
 
         self.move_history = {"WHITE": [], "BLACK": []}
         self.command_history = []
-        self.game_start_ms = int(time.time() * 1000)
+        self.game_start_ms = self.game_time_ms()
 
         self.future_cells: dict[tuple[int,int], dict] = {}
 
@@ -59,10 +70,59 @@ class Game:
         self.bus = EventBus()
         # from client.ui.move_log_ui import MoveLogUI
 
-        print(f"Game initialized – {len(pieces)} total pieces")
+        _log.info("initialized", pieces=len(pieces))
         self.bus.publish(GameStarted("White", "Black"))
 
 
+    # ─── piece lists (kept in sync with the occupancy index) ───────────────
+
+    @property
+    def pieces(self) -> List[Piece]:
+        return self._pieces
+
+    @pieces.setter
+    def pieces(self, value: List[Piece]) -> None:
+        self._pieces = value
+        occ = self.__dict__.get("occupancy")
+        if occ is not None:
+            occ.rebuild(value, self._color_by_team)
+
+    @property
+    def white_pieces(self) -> List[Piece]:
+        return self._white_pieces
+
+    @white_pieces.setter
+    def white_pieces(self, value: List[Piece]) -> None:
+        self._white_pieces = value
+        self._recolor()
+
+    @property
+    def black_pieces(self) -> List[Piece]:
+        return self._black_pieces
+
+    @black_pieces.setter
+    def black_pieces(self, value: List[Piece]) -> None:
+        self._black_pieces = value
+        self._recolor()
+
+    def _recolor(self) -> None:
+        occ = self.__dict__.get("occupancy")
+        if occ is not None:
+            occ.set_colors(self._pieces, self._color_by_team)
+
+    def _geometry(self):
+        rows, cols = getattr(self.board, "H_cells", None), getattr(self.board, "W_cells", None)
+        if isinstance(rows, int) and isinstance(cols, int):
+            return geometry(rows, cols)
+        return None
+
+    def _color_by_team(self, piece: Piece) -> Optional[str]:
+        if piece in self.__dict__.get("_white_pieces", ()):
+            return "WHITE"
+        if piece in self.__dict__.get("_black_pieces", ()):
+            return "BLACK"
+        return None
+
     # ─── basic helpers (unchanged) ────────────────────────────────────────
 
     def _is_white_piece(self, piece: Piece) -> bool:
@@ -79,7 +139,7 @@ class Game:
         return not self._is_white_piece(piece)
 
     def game_time_ms(self) -> int:
-        return int(time.monotonic() * 1000)
+        return self.clock.now_ms()
 
     def clone_board(self) -> Board:
         return self.board.clone()
@@ -92,6 +152,21 @@ class Game:
         for p in self.pieces:
             p.reset(start_ms)
 
+    def simulate(self, ms: int, step_ms: int = 16) -> bool:
+        """Run *ms* of game time headless (pieces, collisions, win check),
+        *step_ms* per frame.  With a :class:`VirtualClock` this takes as long
+        as the computation does.  True once :meth:`_is_win` ends the game."""
+        end = self.game_time_ms() + ms
+        while self.game_time_ms() < end:
+            self.clock.sleep(min(step_ms, end - self.game_time_ms()) / 1000)
+            now = self.game_time_ms()
+            for p in self.pieces:
+                p.update(now)
+            self._resolve_collisions()
+            if self._is_win():
+                return True
+        return False
+
 
     def _is_blocked_by_ally(self, piece: Piece) -> bool:
         if getattr(piece, "can_jump_over_allies", False):
@@ -101,6 +176,10 @@ class Game:
             return False
 
         path = piece.current_state.physics._path
+        occ = self.occupancy
+        if occ is not None:
+            return occ.ally_on_any(piece, path[1:])
+
         my_team = self.white_pieces if piece in self.white_pieces else self.black_pieces
         allies_cells = {ally.get_cell() for ally in my_team if ally != piece and not ally.is_captured}
 
@@ -140,7 +219,7 @@ class Game:
                 break
 
             self._resolve_collisions()
-            time.sleep(0.016)
+            self.clock.sleep(0.016)
 
         self._announce_win()
         cv2.destroyAllWindows()
@@ -157,6 +236,8 @@ class Game:
             self.black_last_dir = (dr, dc)
 
     def _piece_at(self, r: int, c: int) -> Piece | None:
+        if self.occupancy is not None:
+            return self.occupancy.at((r, c))
         return next((p for p in self.pieces
                      if (not p.is_captured) and
                         p.current_state.physics.get_current_cell() == (r, c)), None)
@@ -204,13 +285,13 @@ class Game:
                 timestamp = now,
                 player_id = player,
             )
-            print(f"Player {player} issued vertical JUMP: {cmd}")
+            _log.debug("jump", player=player, piece=cmd.piece_id, cell=from_cell)
             if from_piece.on_command(cmd, now, self):
                 self._record_move(player, cmd)
                 self.command_history = getattr(self, "command_history", [])
                 self.command_history.append(cmd)
             else:
-                print(f"Illegal jump command from {from_cell} to {dest}")
+                _log.debug("illegal_jump", player=player, src=from_cell, dst=dest)
                 self.bus.publish(ErrorPlayed(now, "illegal jump", from_piece.piece_id))
 
             self.command_history.append(cmd)
@@ -245,7 +326,7 @@ class Game:
 
         if reservation and reservation["player"] == player:
             self.bus.publish(ErrorPlayed(now, "blocked mid-path", from_piece.piece_id))
-            print(f"Player {player} already reserved {dest} for {reservation['piece_id']}")
+            _log.debug("already_reserved", player=player, dst=dest, piece=reservation["piece_id"])
             return  # already reserved by same player
 
 
@@ -261,7 +342,7 @@ class Game:
 
         self.future_cells[dest] = {"piece_id": from_piece.piece_id, "player": player}
 
-        print(f"Player {player} issued command: {cmd}")  
+        _log.debug("command", player=player, piece=cmd.piece_id, src=from_cell, dst=dest)
         executed = from_piece.on_command(cmd, now, self)
 
         if executed:
@@ -278,17 +359,26 @@ class Game:
   
     def _resolve_collisions(self):
         """Check for collisions on same cells, resolve by arrival time."""
-        collisions = {}
-        for piece in self.pieces:
-            if piece.is_captured or piece.current_state.physics.is_jumping:
-                continue
-            cell = piece.current_state.get_cell()
-            collisions.setdefault(cell, []).append(piece)
-
-        for pieces_in_cell in collisions.values():
+        occ = self.occupancy
+        if occ is not None:
+            # only cells the index knows to hold two or more pieces
+            groups = [[p for p in occ.pieces_at(cell) if not p.current_state.physics.is_jumping]
+                      for cell in list(occ.crowded)]
+            color = occ.color_of
+        else:
+            collisions = {}
+            for piece in self.pieces:
+                if piece.is_captured or piece.current_state.physics.is_jumping:
+                    continue
+                cell = piece.current_state.get_cell()
+                collisions.setdefault(cell, []).append(piece)
+            groups = list(collisions.values())
+            color = self._color_by_team
+
+        for pieces_in_cell in groups:
             if len(pieces_in_cell) <= 1:
                 continue
-            colors = {"WHITE" if p in self.white_pieces else "BLACK" for p in pieces_in_cell}
+            colors = {color(p) for p in pieces_in_cell}
             if len(colors) == 1:
                 continue
             pieces_in_cell.sort(
@@ -297,16 +387,17 @@ class Game:
             )
             winner = pieces_in_cell[0]
             for loser in pieces_in_cell[1:]:
-                if (winner in self.white_pieces and loser in self.black_pieces) or \
-                   (winner in self.black_pieces and loser in self.white_pieces):
+                if None not in (color(winner), color(loser)) and color(winner) != color(loser):
                     loser.is_captured = True
+                    if occ is not None:
+                        occ.remove(loser)
                     cell = loser.current_state.get_cell()
                     # שחרור הזמנות
                     self.future_cells = {
                         c: r for c, r in self.future_cells.items()
                         if r["piece_id"] != loser.piece_id
                     }
-                    by_color = "WHITE" if winner in self.white_pieces else "BLACK"
+                    by_color = color(winner)
                     value = PIECE_VALUE.get(loser.piece_id[0].upper(), 0)
                     self.bus.publish(PieceTaken(loser.piece_id, cell, by_color, value))
                     # הוספת לוג
@@ -339,12 +430,12 @@ class Game:
                 winner = "BLACK" if captured_color == "WHITE" else "WHITE"
                 if not hasattr(self, "_win_timer_ms"):
                     self._win_timer_ms = self.game_time_ms()
-                    print(f"{captured_color} king captured – {winner} wins (finishing in 2s)…")
+                    _log.info("king_captured", color=captured_color, winner=winner)
                     # ✅ publish the WINNER
                     self.bus.publish(GameEnded(winner))
                     return False
                 # grace period for final animations / network delivery
-                if self.game_time_ms() - self._win_timer_ms > 2000:
+                if self.game_time_ms() - self._win_timer_ms > self.WIN_GRACE_MS:
                     return True
                 return False
         return False
@@ -358,15 +449,15 @@ class Game:
         white_alive = self.get_white_alive_pieces()
         black_alive = self.get_black_alive_pieces()
         if not white_alive and black_alive:
-            print(" Black wins!")
+            _log.info("game_over", winner="BLACK")
         elif not black_alive and white_alive:
             self.bus.publish(GameEnded('WHITE'))
-            print(" White wins!")
+            _log.info("game_over", winner="WHITE")
         elif not white_alive and not black_alive:
-            print(" Draw – no winner!")
+            _log.info("game_over", winner=None)
         else:
             self.bus.publish(GameEnded('the game ended'))
-            print(" Game ended")
+            _log.info("game_over", winner="the game ended")
 
     # ─── move‑history hook -------------------------------------------------
     def _record_move(self, player: str, cmd: Command):
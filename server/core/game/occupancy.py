@@ -0,0 +1,152 @@
+"""Incremental cell → piece index (plus piece → colour) for :class:`Game`.
+
+Every board query used to scan ``game.pieces``; the index is instead kept
+up to date where cells actually change – ``Piece.update`` / ``Piece.reset``
+re-file the piece, a capture removes it – so lookups are dictionary hits.
+Lookups still skip captured pieces, so a flag flipped elsewhere never
+returns a ghost.
+
+Given the board :class:`~engine.bitboard.Geometry` the index also keeps one
+bitboard per colour, so path and ally checks start with a single ``&``;
+a hit is then confirmed against the cell lists.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.engine.bitboard import Geometry, stepped_cells
+
+Cell = Tuple[int, int]
+
+
+def _cell(piece) -> Cell:
+    return tuple(piece.current_state.physics.get_current_cell())
+
+
+class Occupancy:
+    """``cell → [pieces]`` for live pieces, in ``game.pieces`` order."""
+
+    def __init__(self, pieces: Iterable[Any], color_of: Callable[[Any], Optional[str]],
+                 geometry: Optional[Geometry] = None) -> None:
+        self.geometry = geometry
+        self.rebuild(pieces, color_of)
+
+    # ------------------------------------------------ (re)building
+    def rebuild(self, pieces: Iterable[Any], color_of: Callable[[Any], Optional[str]]) -> None:
+        pieces = list(pieces)
+        self._order: Dict[Any, int]        = {p: i for i, p in enumerate(pieces)}
+        self._cell_of: Dict[Any, Cell]     = {}
+        self._by_cell: Dict[Cell, List[Any]] = {}
+        self.crowded: Set[Cell]            = set()     # cells holding ≥ 2 pieces
+        self.bits: Dict[Optional[str], int] = {}       # colour → bitboard
+        self.occupied                      = 0
+        self.set_colors(pieces, color_of)
+        for p in pieces:
+            if not p.is_captured:
+                self._place(p, _cell(p))
+
+    def set_colors(self, pieces: Iterable[Any], color_of: Callable[[Any], Optional[str]]) -> None:
+        self.color: Dict[Any, Optional[str]] = {p: color_of(p) for p in pieces}
+        self.bits, self.occupied = {}, 0
+        for piece, cell in self._cell_of.items():
+            self._set_bit(piece, cell)
+
+    # ------------------------------------------------ updates
+    def move(self, piece) -> None:
+        """Re-file *piece* after its cell (or captured flag) may have changed."""
+        if piece not in self._order:
+            return
+        if piece.is_captured:
+            self._lift(piece)
+            return
+        cell = _cell(piece)
+        if self._cell_of.get(piece) != cell:
+            self._lift(piece)
+            self._place(piece, cell)
+
+    def remove(self, piece) -> None:
+        self._lift(piece)
+
+    def _place(self, piece, cell: Cell) -> None:
+        here = self._by_cell.setdefault(cell, [])
+        here.append(piece)
+        if len(here) > 1:
+            here.sort(key=self._order.__getitem__)
+            self.crowded.add(cell)
+        self._cell_of[piece] = cell
+        self._set_bit(piece, cell)
+
+    def _lift(self, piece) -> None:
+        cell = self._cell_of.pop(piece, None)
+        if cell is None:
+            return
+        here = self._by_cell[cell]
+        here.remove(piece)
+        if not here:
+            del self._by_cell[cell]
+        if len(here) < 2:
+            self.crowded.discard(cell)
+        if self.geometry is not None:
+            b, mine = self.geometry.bit(cell), self.color.get(piece)
+            if not here:
+                self.occupied &= ~b
+            if not any(self.color.get(p) == mine for p in here):
+                self.bits[mine] = self.bits.get(mine, 0) & ~b
+
+    def _set_bit(self, piece, cell: Cell) -> None:
+        if self.geometry is not None:
+            b = self.geometry.bit(cell)
+            mine = self.color.get(piece)
+            self.bits[mine] = self.bits.get(mine, 0) | b
+            self.occupied |= b
+
+    # ------------------------------------------------ queries
+    def pieces_at(self, cell: Cell) -> List[Any]:
+        return [p for p in self._by_cell.get(cell, ()) if not p.is_captured]
+
+    def at(self, cell: Cell):
+        """First live piece on *cell* (``None`` when empty)."""
+        for p in self._by_cell.get(cell, ()):
+            if not p.is_captured:
+                return p
+        return None
+
+    def color_of(self, piece) -> Optional[str]:
+        return self.color.get(piece)
+
+    def has_ally(self, piece, cell: Cell) -> bool:
+        """Is a live piece of *piece*'s colour (other than itself) on *cell*?"""
+        mine = self.color.get(piece)
+        if self.geometry is not None and not self.bits.get(mine, 0) & self.geometry.bit(cell):
+            return False
+        return any(p is not piece and self.color.get(p) == mine for p in self.pieces_at(cell))
+
+    def ally_on_any(self, piece, cells: Iterable[Cell]) -> bool:
+        cells = list(cells)
+        if self.geometry is not None and not (self.bits.get(self.color.get(piece), 0)
+                                              & self.geometry.mask(cells)):
+            return False
+        return any(self.has_ally(piece, cell) for cell in cells)
+
+    def path_blocked(self, piece, src: Cell, dst: Cell) -> bool:
+        """Does any live piece other than *piece* stand on a cell passed from *src* to *dst*?"""
+        if self.geometry is None:
+            cells: Iterable[Cell] = stepped_cells(src, dst)
+        else:
+            hits = self.occupied & self.geometry.path(src, dst)
+            if not hits:
+                return False
+            cells = self.geometry.cells(hits)
+        return any(p is not piece for cell in cells for p in self.pieces_at(cell))
+
+    def reachable(self, piece, src: Cell) -> int:
+        """Bitboard of Move targets from *src*: in the move table, no ally on the
+        target and (unless the piece jumps over allies) nothing on the way."""
+        geo     = self.geometry
+        targets = piece.moves.target_mask(*src) & ~self.bits.get(self.color.get(piece), 0)
+        if getattr(piece, "can_jump_over_allies", False):
+            return targets
+        reach = 0
+        for cell in geo.cells(targets):
+            if not self.occupied & geo.path(src, cell):
+                reach |= geo.bit(cell)
+        return reach
@@ -10,6 +10,9 @@ class Physics(ABC):
     """
     SLIDE_CELLS_PER_SEC = 4.0
 
+    __slots__ = ("start_cell", "board", "speed_multiplier",
+                 "_can_be_captured", "_can_capture", "current_command")
+
     def __init__(self,
                  start_cell: Tuple[int, int],
                  board: Board,
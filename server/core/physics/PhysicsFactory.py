@@ -3,6 +3,9 @@ from core.physics.idle_physics import IdlePhysics
 from core.physics.slide_physics import SlidePhysics
 from typing import Tuple
 from core.engine.Board import Board
+from shared import slog
+
+_log = slog.get_logger("physics")
 
 class PhysicsFactory:
     """
@@ -39,5 +42,5 @@ class PhysicsFactory:
         phys.set_capturable(capturable)
         phys.set_can_capture(can_capture)
 
-        print(f"[PhysicsFactory] {state_name}: {phys.__class__.__name__}")
+        _log.debug("created", state=state_name, physics=phys.__class__.__name__)
         return phys
@@ -5,6 +5,8 @@ class IdlePhysics(Physics):
     """
     Physics model for stationary states (e.g., idle or rest).
     """
+    __slots__ = ("current_cell", "current_pixel_pos", "_moving", "is_jumping", "start_time_ms")
+
     def __init__(self, start_cell, board, speed_m_s: float = 1.0):
         super().__init__(start_cell, board, speed_m_s)
         self.current_cell      = start_cell
@@ -7,6 +7,9 @@ class SlidePhysics(Physics):
     """
     Physics model for sliding movements between cells.
     """
+    __slots__ = ("current_cell", "target_cell", "current_pixel_pos", "start_time_ms",
+                 "arrival_time_ms", "_moving", "_cmd", "is_jumping", "_path", "_path_idx")
+
     def __init__(self, start_cell, board, speed_m_s=1.0):
         super().__init__(start_cell, board, speed_m_s)
         self.current_cell = self.target_cell = start_cell
@@ -6,6 +6,7 @@ from core.engine.Command import Command
 from core.pieces.Piece   import Piece
 from core.engine.events  import MovePlayed, ErrorPlayed, JumpPlayed
 from core.game.move_history import notation_from_cmd
+from core.game.occupancy import Occupancy
 
 # Movement tags used in moves.txt to classify pawn movement types
 TAG_FWD        = {"f", "non_capture", ""}
@@ -22,6 +23,8 @@ class Pawn(Piece):
     * forward = -1  → השחור מתקדם כלפי-מעלה
     """
 
+    __slots__ = ("forward", "has_moved")
+
     # ───────────────────────── ctor ────────────────────────────────
     def __init__(self, *args, forward: int, **kwargs):
         super().__init__(*args, **kwargs)
@@ -49,6 +52,9 @@ class Pawn(Piece):
         """
         r0, c0 = from_cell
         legal: List[Tuple[int, int]] = []
+        occ = getattr(game, "occupancy", None)
+        if not isinstance(occ, Occupancy):
+            occ = None
 
         for rule in self.moves.rules:
             dr, dc, tag = rule.dr, rule.dc, rule.tag.lower()
@@ -61,14 +67,19 @@ class Pawn(Piece):
             empty = piece is None
 
             # Determine if the piece (if any) שייך ליריב
-            is_enemy = (
-                piece is not None
-                and (
-                    (self in game.white_pieces and piece in game.black_pieces) or
-                    (self in game.black_pieces and piece in game.white_pieces)
+            if occ is not None:
+                mine, theirs = occ.color_of(self), piece and occ.color_of(piece)
+                is_enemy = bool(piece is not None and mine and theirs and mine != theirs
+                                and not piece.is_captured)
+            else:
+                is_enemy = (
+                    piece is not None
+                    and (
+                        (self in game.white_pieces and piece in game.black_pieces) or
+                        (self in game.black_pieces and piece in game.white_pieces)
+                    )
+                    and not piece.is_captured
                 )
-                and not piece.is_captured
-            )
 
             if tag in TAG_FWD and empty and dc == 0:
                 legal.append(dest)
@@ -135,4 +146,5 @@ class Pawn(Piece):
         next_state.start_move(to_cell, now_ms)
         self.current_state      = next_state
         self._last_action_ms    = now_ms
+        self._refile(game)
         return True
@@ -10,13 +10,10 @@ from core.engine.State import State
 from core.engine.Moves import Moves
 from core.engine.events import MovePlayed, PieceTaken, ErrorPlayed, JumpPlayed
 from core.game.move_history import notation_from_cmd
+from core.game.occupancy import Occupancy
+from shared import slog
 
-DEBUG_STATES = True
-
-def _dbg(*a):
-    """Conditional debug print helper."""
-    if DEBUG_STATES:
-        print(*a)
+_log = slog.get_logger("piece")
 
 
 class Piece:
@@ -36,6 +33,9 @@ class Piece:
 
     COOLDOWN_MS: int = 1_000
 
+    __slots__ = ("piece_id", "current_state", "initial_state", "moves", "is_captured",
+                 "_last_action_ms", "last_move_timestamp", "can_jump_over_allies")
+
     def __init__(self, piece_id: str, init_state: State, moves: Moves | None = None) -> None:
         self.piece_id = piece_id
         self.current_state = init_state
@@ -59,7 +59,7 @@ class Piece:
             bool: True if the command is legal and applied, False otherwise.
         """
         self.last_move_timestamp = cmd.timestamp
-        _dbg(f"[{self.piece_id}] on_command {cmd.type} {cmd.params} at {now_ms}ms")
+        _log.debug("on_command", piece=self.piece_id, type=cmd.type, params=cmd.params, now=now_ms)
 
         if self.is_captured or cmd.type not in ("Move", "Jump"):
             return False
@@ -67,19 +67,19 @@ class Piece:
         if cmd.type == "Move":
             src_cell, dst_cell = cmd.params
             if dst_cell not in self.moves.get_moves(*src_cell):
-                _dbg(f"[{self.piece_id}] illegal move {src_cell}->{dst_cell}")
+                _log.debug("illegal_move", piece=self.piece_id, src=src_cell, dst=dst_cell)
                 if game:
                     game.bus.publish(ErrorPlayed(now_ms, "illegal move", self.piece_id))
                 return False
 
             if self._is_path_blocked(src_cell, dst_cell, game):
-                _dbg(f"[{self.piece_id}] blocked mid-path {src_cell}->{dst_cell}")
+                _log.debug("blocked_mid_path", piece=self.piece_id, src=src_cell, dst=dst_cell)
                 if game:
                     game.bus.publish(ErrorPlayed(now_ms, "blocked mid-path", self.piece_id))
                 return False
 
             if self._is_ally_on_cell(dst_cell, game):
-                _dbg(f"[{self.piece_id}] ally occupies {dst_cell}")
+                _log.debug("ally_on_target", piece=self.piece_id, dst=dst_cell)
                 if game:
                     game.bus.publish(ErrorPlayed(now_ms, "ally on target", self.piece_id))
                 return False
@@ -96,7 +96,7 @@ class Piece:
 
         next_state = self.current_state.get_state_after_command(cmd, now_ms)
         if next_state is self.current_state:
-            _dbg(f"[{self.piece_id}] ignored – '{self.current_state.state_name}' blocks move")
+            _log.debug("blocked", piece=self.piece_id, state=self.current_state.state_name)
             if game:
                 game.bus.publish(ErrorPlayed(now_ms, "blocked", self.piece_id))
             return False
@@ -111,7 +111,9 @@ class Piece:
         next_state.start_move(dst_cell, now_ms)
         self.current_state = next_state
         self._last_action_ms = now_ms
-        _dbg(f"[{self.piece_id}] state={self.current_state.state_name} start_move {src_cell}->{dst_cell}")
+        self._refile(game)
+        _log.debug("start_move", piece=self.piece_id, state=self.current_state.state_name,
+                   src=src_cell, dst=dst_cell)
         return True
 
     def reset(self, start_ms: int) -> None:
@@ -125,6 +127,7 @@ class Piece:
         self._last_action_ms = 0
         self.current_state = self.initial_state
         self.current_state.reset(Command(start_ms, self.piece_id, "Reset", []))
+        self._refile(getattr(self.current_state.physics.board, "game", None))
 
     def update(self, now_ms: int) -> None:
         """
@@ -135,25 +138,32 @@ class Piece:
         """
         if not self.is_captured:
             new_state = self.current_state.update(now_ms)
+            game = getattr(self.current_state.physics.board, "game", None)
 
             # If the piece is moving, update the future cell tracking
             if self.current_state.physics.is_movement_finished():
                 cell = self.get_cell()
-                board = self.current_state.physics.board
-                game = getattr(board, "game", None)
                 if game and isinstance(game.future_cells, dict):
                     entry = game.future_cells.get(cell)
                     if entry and entry["piece_id"] == self.piece_id:
                         del game.future_cells[cell]
 
             if new_state is not self.current_state:
-                _dbg(f"[{self.piece_id}] auto {self.current_state.state_name} -> {new_state.state_name}")
+                _log.debug("auto", piece=self.piece_id, old=self.current_state.state_name,
+                           new=new_state.state_name)
             self.current_state = new_state
+            self._refile(game)
 
             # missing piece_id propagation
             if self.current_state.piece_id is None:
                 self._propagate_piece_id(self.piece_id)
 
+    def _refile(self, game) -> None:
+        """Tell the game's occupancy index that our cell may have changed."""
+        occ = getattr(game, "occupancy", None)
+        if isinstance(occ, Occupancy):
+            occ.move(self)
+
 
     def draw_on_board(self, board: Board) -> None:
         """
@@ -187,6 +197,13 @@ class Piece:
         Args:
             pid (str): The piece ID to assign.
         """
+        machine = getattr(self.current_state, "machine", None)
+        if machine is not None:                 # states not built yet take it from here
+            machine.piece_id = pid
+            for st in machine.states.values():
+                st.piece_id = pid
+            return
+
         seen: Set[int] = set()
         def rec(st: State):
             if id(st) in seen:
@@ -232,10 +249,15 @@ class Piece:
         if steps <= 1:
             return False                        # short step
 
+        occ = getattr(game, "occupancy", None)
+        if isinstance(occ, Occupancy):
+            return occ.path_blocked(self, tuple(src), tuple(dst))
+
         dr = 0 if dr == 0 else dr // abs(dr)
         dc = 0 if dc == 0 else dc // abs(dc)
 
         r, c = src
+
         blocked_cells = {
             p.get_cell()
             for p in game.pieces
@@ -265,6 +287,10 @@ class Piece:
         if not game:
             return False
 
+        occ = getattr(game, "occupancy", None)
+        if isinstance(occ, Occupancy):
+            return occ.has_ally(self, tuple(cell))
+
         my_is_white = self.piece_id[1] == "W"
         for p in game.pieces:
             if p.is_captured or p is self:
@@ -21,14 +21,13 @@ from core.engine.Moves             import Moves
 from core.physics.PhysicsFactory   import PhysicsFactory
 from core.pieces.Piece             import Piece
 from core.pieces.Pawn              import Pawn
-from core.engine.State             import State
+from core.engine.State             import Machine, MachineSpec, State
+from shared                        import slog
 
+_log = slog.get_logger("factory")
 
-
-DEBUG_FACTORY = True
-def _dbg(*a):
-    if DEBUG_FACTORY:
-        print(*a)
+# (pieces folder, board cells, cell pixels) → piece type → MachineSpec
+_SPECS: Dict[tuple, Dict[str, MachineSpec]] = {}
 
 
 def _load_json(path: pathlib.Path, default: dict | None = None) -> dict:
@@ -39,7 +38,7 @@ def _load_json(path: pathlib.Path, default: dict | None = None) -> dict:
         with open(path, encoding="utf-8") as fh:
             return json.load(fh)
     except Exception as e:
-        print(f"[PieceFactory] JSON error in {path}: {e}")
+        _log.warn("bad_json", path=str(path), error=str(e))
         return default or {}
 
 
@@ -54,23 +53,36 @@ class PieceFactory:
         self.pieces_root      = pieces_root
         self.graphics_factory = GraphicsFactory()
         self.physics_factory  = PhysicsFactory(board)
-        self.piece_templates : Dict[str, State] = {}
+        self.piece_specs : Dict[str, MachineSpec] = {}
         self._load_piece_templates()
 
+    @property
+    def piece_templates(self) -> Dict[str, State]:
+        """Root state of a fresh machine per piece type (inspection / tests)."""
+        return {t: Machine(spec, self.board).root() for t, spec in self.piece_specs.items()}
+
     def _load_piece_templates(self) -> None:
         if not self.pieces_root.exists():
-            print(f"[PieceFactory] dir not found: {self.pieces_root}")
+            _log.warn("no_pieces_dir", path=str(self.pieces_root))
             return
 
-        for piece_dir in self.pieces_root.iterdir():
-            if not piece_dir.is_dir():
-                continue
-            p_type = piece_dir.name.upper()
-            try:
-                self.piece_templates[p_type] = self._build_state_machine(piece_dir, p_type)
-                _dbg(f"Loaded piece template: {p_type}")
-            except Exception as e:
-                print(f"Failed to load piece {p_type}: {e}")
+        # templates depend only on the folder and the board geometry – build
+        # them once per process and share the (immutable) specs between rooms
+        key = (str(self.pieces_root.resolve()), self.board.W_cells, self.board.H_cells,
+               self.board.cell_W_pix, self.board.cell_H_pix)
+        specs = _SPECS.get(key)
+        if specs is None:
+            specs = _SPECS[key] = {}
+            for piece_dir in self.pieces_root.iterdir():
+                if not piece_dir.is_dir():
+                    continue
+                p_type = piece_dir.name.upper()
+                try:
+                    specs[p_type] = MachineSpec.of(self._build_state_machine(piece_dir, p_type))
+                    _log.debug("template_loaded", type=p_type)
+                except Exception as e:
+                    _log.error("template_failed", type=p_type, error=str(e))
+        self.piece_specs = specs
 
     def _build_state_machine(self, piece_dir: Path, p_type: str) -> State:
         states : dict[str, State] = {}
@@ -163,9 +175,10 @@ class PieceFactory:
         
         
 
-        if DEBUG_FACTORY:
+        if _log.enabled(slog.DEBUG):
             for nm, st in states.items():
-                _dbg(f"{piece_dir.name}:{nm} auto→{st.next_state_name} events={list(st.transitions)}")
+                _log.debug("state", piece=piece_dir.name, name=nm, auto=st.next_state_name,
+                           events=list(st.transitions))
 
         return states.get("idle") or next(iter(states.values()))
 
@@ -180,21 +193,11 @@ class PieceFactory:
 
         template_key = f"{kind}{color}" 
 
-        if template_key not in self.piece_templates:
+        if template_key not in self.piece_specs:
             raise ValueError(f"Unknown piece type: {template_key}")
 
-        state = self._clone_machine(self.piece_templates[template_key])
         piece_id = f"{p_type}_{cell[0]}_{cell[1]}"
-
-        seen: set[int] = set()
-        def assign(st: State):
-            if id(st) in seen:
-                return
-            seen.add(id(st))
-            st.piece_id = piece_id
-            for nxt in st.transitions.values():
-                assign(nxt)
-        assign(state)
+        state = Machine(self.piece_specs[template_key], self.board, piece_id).root()
 
         state.physics.start_cell        = cell
         state.physics.current_cell      = cell
@@ -0,0 +1,260 @@
+# =============================================================
+# Filename: server/fanout.py  (HEADLESS)
+# =============================================================
+"""Spectator fan-out process.
+
+Serves ``spectate`` connections only.  For every watched room it attaches to
+the room's shared-memory :class:`ring.FrameRing` (published by the process
+that runs the room) and copies each frame to that room's spectators – so
+adding spectators costs this process, never the game.  Normally spawned by
+``server/gateway.py --fanout N``, which redirects spectators here:
+
+    python -m server.fanout --port 8766 --ring-prefix kfc1234
+"""
+from __future__ import annotations
+import argparse, asyncio, collections, json, os, signal, sys
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import websockets
+from websockets import WebSocketServerProtocol
+
+# ───────────── bootstrap PYTHONPATH + graphics stubs ──────────
+import server.bootstrap                                   # noqa: F401 – sys.path
+
+# ───────────── imports (no game logic) ────────────────────────
+from ring import DELTA, KEY, OTHER, Frame, FrameRing, RingReader, ring_name
+from protocol import encode_frame
+from ingest import CommandIngest, IngestError
+from rooms import RoomError, normalize_room_id, send_error
+from shared.wire_codec import SUBPROTOCOL_BINARY, SUBPROTOCOLS, BinaryCodec
+from shared import slog
+
+
+# ───────────── one spectator ──────────────────────────────────
+class Spectator:
+    """A watcher socket and its bounded send queue."""
+
+    def __init__(self, ws, max_queue: int = 64) -> None:
+        self.ws        = ws
+        self.binary    = getattr(ws, "subprotocol", None) == SUBPROTOCOL_BINARY
+        self.max_queue = max_queue
+        self._queue: Deque[Any] = collections.deque()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._drain())
+
+    def push(self, frame: Frame, force: bool = False) -> bool:
+        """Queue *frame* in this socket's format; *False* if the queue is full
+        (*force*: queue it anyway – a catch-up must arrive whole)."""
+        if len(self._queue) >= self.max_queue and not force:
+            return False
+        self._queue.append(frame.binary if self.binary and frame.binary is not None else frame.text)
+        self._wake.set()
+        return True
+
+    def send_raw(self, data: Any) -> None:
+        self._queue.append(data)
+        self._wake.set()
+
+    def reset(self) -> None:
+        self._queue.clear()
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def _drain(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._queue:
+                try:
+                    await self.ws.send(self._queue.popleft())
+                except websockets.ConnectionClosed:
+                    return
+
+
+# ───────────── one watched room ───────────────────────────────
+class RoomFeed:
+    """Reads one room's ring and copies every frame to its spectators.
+
+    The frames since the latest keyframe are kept, so a new spectator – or
+    one that fell behind or asked for a resync – restarts from an exact
+    picture right away instead of waiting for the next periodic keyframe.
+    Those frames are replayed as state only: a tick's events travel in the
+    same batch as its snapshot, and a spectator must never get one twice.
+    """
+
+    def __init__(self, room_id: str, ring: FrameRing, poll_s: float = 0.01) -> None:
+        self.room_id    = room_id
+        self.ring       = ring
+        self.reader     = RingReader(ring)
+        self.poll_s     = poll_s
+        self.spectators: Set[Spectator] = set()
+        self.since_key: List[Frame] = []
+        self._stripped  = 0                      # since_key[:n] hold no events
+        self.players: Optional[Frame] = None
+        meta = ring.meta
+        self.dictionary = json.dumps(meta) if meta else None
+        self.codec = BinaryCodec.from_dictionary(meta["payload"]) if meta else None
+        self.step()
+
+    def add(self, sp: Spectator) -> None:
+        self.spectators.add(sp)
+        self.catch_up(sp)
+
+    def catch_up(self, sp: Spectator) -> None:
+        """Replace *sp*'s backlog with the current picture."""
+        sp.reset()
+        if sp.binary and self.dictionary:
+            sp.send_raw(self.dictionary)
+        keys = self.since_key
+        for i in range(self._stripped, len(keys)):
+            keys[i] = self._state_only(keys[i])
+        self._stripped = len(keys)
+        for f in ([self.players] if self.players else []) + keys:
+            sp.push(f, force=True)
+
+    def _state_only(self, f: Frame) -> Frame:
+        """*f* without the events of its batch (decoded once per frame)."""
+        msg = json.loads(f.text)
+        if msg.get("type") != "batch":
+            return f
+        state = msg["payload"]["state"]
+        binary = None
+        if f.binary is not None and self.codec is not None:
+            binary = encode_frame("state", state, self.codec)
+        return Frame(f.kind, encode_frame("state", state),
+                     binary if isinstance(binary, bytes) else None)
+
+    def step(self) -> bool:
+        """Forward everything published since the last call; *False* once the room closed."""
+        for f in self.reader.poll():
+            if f.kind == KEY:
+                self.since_key, self._stripped = [f], 0
+            elif f.kind == DELTA and self.since_key:
+                self.since_key.append(f)
+            elif f.kind == OTHER:
+                self.players = f
+            for sp in list(self.spectators):
+                if not sp.push(f):               # fell behind – restart it at the keyframe
+                    self.catch_up(sp)
+        return not self.ring.closed
+
+    async def run(self) -> None:
+        try:
+            while self.step():
+                await asyncio.sleep(self.poll_s)
+            for sp in list(self.spectators):
+                sp.stop()
+                await sp.ws.close(1001, "room closed")
+        finally:
+            self.ring.close()
+
+
+# ───────────── fan-out server ─────────────────────────────────
+class FanOut:
+    """All the rooms this process serves spectators for."""
+
+    def __init__(self, ring_prefix: str, *, poll_s: float = 0.01, max_queue: int = 64) -> None:
+        self.ring_prefix = ring_prefix
+        self.poll_s      = poll_s
+        self.max_queue   = max_queue
+        self.feeds: Dict[str, RoomFeed] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.ingest = CommandIngest()                # size / JSON checks of inbound frames
+
+    def feed_for(self, room_id: str) -> Optional[RoomFeed]:
+        """The running feed of *room_id*, attaching to its ring if needed (None: no such room)."""
+        feed = self.feeds.get(room_id)
+        if feed is None:
+            try:
+                ring = FrameRing.attach(ring_name(room_id, self.ring_prefix))
+            except FileNotFoundError:
+                return None
+            feed = self.feeds[room_id] = RoomFeed(room_id, ring, self.poll_s)
+            task = self._tasks[room_id] = asyncio.create_task(feed.run())
+            task.add_done_callback(lambda _t: self._forget(room_id, feed))
+        return feed
+
+    def _forget(self, room_id: str, feed: RoomFeed) -> None:
+        if self.feeds.get(room_id) is feed:
+            del self.feeds[room_id]
+            self._tasks.pop(room_id, None)
+
+    def _leave(self, feed: RoomFeed, sp: Spectator) -> None:
+        sp.stop()
+        feed.spectators.discard(sp)
+        if not feed.spectators and self.feeds.get(feed.room_id) is feed:
+            del self.feeds[feed.room_id]         # nobody left watching
+            self._tasks.pop(feed.room_id).cancel()
+
+    async def handle_socket(self, ws: WebSocketServerProtocol) -> None:
+        feed: Optional[RoomFeed] = None
+        sp:   Optional[Spectator] = None
+        try:
+            async for raw in ws:
+                try:
+                    data = self.ingest.parse(raw)
+                except IngestError as e:
+                    await send_error(ws, str(e))
+                    continue
+                tp   = data.get("type")
+                if sp is None:
+                    if tp != "spectate":
+                        await send_error(ws, "spectate first")
+                        continue
+                    try:
+                        room_id = normalize_room_id((data.get("payload") or {}).get("room"))
+                    except RoomError as e:
+                        await send_error(ws, str(e))
+                        continue
+                    feed = self.feed_for(room_id)
+                    if feed is None:
+                        await send_error(ws, "no such room")
+                        continue
+                    sp = Spectator(ws, self.max_queue)
+                    feed.add(sp)
+                elif tp == "resync":
+                    feed.catch_up(sp)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if sp is not None:
+                self._leave(feed, sp)
+
+# ───────────── main bootstrap ─────────────────────────────────
+async def main(host: str = "127.0.0.1", port: int = 8766, ring_prefix: str = "kfc",
+               poll_ms: float = 10.0) -> None:
+    fanout  = FanOut(ring_prefix, poll_s=poll_ms / 1000)
+    flusher = slog.Flusher(watch=os.environ.get("KFC_LOG_FILE")).start()
+    try:
+        async with websockets.serve(fanout.handle_socket, host, port,
+                                    subprotocols=list(SUBPROTOCOLS),
+                                    ping_interval=20, ping_timeout=20, max_queue=32):
+            print(f"👀 spectator fan-out listening on ws://{host}:{port}", flush=True)
+            await asyncio.Future()      # run forever
+    finally:
+        flusher.stop()
+
+
+def _parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Kungfu-Chess spectator fan-out")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--ring-prefix", default="kfc", help="must match the workers'")
+    ap.add_argument("--poll-ms", type=float, default=10.0, help="ring polling interval")
+    return ap.parse_args()
+
+# ───────────── runner ────────────────────────────────────────
+if __name__ == "__main__":
+    args = _parse_args()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(main(args.host, args.port, args.ring_prefix, args.poll_ms))
+    if sys.platform != "win32":
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+    try:
+        loop.run_until_complete(task)
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        pass
+    finally:
+        loop.close()
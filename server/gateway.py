@@ -0,0 +1,294 @@
+# =============================================================
+# Filename: server/gateway.py  (HEADLESS)
+# =============================================================
+"""Front gateway for a multi-process Kungfu-Chess server.
+
+The gateway terminates every WebSocket but hosts no games: the first
+``join`` of a connection names its room, a consistent-hash ring pins that
+room to one of ``--workers`` ``server/worker.py`` processes, and from then
+on frames are relayed both ways over that worker's local link (see
+:mod:`cluster`).  Match count then scales with the machine's cores:
+
+    python -m server.gateway --workers 4          # ws://127.0.0.1:8765
+
+With ``--fanout N`` the workers also publish every room into a shared-memory
+ring and ``N`` ``server/fanout.py`` processes (ports ``port+1`` …) serve the
+spectators: a ``spectate`` message is answered with a ``redirect`` to one of
+them, so watchers never load the room's worker.  Without fan-out processes
+spectators are relayed to the worker like players.
+"""
+from __future__ import annotations
+import argparse, asyncio, itertools, json, os, pathlib, signal, subprocess, sys
+from typing import Any, Dict, List, Optional
+
+import websockets
+from websockets import WebSocketServerProtocol
+
+# ───────────── bootstrap PYTHONPATH + graphics stubs ──────────
+from server.bootstrap import ROOT, graphics_root, csv_path
+
+# ───────────── imports (no game logic) ────────────────────────
+from cluster import (BINARY, CLOSE, OPEN, TEXT, HashRing, open_link, read_frame,
+                     remove_endpoints, worker_endpoints, write_frame)
+from ingest import CommandIngest, IngestError
+from rooms import RoomError, normalize_room_id, send_error
+from shared.wire_codec import SUBPROTOCOLS
+from shared import slog
+
+_log = slog.get_logger("gateway")
+
+
+# ───────────── client side ────────────────────────────────────
+class Client:
+    """A WebSocket plus its outgoing queue, so one slow reader never stalls a link."""
+
+    def __init__(self, ws, max_queue: int = 1024) -> None:
+        self.ws = ws
+        self.max_queue = max_queue
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._drain())
+
+    def push(self, data: Any) -> None:
+        if self._outbox.qsize() >= self.max_queue:      # reader can't keep up – drop it
+            if not self._task.done():
+                _log.warn("drop_slow_client", queued=self._outbox.qsize())
+                self._task.cancel()
+                asyncio.ensure_future(self.ws.close(1008, "too slow"))
+            return
+        self._outbox.put_nowait(data)
+
+    def hang_up(self, code: int = 1000, reason: str = "") -> None:
+        self._outbox.put_nowait((code, reason))
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def _drain(self) -> None:
+        while True:
+            data = await self._outbox.get()
+            try:
+                if isinstance(data, tuple):
+                    await self.ws.close(*data)
+                    return
+                await self.ws.send(data)
+            except websockets.ConnectionClosed:
+                return
+
+
+# ───────────── worker side ────────────────────────────────────
+class WorkerLink:
+    """Gateway end of the multiplexed stream to one worker."""
+
+    def __init__(self, name: str, endpoint: str) -> None:
+        self.name     = name
+        self.endpoint = endpoint
+        self.clients: Dict[int, Client] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock   = asyncio.Lock()
+
+    @property
+    def up(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self, attempts: int = 100, delay: float = 0.05) -> None:
+        """(Re)open the link, waiting for a worker that is still starting up."""
+        async with self._lock:
+            if self.up:
+                return
+            for i in range(attempts):
+                try:
+                    reader, self._writer = await open_link(self.endpoint)
+                    break
+                except OSError:
+                    if i == attempts - 1:
+                        raise
+                    await asyncio.sleep(delay)
+            asyncio.create_task(self._pump(reader, self._writer))
+            _log.info("linked", worker=self.name, endpoint=self.endpoint)
+
+    async def open(self, conn: int, client: Client) -> None:
+        await self.connect()
+        self.clients[conn] = client
+        write_frame(self._writer, conn, OPEN, (client.ws.subprotocol or "").encode("utf-8"))
+
+    async def send(self, conn: int, raw: str | bytes) -> None:
+        if not self.up:
+            raise ConnectionError(f"worker {self.name} is down")
+        write_frame(self._writer, conn, TEXT, raw.encode("utf-8") if isinstance(raw, str) else raw)
+        await self._writer.drain()
+
+    def close(self, conn: int) -> None:
+        if self.clients.pop(conn, None) is not None and self.up:
+            write_frame(self._writer, conn, CLOSE)
+
+    async def _pump(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Worker → clients."""
+        try:
+            while True:
+                conn, op, body = await read_frame(reader)
+                client = self.clients.get(conn)
+                if client is None:
+                    continue
+                if op == TEXT:
+                    client.push(body.decode("utf-8"))
+                elif op == BINARY:
+                    client.push(body)
+                elif op == CLOSE:
+                    del self.clients[conn]
+                    client.hang_up()
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            _log.error("link_lost", worker=self.name, error=e.__class__.__name__)
+        finally:
+            writer.close()
+            for client in self.clients.values():
+                client.hang_up(1011, "worker lost")
+            self.clients.clear()
+
+
+class Gateway:
+    """Routes rooms to worker links by consistent hashing."""
+
+    def __init__(self, endpoints: Dict[str, str], fanout_urls: List[str] = ()) -> None:
+        self.links = {name: WorkerLink(name, ep) for name, ep in endpoints.items()}
+        self.ring  = HashRing(self.links)
+        self._conn_ids = itertools.count(1)
+        self._fanouts  = itertools.cycle(fanout_urls) if fanout_urls else None
+        self.ingest    = CommandIngest()              # size / JSON checks of handshakes
+
+    def link_for(self, room_id: str) -> WorkerLink:
+        return self.links[self.ring.node_for(room_id)]
+
+    async def connect(self) -> None:
+        await asyncio.gather(*(link.connect() for link in self.links.values()))
+
+    async def handle_socket(self, ws: WebSocketServerProtocol) -> None:
+        client = Client(ws)
+        conn   = next(self._conn_ids)
+        link: Optional[WorkerLink] = None
+        try:
+            async for raw in ws:
+                if link is None:
+                    try:
+                        data = self.ingest.parse(raw)
+                    except IngestError as e:
+                        await send_error(ws, str(e))
+                        continue
+                    tp   = data.get("type")
+                    if tp not in ("join", "spectate"):
+                        await send_error(ws, "join first")
+                        continue
+                    try:
+                        room_id = normalize_room_id((data.get("payload") or {}).get("room"))
+                    except RoomError as e:
+                        await send_error(ws, str(e))
+                        continue
+                    if tp == "spectate" and self._fanouts is not None:
+                        await ws.send(json.dumps({"type": "redirect",
+                                                  "payload": {"url": next(self._fanouts)}}))
+                        continue
+                    link = self.link_for(room_id)
+                    try:
+                        await link.open(conn, client)
+                    except OSError:
+                        link = None
+                        await send_error(ws, "worker unavailable")
+                        continue
+                await link.send(conn, raw)
+        except ConnectionError:
+            await ws.close(1011, "worker lost")
+        finally:
+            if link is not None:
+                link.close(conn)
+            client.stop()
+
+
+# ───────────── worker processes ───────────────────────────────
+def spawn_workers(endpoints: List[str], pieces: pathlib.Path, board: pathlib.Path,
+                  max_rooms: int, tick_hz: float,
+                  ring_prefix: Optional[str] = None,
+                  metrics_port: Optional[int] = None) -> List[subprocess.Popen]:
+    """*metrics_port*: worker *i* serves ``/metrics`` on ``metrics_port + i``."""
+    extra = ["--ring-prefix", ring_prefix] if ring_prefix else []
+    return [subprocess.Popen([sys.executable, "-m", "server.worker", "--listen", ep,
+                              "--pieces", str(pieces), "--board", str(board),
+                              "--max-rooms", str(max_rooms), "--tick-hz", str(tick_hz)] + extra
+                             + (["--metrics-port", str(metrics_port + i)] if metrics_port else []),
+                             cwd=str(ROOT))
+            for i, ep in enumerate(endpoints)]
+
+
+def spawn_fanouts(host: str, ports: List[int], ring_prefix: str) -> List[subprocess.Popen]:
+    return [subprocess.Popen([sys.executable, "-m", "server.fanout", "--host", host,
+                              "--port", str(port), "--ring-prefix", ring_prefix],
+                             cwd=str(ROOT))
+            for port in ports]
+
+
+def stop_workers(procs: List[subprocess.Popen]) -> None:
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+# ───────────── main bootstrap ─────────────────────────────────
+async def main(host: str = "127.0.0.1", port: int = 8765, workers: int = 0,
+               pieces: pathlib.Path = graphics_root, board: pathlib.Path = csv_path,
+               max_rooms: int = 500, tick_hz: float = 60.0, fanout: int = 0,
+               metrics_port: Optional[int] = None) -> None:
+    endpoints = worker_endpoints(workers or os.cpu_count() or 1)
+    prefix    = f"kfc{os.getpid()}" if fanout else None   # shm names unique to this server
+    ports     = [port + 1 + i for i in range(fanout)]
+    flusher   = slog.Flusher(watch=os.environ.get("KFC_LOG_FILE")).start()
+    procs     = spawn_workers(endpoints, pieces, board, max_rooms, tick_hz, prefix, metrics_port)
+    if fanout:
+        procs += spawn_fanouts(host, ports, prefix)
+    try:
+        gateway = Gateway({f"w{i}": ep for i, ep in enumerate(endpoints)},
+                          [f"ws://{host}:{p}" for p in ports])
+        await gateway.connect()
+        async with websockets.serve(gateway.handle_socket, host, port,
+                                    subprotocols=list(SUBPROTOCOLS),
+                                    ping_interval=20, ping_timeout=20, max_queue=32):
+            print(f"🏁 Kungfu-Chess gateway listening on ws://{host}:{port} "
+                  f"({len(endpoints)} workers, {fanout} fan-out)", flush=True)
+            await asyncio.Future()      # run forever
+    finally:
+        stop_workers(procs)
+        remove_endpoints(endpoints)
+        flusher.stop()
+
+
+def _parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Kungfu-Chess gateway + room workers")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=0, help="worker processes (default: one per core)")
+    ap.add_argument("--pieces", type=pathlib.Path, default=graphics_root)
+    ap.add_argument("--board", type=pathlib.Path, default=csv_path)
+    ap.add_argument("--max-rooms", type=int, default=500, help="per worker")
+    ap.add_argument("--tick-hz", type=float, default=60.0, help="room tick rate")
+    ap.add_argument("--fanout", type=int, default=0,
+                    help="spectator fan-out processes on the next ports (default: none)")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="worker i serves GET /metrics on 127.0.0.1:PORT+i")
+    return ap.parse_args()
+
+# ───────────── runner ────────────────────────────────────────
+if __name__ == "__main__":
+    args = _parse_args()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(main(args.host, args.port, args.workers,
+                                 args.pieces, args.board, args.max_rooms, args.tick_hz,
+                                 args.fanout, args.metrics_port))
+    if sys.platform != "win32":
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+    try:
+        loop.run_until_complete(task)
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        pass
+    finally:
+        loop.close()
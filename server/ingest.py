@@ -0,0 +1,141 @@
+# =============================================================
+# Filename: server/ingest.py  (HEADLESS)
+# =============================================================
+"""ingest – the one gate every client frame passes before it reaches a room.
+
+:meth:`CommandIngest.parse` rejects oversized and non-JSON frames before
+anything else looks at them; :meth:`CommandIngest.command` checks a
+``command`` payload against a fixed schema and builds the
+:class:`Command` in the same pass (cells become tuples right there – no
+``Message`` → ``Command.from_dict`` → ``_lt`` round trip), then charges the
+sender's token bucket.  Anything that does not fit raises
+:class:`IngestError`; accepted and rejected frames are counted per reason.
+
+Schema (``payload`` of a ``command`` message)::
+
+    type       "Move" | "Jump"
+    piece_id   str, 1..16 chars
+    params     Move: [cell, cell]      Jump: 1..3 cells      cell = [row, col] on the board
+    timestamp  int, 0 ≤ ts < 2**63     (optional)
+    player_id  "WHITE" | "BLACK" | null (optional)
+"""
+from __future__ import annotations
+import collections, json, time
+from typing import Any, Callable, Counter, Dict, Hashable, Tuple
+
+from core.engine.Command import Command
+
+MAX_FRAME_BYTES = 2048
+MAX_PIECE_ID    = 16
+MAX_TIMESTAMP   = 2 ** 63 - 1             # fits the journal's u64 (and any int64)
+PLAYER_IDS      = (None, "WHITE", "BLACK")
+_ARITY          = {"Move": (2, 2), "Jump": (1, 3)}
+
+
+class IngestError(ValueError):
+    """A client frame was refused; ``str(e)`` is the reason sent back."""
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``burst`` saved up."""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate, self.burst = rate, burst
+        self.tokens, self.stamp = burst, now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class CommandIngest:
+    """Size / schema / rate checks for inbound frames, with counters.
+
+    One instance serves a whole :class:`rooms.RoomManager`; buckets are
+    keyed by connection, so a flood from one socket never eats another
+    player's budget.
+    """
+
+    def __init__(self, *, max_bytes: int = MAX_FRAME_BYTES, rate_hz: float = 10.0,
+                 burst: float = 20.0, rows: int = 8, cols: int = 8,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_bytes = max_bytes
+        self.rate_hz, self.burst = rate_hz, burst
+        self.rows, self.cols = rows, cols
+        self.clock = clock
+        self.accepted = 0
+        self.rejected: Counter[str] = collections.Counter()
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    # ------------------------------------------------ frames
+    def parse(self, raw: str | bytes) -> Dict[str, Any]:
+        """Decode one inbound frame into a message dict."""
+        if len(raw) > self.max_bytes:
+            raise self._reject("frame too large")
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            raise self._reject("malformed frame") from None
+        if type(data) is not dict:
+            raise self._reject("malformed frame")
+        return data
+
+    # ------------------------------------------------ commands
+    def command(self, key: Hashable, payload: Any) -> Command:
+        """Validate a ``command`` payload from connection *key* and charge its bucket."""
+        cmd = self._build(payload)
+        bucket = self._buckets.get(key)
+        now = self.clock()
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate_hz, self.burst, now)
+        if not bucket.take(now):
+            raise self._reject("rate limited")
+        self.accepted += 1
+        return cmd
+
+    def forget(self, key: Hashable) -> None:
+        """Drop the bucket of a connection that went away."""
+        self._buckets.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"accepted": self.accepted, "rejected": dict(self.rejected)}
+
+    # ------------------------------------------------ internals
+    def _reject(self, reason: str) -> IngestError:
+        self.rejected[reason] += 1
+        return IngestError(reason)
+
+    def _build(self, p: Any) -> Command:
+        if type(p) is not dict:
+            raise self._reject("malformed command")
+        kind = p.get("type")
+        arity = _ARITY.get(kind) if type(kind) is str else None
+        if arity is None:
+            raise self._reject("unsupported command")
+        pid = p.get("piece_id")
+        if type(pid) is not str or not 0 < len(pid) <= MAX_PIECE_ID:
+            raise self._reject("bad piece_id")
+        params = p.get("params")
+        if type(params) is not list or not arity[0] <= len(params) <= arity[1]:
+            raise self._reject("bad params")
+        cells = [self._cell(c) for c in params]
+        ts = p.get("timestamp", 0)
+        if type(ts) is not int or not 0 <= ts <= MAX_TIMESTAMP:
+            raise self._reject("bad timestamp")
+        player = p.get("player_id")
+        if player not in PLAYER_IDS:
+            raise self._reject("bad player_id")
+        return Command(ts, pid, kind, cells, player)
+
+    def _cell(self, c: Any) -> Tuple[int, int]:
+        if type(c) is list and len(c) == 2:
+            r, col = c
+            if type(r) is int and type(col) is int and 0 <= r < self.rows and 0 <= col < self.cols:
+                return (r, col)
+        raise self._reject("bad params")
@@ -0,0 +1,312 @@
+# =============================================================
+# Filename: server/journal.py  (HEADLESS)
+# =============================================================
+"""journal – an append-only binary record of a match: its commands and frames.
+
+One file per match.  After a 5-byte preamble (``KFCJ`` + version) the file
+is a sequence of records, each ``tag:1 length:u32 body``:
+
+``H``  header, JSON: room, wall-clock start, the game's clock origin
+       (``game_start_ms``) and tick rate, the piece / state tables of the
+       room's :class:`shared.wire_codec.BinaryCodec` and the initial layout
+       (:func:`protocol.encode_state` – board size plus every piece's cell,
+       pixel and state).  The engine draws no random numbers; the clock
+       origin and tick rate are all a replay needs besides the commands.
+``C``  one command, packed (:data:`_CMD`): server time (``Room.now_ms``),
+       the client's timestamp, piece index, type, player, whether the piece
+       took it, then one ``row col`` byte pair per cell.  22 + 2·cells bytes.
+``F``  one frame the room broadcast (``ts:u64`` + the binary wire frame of
+       :func:`protocol.encode_batch`, or its JSON text when the binary
+       format cannot express it) – what every client was shown.
+``K``  a full-state keyframe (``ts:u64`` + a ``state`` wire frame): written
+       when the journal opens and whenever ``keyframe_ms`` passed since the
+       last keyframe, merged from the deltas (:func:`protocol.merge_state`).
+       The room's own keyframes (``F`` records) count as well.
+``E``  end of match, JSON: winner (or ``null``), reason, command count.
+``X``  last record, JSON: ``{"keys": [[ts, offset], …], "end_ms": …}`` –
+       every keyframe's timestamp and record offset – followed by the
+       record's own offset as ``u64``, so the index is found from the end
+       of the file without a scan (:mod:`replay` seeks with it).
+
+:meth:`Journal.command` and :meth:`Journal.frame` only hand their data to
+a queue; a daemon thread owns the file, encodes frames, writes through a
+64 KiB buffer and flushes whenever the queue has been idle for
+``flush_every`` seconds.  :meth:`close` queues the end record – the thread
+then writes the index, closes the file, gzips it to ``*.kfcj.gz`` and
+removes the raw one, so a running match is ``*.kfcj`` and a finished one is
+``*.kfcj.gz``.  :func:`read_journal` reads either.
+"""
+from __future__ import annotations
+import gzip, itertools, json, os, pathlib, queue, re, shutil, struct, threading, time
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.engine.Command import Command, VALID_TYPES
+from protocol            import encode_batch, encode_frame, encode_state, merge_state
+from shared.wire_codec   import BinaryCodec
+from shared import slog
+
+_log = slog.get_logger("journal")
+
+MAGIC    = b"KFCJ"
+VERSION  = 1
+SUFFIX   = ".kfcj"
+TYPES    = tuple(sorted(VALID_TYPES))
+PLAYERS  = (None, "WHITE", "BLACK")
+
+_PREAMBLE = struct.Struct("<4sB")
+_REC      = struct.Struct("<cI")          # tag, body length
+_CMD      = struct.Struct("<QQHBBBB")     # now, client ts, piece, type, player, applied, cells
+_CELL     = struct.Struct("<BB")
+_U64      = struct.Struct("<Q")           # frame timestamp, index offset
+
+RECORD_HEADER = _REC.size
+
+KEYFRAME_MS = 5_000
+
+_TYPE_IDX   = {t: i for i, t in enumerate(TYPES)}
+_PLAYER_IDX = {p: i for i, p in enumerate(PLAYERS)}
+_UNSAFE     = re.compile(r"[^\w.-]")      # room ids may hold anything printable
+_serial     = itertools.count(1)          # tells apart matches of one room in one second
+
+
+class JournalError(ValueError):
+    """A journal file is truncated or not a journal at all."""
+
+
+class Entry(NamedTuple):
+    """One decoded ``C`` record."""
+    now_ms:  int
+    command: Command
+    applied: bool
+
+
+def _record(tag: bytes, body: bytes) -> bytes:
+    return _REC.pack(tag, len(body)) + body
+
+
+def _json_record(tag: bytes, obj: Dict[str, Any]) -> bytes:
+    return _record(tag, json.dumps(obj, separators=(",", ":")).encode())
+
+
+# ───────────── writer ─────────────────────────────────────────
+class Journal:
+    """The journal of one match; the caller's thread never touches the disk."""
+
+    def __init__(self, path: str | pathlib.Path, header: Dict[str, Any], *,
+                 keyframe: Optional[Dict[str, Any]] = None, keyframe_ms: int = KEYFRAME_MS,
+                 flush_every: float = 0.5, compress: bool = True) -> None:
+        """*keyframe*: the ``state`` payload the frames that follow build on."""
+        self.path        = pathlib.Path(path)
+        self.final_path  = self.path.with_name(self.path.name + ".gz") if compress else self.path
+        self.keyframe_ms = keyframe_ms
+        self.flush_every = flush_every
+        self.compress    = compress
+        self.records     = 0
+        self.closed      = False
+        self._piece_idx  = {pid: i for i, pid in enumerate(header["pieces"])}
+        self._codec      = BinaryCodec(header["pieces"], header.get("states", []))
+        # writer thread only
+        self._offset     = 0
+        self._keys: List[Tuple[int, int]] = []              # (ts, record offset)
+        self._full: Optional[Dict[str, Any]] = None         # state as of the last frame
+        self._last_ts    = 0
+        self._q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._q.put(_PREAMBLE.pack(MAGIC, VERSION) + _json_record(b"H", header))
+        if keyframe is not None:
+            self._q.put((b"K", keyframe["ts"], keyframe, None))
+        self._thread = threading.Thread(target=self._run, name="kfc-journal", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def open(cls, directory: str | pathlib.Path, room_id: str, game, codec,
+             tick_hz: float, keyframe_ms: int = KEYFRAME_MS, **kw) -> "Journal":
+        """Start the journal of *game* (about to take its first command)."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name  = f"{_UNSAFE.sub('_', room_id)}-{stamp}-{os.getpid()}-{next(_serial)}"
+        header = {"room": room_id, "wall_ms": int(time.time() * 1000),
+                  "game_start_ms": getattr(game, "game_start_ms", 0), "tick_hz": tick_hz,
+                  "keyframe_ms": keyframe_ms, "pieces": codec.pieces, "states": codec.states,
+                  "initial": encode_state(game)}
+        return cls(directory / (name + SUFFIX), header, keyframe_ms=keyframe_ms, **kw)
+
+    def command(self, now_ms: int, cmd: Command, applied: bool) -> None:
+        """Queue one command the room handed to a piece at *now_ms*.
+
+        Never raises: the command is already applied, so one that does not
+        fit the record format is logged and left out.
+        """
+        if self.closed:
+            return
+        cells = cmd.params
+        try:
+            body = _CMD.pack(now_ms, cmd.timestamp, self._piece_idx[cmd.piece_id],
+                             _TYPE_IDX[cmd.type], _PLAYER_IDX.get(cmd.player_id, 0),
+                             bool(applied), len(cells))
+            body += b"".join(_CELL.pack(r, c) for r, c in cells)
+        except (struct.error, KeyError, TypeError) as e:
+            _log.warn("command_dropped", path=str(self.path), piece=cmd.piece_id, error=repr(e))
+            return
+        self._q.put(_record(b"C", body))
+        self.records += 1
+
+    def frame(self, ts: int, state: Optional[Dict[str, Any]],
+              events: List[Dict[str, Any]]) -> None:
+        """Queue one broadcast batch (encoded by the writer thread).
+
+        The payloads are not copied: the room builds new ones every frame.
+        A batch announcing ``GameEnded`` is the last one – the journal closes.
+        """
+        if self.closed:
+            return
+        self._q.put((b"F", ts, state, events))
+        for e in events:
+            evt = e.get("payload") or {}
+            if evt.get("_event_type") == "GameEnded":
+                self.close(evt.get("winner"))
+
+    def close(self, winner: Optional[str] = None, reason: str = "ended") -> None:
+        """Write the end record; the file is finished (and gzipped) in the background."""
+        if self.closed:
+            return
+        self.closed = True
+        self._q.put(_json_record(b"E", {"winner": winner, "reason": reason,
+                                        "commands": self.records}))
+        self._q.put(None)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the writer; True once the final file is in place."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # ------------------------------------------------ writer thread
+    def _run(self) -> None:
+        try:
+            with open(self.path, "wb", buffering=64 * 1024) as fh:
+                while True:
+                    try:
+                        item = self._q.get(timeout=self.flush_every)
+                    except queue.Empty:
+                        fh.flush()
+                        continue
+                    if item is None:
+                        break
+                    if type(item) is tuple:
+                        self._write_frame(fh, *item)
+                    else:
+                        self._write(fh, item)
+                index = json.dumps({"keys": self._keys, "end_ms": self._last_ts},
+                                   separators=(",", ":")).encode()
+                self._write(fh, _record(b"X", index + _U64.pack(self._offset)))
+            if self.compress:
+                with open(self.path, "rb") as src, gzip.open(self.final_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.path.unlink()
+            _log.info("written", path=str(self.final_path), commands=self.records)
+        except OSError as e:
+            _log.error("write_failed", path=str(self.path), error=repr(e))
+
+    def _write(self, fh: BinaryIO, chunk: bytes) -> None:
+        fh.write(chunk)
+        self._offset += len(chunk)
+
+    def _write_frame(self, fh: BinaryIO, tag: bytes, ts: int,
+                     state: Optional[Dict[str, Any]], events: Optional[List[Dict[str, Any]]]) -> None:
+        self._last_ts = max(self._last_ts, ts)
+        if tag == b"K":
+            self._write_keyframe(fh, ts, state)
+            return
+        key, full = state is not None and state.get("key", True), self._full
+        if key:
+            self._full = state
+            self._keys.append((ts, self._offset))
+        elif state is not None and full is not None:
+            self._full = merge_state(full, state)
+        self._write(fh, _record(b"F", _U64.pack(ts) + _wire(encode_batch(state, events, self._codec))))
+        if (not key and self._full is not None and self._full is not full
+                and ts - self._keys[-1][0] >= self.keyframe_ms):
+            self._write_keyframe(fh, ts, self._full)
+
+    def _write_keyframe(self, fh: BinaryIO, ts: int, state: Dict[str, Any]) -> None:
+        self._full = state
+        self._keys.append((ts, self._offset))
+        self._write(fh, _record(b"K", _U64.pack(ts) + _wire(encode_frame("state", state, self._codec))))
+
+
+def _wire(frame: str | bytes) -> bytes:
+    return frame if isinstance(frame, bytes) else frame.encode()
+
+
+# ───────────── reader ─────────────────────────────────────────
+def load(path: str | pathlib.Path) -> bytes:
+    """The uncompressed bytes of a journal (``*.kfcj`` or ``*.kfcj.gz``)."""
+    path = pathlib.Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as fh:
+        return fh.read()
+
+
+def scan(data: bytes, offset: int = 0) -> Iterator[Tuple[int, bytes, bytes]]:
+    """``(offset, tag, body)`` of every record from *offset* (0: the first)."""
+    if offset == 0:
+        magic, version = _PREAMBLE.unpack_from(data) if len(data) >= _PREAMBLE.size else (b"", 0)
+        if magic != MAGIC:
+            raise JournalError("not a journal")
+        if version != VERSION:
+            raise JournalError(f"unsupported journal version {version}")
+        offset = _PREAMBLE.size
+    end = len(data)
+    while offset < end:
+        if offset + _REC.size > end:
+            raise JournalError("truncated record")
+        tag, n = _REC.unpack_from(data, offset)
+        body_at = offset + _REC.size
+        if body_at + n > end:
+            raise JournalError("truncated record")
+        yield offset, tag, data[body_at:body_at + n]
+        offset = body_at + n
+
+
+def index_of(data: bytes) -> Optional[Dict[str, Any]]:
+    """The ``X`` record of a finished journal, found from its end (None: none)."""
+    if len(data) < _PREAMBLE.size + _REC.size + _U64.size:
+        return None
+    at = _U64.unpack_from(data, len(data) - _U64.size)[0]
+    if not _PREAMBLE.size <= at < len(data) - _REC.size:
+        return None
+    tag, n = _REC.unpack_from(data, at)
+    if tag != b"X" or at + _REC.size + n != len(data):
+        return None
+    return json.loads(data[at + _REC.size:len(data) - _U64.size])
+
+
+def split_frame(body: bytes) -> Tuple[int, bytes]:
+    """``(ts, wire frame)`` of an ``F`` / ``K`` record."""
+    return _U64.unpack_from(body)[0], body[_U64.size:]
+
+
+def decode_command(body: bytes, pieces: List[str]) -> Entry:
+    now, ts, piece, kind, player, applied, n = _CMD.unpack_from(body)
+    cells = [_CELL.unpack_from(body, _CMD.size + 2 * i) for i in range(n)]
+    return Entry(now, Command(ts, pieces[piece], TYPES[kind], cells, PLAYERS[player]), bool(applied))
+
+
+def read_journal(path: str | pathlib.Path
+                 ) -> Tuple[Dict[str, Any], List[Entry], Optional[Dict[str, Any]]]:
+    """``(header, entries, end)`` of a journal; *end* is None while the match runs."""
+    header: Optional[Dict[str, Any]] = None
+    entries: List[Entry] = []
+    end = None
+    for _, tag, body in scan(load(path)):
+        if tag == b"H":
+            header = json.loads(body)
+        elif tag == b"C":
+            if header is None:
+                raise JournalError("command before header")
+            entries.append(decode_command(body, header["pieces"]))
+        elif tag == b"E":
+            end = json.loads(body)
+    if header is None:
+        raise JournalError("no header")
+    return header, entries, end
@@ -0,0 +1,183 @@
+# =============================================================
+# Filename: server/metrics.py  (HEADLESS)
+# =============================================================
+"""metrics – counters and histograms of a server process, over HTTP.
+
+A :class:`rooms.RoomManager` owns one :class:`Metrics` and hands it to every
+room it opens; the rooms record into it on the hot path (one ``bisect`` and
+two additions per observation).  Everything that is a *state* rather than a
+stream – rooms, connections, per-connection send queues, ingest counters – is
+read from the manager only when scraped.
+
+:func:`serve_metrics` answers ``GET /metrics`` from the server's own event
+loop in the Prometheus text exposition format (0.0.4)::
+
+    python -m server.main                       # KFC_METRICS_PORT=9100
+    curl -s localhost:9100/metrics
+"""
+from __future__ import annotations
+import asyncio, bisect
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+TICK_MS_BUCKETS   = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 16.7, 25, 50, 100)
+ENCODE_MS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+BYTES_BUCKETS     = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+LAG_MS_BUCKETS    = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class Histogram:
+    """Fixed upper bounds; counts are per bucket and cumulated on render."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # last one is +Inf
+        self.sum    = 0.0
+        self.count  = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum   += v
+        self.count += 1
+
+    def lines(self, name: str, labels: str = "") -> Iterable[str]:
+        sep, acc = ("," if labels else ""), 0
+        for le, n in zip(self.bounds + (float("inf"),), self.counts):
+            acc += n
+            yield f'{name}_bucket{{{labels}{sep}le="{_num(le)}"}} {acc}'
+        lb = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{lb} {_num(self.sum)}"
+        yield f"{name}_count{lb} {self.count}"
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if float(v).is_integer() else repr(round(v, 6))
+
+
+def _esc(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Histograms recorded by the rooms of one process, plus the loop-lag probe."""
+
+    def __init__(self) -> None:
+        self.tick_ms   = Histogram(TICK_MS_BUCKETS)
+        self.encode_ms: Dict[str, Histogram] = {"json": Histogram(ENCODE_MS_BUCKETS),
+                                                "binary": Histogram(ENCODE_MS_BUCKETS)}
+        self.frame_bytes: Dict[str, Histogram] = {"json": Histogram(BYTES_BUCKETS),
+                                                  "binary": Histogram(BYTES_BUCKETS)}
+        self.loop_lag_ms = Histogram(LAG_MS_BUCKETS)
+        self._probe: Optional[asyncio.Task] = None
+
+    def observe_frame(self, fmt: str, encode_ms: float, nbytes: int) -> None:
+        self.encode_ms[fmt].observe(encode_ms)
+        self.frame_bytes[fmt].observe(nbytes)
+
+    # ------------------------------------------------ event-loop lag
+    def start(self, interval: float = 0.1) -> None:
+        if self._probe is None:
+            self._probe = asyncio.create_task(self._probe_loop(interval))
+
+    async def stop(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+            await asyncio.gather(self._probe, return_exceptions=True)
+            self._probe = None
+
+    async def _probe_loop(self, interval: float) -> None:
+        """How late a plain ``sleep(interval)`` wakes up – time the loop was busy."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag_ms.observe(max(0.0, loop.time() - start - interval) * 1000.0)
+
+    # ------------------------------------------------ exposition
+    def render(self, rooms) -> str:
+        """The whole text page for the :class:`rooms.RoomManager` *rooms*."""
+        out: List[str] = []
+
+        def family(name: str, kind: str, help_: str, lines: Iterable[str]) -> None:
+            out.append(f"# HELP {name} {help_}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+
+        def labelled(name: str, hists: Dict[str, Histogram]) -> Iterable[str]:
+            for fmt, h in hists.items():
+                yield from h.lines(name, f'format="{fmt}"')
+
+        family("kfc_tick_duration_ms", "histogram", "Work time of one room tick.",
+               self.tick_ms.lines("kfc_tick_duration_ms"))
+        family("kfc_snapshot_encode_ms", "histogram", "Time to encode one broadcast frame.",
+               labelled("kfc_snapshot_encode_ms", self.encode_ms))
+        family("kfc_frame_bytes", "histogram", "Size of one broadcast frame.",
+               labelled("kfc_frame_bytes", self.frame_bytes))
+        family("kfc_event_loop_lag_ms", "histogram", "Oversleep of a 100 ms timer.",
+               self.loop_lag_ms.lines("kfc_event_loop_lag_ms"))
+
+        all_rooms = list(rooms.rooms.items())
+        family("kfc_rooms", "gauge", "Open rooms.", [f"kfc_rooms {len(all_rooms)}"])
+        family("kfc_connections", "gauge", "Sockets attached to a room.",
+               [f"kfc_connections {sum(len(r.connected) for _, r in all_rooms)}"])
+
+        depth: List[str] = []
+        for rid, room in all_rooms:
+            for ws, box in list(room.outboxes.items()):
+                depth.append(f'kfc_send_queue_depth{{room="{_esc(rid)}",peer="{_esc(peer_name(ws))}"}} '
+                             f"{box.backlog}")
+        family("kfc_send_queue_depth", "gauge", "Frames waiting in a connection's outbox.", depth)
+
+        for field, help_ in (("skipped", "Ticks dropped after falling behind."),
+                             ("overruns", "Ticks whose work exceeded the period.")):
+            family(f"kfc_ticks_{field}_total", "counter", help_,
+                   [f'kfc_ticks_{field}_total{{room="{_esc(rid)}"}} '
+                    f"{getattr(room.scheduler.stats, field)}" for rid, room in all_rooms])
+
+        stats = rooms.ingest.stats()
+        family("kfc_commands_accepted_total", "counter", "Commands that reached a room.",
+               [f"kfc_commands_accepted_total {stats['accepted']}"])
+        family("kfc_commands_rejected_total", "counter", "Frames refused at ingest, by reason.",
+               [f'kfc_commands_rejected_total{{reason="{_esc(r)}"}} {n}'
+                for r, n in sorted(stats["rejected"].items())])
+        return "\n".join(out) + "\n"
+
+
+def peer_name(ws) -> str:
+    """Stable label for one connection: its address, or its gateway link id."""
+    addr = getattr(ws, "remote_address", None)
+    if isinstance(addr, tuple) and len(addr) >= 2:
+        return f"{addr[0]}:{addr[1]}"
+    conn = getattr(ws, "conn_id", None)
+    return f"conn-{conn}" if conn is not None else f"ws-{id(ws):x}"
+
+# ───────────── HTTP endpoint ──────────────────────────────────
+async def serve_metrics(rooms, host: str = "127.0.0.1", port: int = 9100) -> asyncio.AbstractServer:
+    """Start answering ``GET /metrics`` with ``rooms.metrics.render(rooms)``."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5.0)
+            while (await asyncio.wait_for(reader.readline(), 5.0)).strip():
+                pass                                        # headers – not needed
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, ctype, body = "200 OK", CONTENT_TYPE, rooms.metrics.render(rooms)
+            else:
+                status, ctype, body = "404 Not Found", "text/plain", "try /metrics\n"
+            data = body.encode("utf-8")
+            writer.write(f"HTTP/1.0 {status}\r\nContent-Type: {ctype}\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+                         .encode("latin-1") + data)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,256 @@
+# =============================================================
+# Filename: server/outbox.py  (HEADLESS)
+# =============================================================
+"""outbox – per-connection send queue, so one slow client can't stall a room.
+
+A room used to ``gather`` one ``ws.send`` per client for every frame, so the
+whole fan-out waited for the slowest socket.  Now every connection gets an
+:class:`Outbox` with its own writer task and the room only *posts*:
+
+* ``state`` payloads are sent at the connection's own rate
+  (:class:`RateController`).  Deltas that arrive before the connection is
+  due are merged into one (:func:`protocol.merge_state`), so a client on a
+  slow rate still gets an exact picture, just less often.
+* game events come with the state of their tick and are never dropped: they
+  go out right away, in one frame together with whatever state is pending
+  (:func:`protocol.encode_batch`), so the client applies both at once.
+* everything else (lobby updates, errors) is queued reliably; events and
+  queued frames together are capped at ``max_queue``.
+* a client whose queue overflows, or whose current send has been stuck for
+  ``max_lag`` seconds, is disconnected.
+"""
+from __future__ import annotations
+import asyncio, collections, inspect, time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from protocol import merge_state
+from metrics import peer_name
+from tracing import TRACER
+from shared import slog
+
+_log = slog.get_logger("outbox")
+
+
+class RateController:
+    """Snapshot rate of one connection: additive increase, multiplicative decrease.
+
+    After every state frame the rate backs off when the link looks congested
+    – events piling up behind it, a round trip above ``rtt_high`` seconds, or
+    frames needing more than half the measured send throughput – and
+    creeps back up by ``step_hz`` otherwise, always within
+    ``[min_hz, max_hz]``.
+    """
+
+    def __init__(self, min_hz: float, max_hz: float, *, step_hz: float = 0.5,
+                 backoff: float = 0.7, rtt_high: float = 0.3, queue_high: int = 8) -> None:
+        self.min_hz, self.max_hz = min_hz, max_hz
+        self.hz         = max_hz
+        self.step_hz    = step_hz
+        self.backoff    = backoff
+        self.rtt_high   = rtt_high
+        self.queue_high = queue_high
+        self.bytes_per_s: Optional[float] = None     # measured send throughput
+        self.frame_bytes: Optional[float] = None
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.hz
+
+    def set_bounds(self, min_hz: float, max_hz: float) -> None:
+        self.min_hz, self.max_hz = min_hz, max_hz
+        self.hz = min(max(self.hz, min_hz), max_hz)
+
+    def congested(self, backlog: int, rtt: Optional[float]) -> bool:
+        if backlog > self.queue_high or (rtt is not None and rtt > self.rtt_high):
+            return True
+        return (self.bytes_per_s is not None
+                and self.hz * (self.frame_bytes or 0) > 0.5 * self.bytes_per_s)
+
+    def on_sent(self, nbytes: int, send_s: float, backlog: int, rtt: Optional[float]) -> None:
+        """Account for one state frame that took *send_s* seconds to hand over."""
+        self.frame_bytes = _ewma(self.frame_bytes, nbytes)
+        if send_s > 0:
+            self.bytes_per_s = _ewma(self.bytes_per_s, nbytes / send_s)
+        if self.congested(backlog, rtt):
+            self.hz = max(self.min_hz, self.hz * self.backoff)
+        else:
+            self.hz = min(self.max_hz, self.hz + self.step_hz)
+
+
+def _ewma(avg: Optional[float], x: float, alpha: float = 0.2) -> float:
+    return x if avg is None else avg + (x - avg) * alpha
+
+
+class Outbox:
+    """Outbound frames of one socket, drained by :meth:`run`.
+
+    *encode* turns a ``state`` payload (or *None*) plus a list of event
+    messages into this socket's wire frame and *keyframe* returns the room's
+    current full ``state`` payload.
+    """
+
+    def __init__(self, ws, encode: Callable[[Optional[Dict[str, Any]], List[Any]], Any],
+                 keyframe: Callable[[], Dict[str, Any]], *,
+                 rate: Optional[RateController] = None,
+                 max_queue: int = 256, max_lag: float = 5.0) -> None:
+        self.ws        = ws
+        self.encode    = encode
+        self.keyframe  = keyframe
+        self.rate      = rate or RateController(60.0, 60.0)
+        self.max_queue = max_queue
+        self.max_lag   = max_lag
+        self.closed    = False
+        self.sent = self.merged = self.bytes_sent = 0
+
+        self._queue: Deque[Any] = collections.deque()
+        self._state: Optional[Dict[str, Any]] = None  # pending state payload
+        self._events: List[Any] = []                  # pending event messages
+        self._frame: Any = None                       # wire form of exactly the two, if known
+        self._need_key   = False
+        self._next_state = 0.0                    # monotonic time the next state is due
+        self._busy_since: Optional[float] = None  # monotonic start of the send in flight
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event(); self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------ posting (never blocks)
+    def post(self, frame: Any) -> None:
+        """Queue a frame that must arrive (events, lobby, errors)."""
+        if self.closed or self._lagging():
+            return
+        if len(self._queue) + len(self._events) >= self.max_queue:
+            self.close(f"{len(self._queue) + len(self._events)} frames queued")
+            return
+        self._queue.append(frame)
+        self._idle.clear()
+        self._wake.set()
+
+    def post_state(self, payload: Optional[Dict[str, Any]], frame: Any = None,
+                   events: List[Any] = ()) -> None:
+        """Offer a tick's ``state`` payload and the events that came with it.
+
+        *frame* is their wire form, if already encoded; it is only used when
+        nothing else is pending.
+        """
+        if self.closed or self._lagging():
+            return
+        fresh = self._state is None and not self._events and not self._need_key
+        if events:
+            if len(self._queue) + len(self._events) + len(events) > self.max_queue:
+                self.close(f"{len(self._queue) + len(self._events)} frames queued")
+                return
+            self._events.extend(events)
+            self._idle.clear()
+        if payload is not None and not self._need_key:   # a pending keyframe covers it
+            if self._state is not None:
+                payload = merge_state(self._state, payload)
+                self.merged += 1
+            self._state = payload
+        self._frame = frame if fresh else None
+        self._wake.set()
+
+    def request_keyframe(self) -> None:
+        """Send the full state next, right away (joins, resync requests)."""
+        if not self.closed:
+            self._state, self._frame, self._need_key = None, None, True
+            self._idle.clear()
+            self._wake.set()
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue) + len(self._events) + (self._state is not None or self._need_key)
+
+    def _lagging(self) -> bool:
+        busy = self._busy_since
+        if busy is not None and time.monotonic() - busy > self.max_lag:
+            self.close(f"send stuck for {time.monotonic() - busy:.1f}s")
+            return True
+        return False
+
+    # ------------------------------------------------ writer
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._idle.set()
+
+    async def flush(self) -> None:
+        """Wait until every queued frame and requested keyframe has been sent."""
+        await self._idle.wait()
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until there is something to send (*None*: nothing pending)."""
+        if self._queue or self._need_key or self._events:
+            return 0.0
+        if self._state is None:
+            return None
+        return max(0.0, self._next_state - time.monotonic())
+
+    def _next(self) -> Tuple[Any, bool]:
+        """The next frame to send and whether it is a state frame."""
+        if self._queue:
+            return self._queue.popleft(), False
+        state  = self.keyframe() if self._need_key else self._state
+        events, frame = self._events, self._frame
+        self._state, self._events, self._frame, self._need_key = None, [], None, False
+        return (frame if frame is not None else self.encode(state, events)), state is not None
+
+    async def run(self) -> None:
+        while not self.closed:
+            due = self._due_in()
+            if due != 0.0:
+                if not self._queue and not self._need_key and not self._events:
+                    self._idle.set()
+                self._wake.clear()
+                if due is None:
+                    await self._wake.wait()
+                else:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), due)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+
+            frame, is_state = self._next()
+            start = self._busy_since = time.monotonic()
+            t = TRACER.clock() if TRACER.on else 0
+            try:
+                await self.ws.send(frame)
+            except Exception as e:
+                self.close(f"send failed: {e.__class__.__name__}")
+                break
+            finally:
+                self._busy_since = None
+            if t:
+                TRACER.span("send:state" if is_state else "send", t, f"send:{peer_name(self.ws)}",
+                            {"bytes": len(frame)})
+            self.sent += 1
+            self.bytes_sent += len(frame)
+            if is_state:
+                self.rate.on_sent(len(frame), time.monotonic() - start, len(self._queue),
+                                  getattr(self.ws, "latency", None))
+                # keep slots on a grid, or wake-up latency adds up into a missed slot
+                nxt = self._next_state + self.rate.interval
+                self._next_state = nxt if nxt > start else start + self.rate.interval
+
+    # ------------------------------------------------ slow consumer
+    def close(self, reason: str) -> None:
+        """Drop the client: stop queueing and close its socket."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._state, self._events, self._frame, self._need_key = None, [], None, False
+        self._idle.set()
+        _log.warn("drop_slow_client", reason=reason)
+        close = getattr(self.ws, "close", None)
+        if close is not None:
+            res = close()
+            if inspect.isawaitable(res):
+                asyncio.ensure_future(res)
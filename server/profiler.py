@@ -0,0 +1,177 @@
+# =============================================================
+# Filename: server/profiler.py  (HEADLESS)
+# =============================================================
+"""profiler – time-boxed profiles of a running server, written to disk.
+
+Two modes, one session at a time per process:
+
+``sample``
+    :class:`StackSampler` – a daemon thread reads the event-loop thread's
+    stack every ``interval`` seconds (``sys._current_frames``) and counts
+    identical stacks.  Output: ``*.collapsed`` (``a;b;c count`` per line,
+    root first – ``flamegraph.pl`` / speedscope read it).  The loop itself
+    does no extra work, so this is safe under real traffic.
+
+``ticks``
+    A deterministic :mod:`cProfile` window around every room's tick
+    (``Room._step`` – collisions, piece updates, the win check) and nothing
+    else.  Output: ``*.pstats`` (``python -m pstats FILE``).
+
+``trace``
+    :data:`tracing.TRACER` records tick phases, encodes, sends and inbound
+    frames as spans.  Output: ``*.trace.json`` (``chrome://tracing``,
+    Perfetto).
+
+Triggers: ``SIGUSR1`` (sample) / ``SIGUSR2`` (ticks) via
+:func:`install_signal_handlers`, or an ``admin`` message carrying the
+server's admin token (see ``rooms.serve_connection``)::
+
+    {"type": "admin", "payload": {"token": "...", "op": "profile",
+                                  "mode": "sample", "seconds": 10}}
+"""
+from __future__ import annotations
+import asyncio, collections, cProfile, os, pathlib, signal, sys, tempfile, threading, time
+from typing import Counter, Dict, List, Optional
+
+from shared import slog
+from tracing import TRACER
+
+_log = slog.get_logger("profiler")
+
+MODES       = ("sample", "ticks", "trace")
+MAX_SECONDS = 120.0
+
+
+class ProfileError(RuntimeError):
+    """A profile could not be started (bad mode, one already running …)."""
+
+
+# ───────────── statistical sampler ────────────────────────────
+class StackSampler:
+    """Counts the stacks of thread *thread_id* seen every *interval* seconds."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval  = interval
+        self.samples   = 0
+        self.stacks: Counter[str] = collections.Counter()
+        self._stop   = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kfc-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: pathlib.Path) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, n in self.stacks.most_common():
+                fh.write(f"{stack} {n}\n")
+
+
+# ───────────── sessions ───────────────────────────────────────
+class Profiler:
+    """Runs profile sessions against the rooms of a :class:`rooms.RoomManager`."""
+
+    def __init__(self, rooms, out_dir: Optional[str | pathlib.Path] = None) -> None:
+        self.rooms   = rooms
+        self.out_dir = pathlib.Path(out_dir or os.environ.get("KFC_PROFILE_DIR")
+                                    or tempfile.gettempdir())
+        self.running: Optional[str] = None
+
+    async def run(self, mode: str = "sample", seconds: float = 10.0,
+                  room: Optional[str] = None) -> pathlib.Path:
+        """Profile for *seconds* (only the ticks of *room*, if given); returns the file."""
+        if mode not in MODES:
+            raise ProfileError(f"unknown profile mode {mode!r}")
+        if self.running is not None:
+            raise ProfileError(f"{self.running} profile already running")
+        seconds = min(max(float(seconds), 0.1), MAX_SECONDS)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.running = mode
+        try:
+            if mode == "sample":
+                path = self.out_dir / f"kfc-{os.getpid()}-{stamp}.collapsed"
+                sampler = StackSampler().start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    sampler.stop()
+                sampler.write_collapsed(path)
+            elif mode == "ticks":
+                path = self.out_dir / f"kfc-{os.getpid()}-{stamp}.pstats"
+                prof = await self._profile_ticks(seconds, room)
+                prof.dump_stats(str(path))
+            else:
+                path = self.out_dir / f"kfc-{os.getpid()}-{stamp}.trace.json"
+                TRACER.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    TRACER.stop()
+                TRACER.write(path)
+        finally:
+            self.running = None
+        _log.info("written", mode=mode, seconds=seconds, path=str(path))
+        return path
+
+    async def _profile_ticks(self, seconds: float, room_id: Optional[str]) -> cProfile.Profile:
+        prof = cProfile.Profile()
+        wrapped: Dict[object, object] = {}
+        for rid, room in list(self.rooms.rooms.items()):
+            if room_id is None or rid == room_id:
+                sched = room.scheduler
+                wrapped[sched] = sched.step
+                sched.step = _profiled(prof, sched.step)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            for sched, step in wrapped.items():
+                sched.step = step
+        return prof
+
+
+def _profiled(prof: cProfile.Profile, step):
+    def run(now_ms: int) -> None:
+        prof.enable()
+        try:
+            step(now_ms)
+        finally:
+            prof.disable()
+    return run
+
+
+def install_signal_handlers(loop: asyncio.AbstractEventLoop, profiler: Profiler,
+                            seconds: float = 10.0) -> None:
+    """``SIGUSR1`` → sampled profile, ``SIGUSR2`` → tick profile (POSIX only)."""
+    if sys.platform == "win32":
+        return
+
+    def trigger(mode: str) -> None:
+        task = loop.create_task(profiler.run(mode, seconds))
+        task.add_done_callback(_report)
+
+    loop.add_signal_handler(signal.SIGUSR1, trigger, "sample")
+    loop.add_signal_handler(signal.SIGUSR2, trigger, "ticks")
+
+
+def _report(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        _log.warn("failed", error=repr(task.exception()))
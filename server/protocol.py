@@ -2,12 +2,16 @@
 # File: server/protocol.py   – authoritative ↔ client serialisation
 # ===================================================================
 from __future__ import annotations
-import time
-from typing import Dict, Any
+import json, time
+from typing import Dict, Any, List, Tuple
 from dataclasses import asdict, is_dataclass
 
 from shared.command_dto    import to_dict as cmd_to_dict, from_dict as cmd_from_dict
 from shared.message_schema import Message
+from shared.wire_codec     import BinaryCodec, WireEncodeError
+from shared                import slog
+
+_log = slog.get_logger("protocol")
 
 # -------------------------------------------------------------------
 # Encoding helpers ---------------------------------------------------
@@ -31,19 +35,182 @@ def encode_state(game) -> Dict[str, Any]:
     """Server snapshot → dict for initial sync / resync."""
     return {
         "board": {"rows": game.board.H_cells, "cols": game.board.W_cells},
-        "pieces": [
-            {
-                "id":        p.piece_id,
-                "cell":      p.current_state.physics.get_current_cell(),
-                "pixel":     p.current_state.physics.current_pixel_pos,
-                "state":     p.current_state.state_name,      #  ← NEW
-                "captured":  bool(getattr(p, "is_captured", False)),
-            }
-            for p in game.pieces
-        ],
+        "pieces": [_piece_dict(p.piece_id, _piece_row(p)) for p in game.pieces],
         "ts": game.game_time_ms(),
     }
 
+
+def _piece_row(p) -> Tuple[Any, Any, str, bool]:
+    """The fields of one piece that go on the wire, as a comparable tuple."""
+    phys = p.current_state.physics
+    return (phys.get_current_cell(), phys.current_pixel_pos,
+            p.current_state.state_name, bool(getattr(p, "is_captured", False)))
+
+
+def _piece_dict(pid: str, row: Tuple[Any, Any, str, bool]) -> Dict[str, Any]:
+    cell, pixel, state, captured = row
+    return {"id": pid, "cell": cell, "pixel": pixel, "state": state, "captured": captured}
+
+# -------------------------------------------------------------------
+# Delta snapshots ----------------------------------------------------
+
+class SnapshotEncoder:
+    """Per-room ``state`` payloads: sequence-numbered keyframes + deltas.
+
+    Every call to :meth:`next_frame` advances the room's snapshot clock.
+    A frame lists only the pieces whose wire fields changed since the last
+    *sent* frame (``"key": False``); every ``keyframe_every`` calls – and on
+    the very first one – a full keyframe (``"key": True``) is sent instead.
+    ``keyframe_every=1`` therefore means "full snapshots only".
+    """
+
+    def __init__(self, keyframe_every: int = 120) -> None:
+        self.keyframe_every = max(1, keyframe_every)
+        self.seq = 0
+        self.ts  = 0
+        self._last: Dict[str, Tuple[Any, Any, str, bool]] = {}
+        self._board: Dict[str, int] = {}
+        self._since_key = 0
+
+    def next_frame(self, game) -> Dict[str, Any] | None:
+        """Payload of the next broadcast frame, or *None* if nothing changed."""
+        self._since_key += 1
+        if not self._last or self._since_key >= self.keyframe_every:
+            self._capture(game)
+            self.seq += 1
+            return self._keyframe()
+
+        last, changed = self._last, []
+        for p in game.pieces:
+            row = _piece_row(p)
+            if last.get(p.piece_id) != row:
+                last[p.piece_id] = row
+                changed.append(_piece_dict(p.piece_id, row))
+        if not changed:
+            return None
+
+        self.seq += 1
+        self.ts   = game.game_time_ms()
+        return {"seq": self.seq, "key": False, "pieces": changed, "ts": self.ts}
+
+    def keyframe(self, game) -> Dict[str, Any]:
+        """Full frame at the *current* sequence number – for joins / resyncs.
+
+        It mirrors what the other clients already hold, so the next delta
+        applies cleanly on top of it.
+        """
+        if not self._last:
+            self._capture(game)
+        return self._keyframe()
+
+    # ------------------------------------------------------------------
+    def _capture(self, game) -> None:
+        self._board = {"rows": game.board.H_cells, "cols": game.board.W_cells}
+        self._last  = {p.piece_id: _piece_row(p) for p in game.pieces}
+        self.ts     = game.game_time_ms()
+        self._since_key = 0
+
+    def _keyframe(self) -> Dict[str, Any]:
+        return {
+            "seq":    self.seq,
+            "key":    True,
+            "board":  self._board,
+            "pieces": [_piece_dict(pid, row) for pid, row in self._last.items()],
+            "ts":     self.ts,
+        }
+
+
+def merge_state(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+    """One ``state`` payload equivalent to applying *older* and then *newer*.
+
+    Every delta row carries all wire fields of its piece, so the later row
+    simply wins.  A merged delta gets ``"base"`` – the ``seq`` it applies on
+    top of – because it now covers more than one step.
+    """
+    if newer.get("key", True):
+        return newer
+    pieces = {p["id"]: p for p in older["pieces"]}
+    pieces.update((p["id"], p) for p in newer["pieces"])
+    out = dict(newer, pieces=list(pieces.values()))
+    if older.get("key", True):                  # a keyframe stays a keyframe
+        out["key"], out["board"] = True, older["board"]
+        out.pop("base", None)
+    else:
+        out["base"] = older.get("base", older["seq"] - 1)
+    return out
+
+# -------------------------------------------------------------------
+# Binary wire format (negotiated per connection) ---------------------
+
+def binary_codec_for(game) -> BinaryCodec:
+    """Piece-id / state-name dictionary of *game* for :mod:`shared.wire_codec`."""
+    states: List[str] = []
+    seen: set[int] = set()
+
+    def walk(st) -> None:
+        if st is None or id(st) in seen:
+            return
+        seen.add(id(st))
+        if st.state_name not in states:
+            states.append(st.state_name)
+        machine = getattr(st, "machine", None)
+        if machine is not None:                 # names from the specs – don't build states
+            states.extend(n for n in machine.spec.states if n not in states)
+            return
+        for nxt in getattr(st, "transitions", {}).values():
+            walk(nxt)
+
+    for p in game.pieces:
+        walk(getattr(p, "initial_state", None))
+        walk(p.current_state)
+    return BinaryCodec([p.piece_id for p in game.pieces], states)
+
+
+def encode_frame(tp: str, payload: Dict[str, Any], codec: BinaryCodec | None = None) -> str | bytes:
+    """Wire form of one ``state`` / ``event`` message for a connection.
+
+    *codec* is the room's :class:`BinaryCodec` for binary connections and
+    *None* for JSON ones; anything the binary format cannot express falls
+    back to the JSON text frame.
+    """
+    if codec is not None:
+        try:
+            if tp == "state":
+                return codec.encode_state(payload)
+            if tp == "event":
+                return codec.encode_event(payload)
+        except WireEncodeError as e:
+            _log.warn("json_fallback", frame=tp, error=str(e))
+    return json.dumps({"type": tp, "payload": payload})
+
+
+def encode_batch(state: Dict[str, Any] | None, events: List[Dict[str, Any]],
+                 codec: BinaryCodec | None = None) -> str | bytes:
+    """One tick's ``state`` payload and ``event`` messages as a single frame.
+
+    The client applies the state first, then the events in order.  A lone
+    state or a lone event goes out as its plain frame.
+    """
+    if not events:
+        return encode_frame("state", state, codec)
+    if state is None and len(events) == 1:
+        return encode_frame("event", events[0], codec)
+    if codec is not None:
+        try:
+            return codec.encode_batch(state, events)
+        except WireEncodeError as e:
+            _log.warn("json_fallback", frame="batch", error=str(e))
+    return json.dumps({"type": "batch", "payload": {"state": state, "events": events}})
+
+
+def decode_frame(raw: str | bytes, codec: BinaryCodec | None = None) -> Dict[str, Any]:
+    """Inverse of :func:`encode_frame`."""
+    if isinstance(raw, (bytes, bytearray)):
+        if codec is None:
+            raise ValueError("binary frame without a dictionary")
+        return codec.decode(bytes(raw))
+    return json.loads(raw)
+
 # -------------------------------------------------------------------
 # Helper – list→tuple for JSON round‑tripping ------------------------
 
@@ -0,0 +1,149 @@
+# =============================================================
+# Filename: server/replay.py  (HEADLESS)
+# =============================================================
+"""replay – seek around in a recorded match and play it back.
+
+A :mod:`journal` holds every frame the room broadcast plus a full-state
+keyframe at least every ``keyframe_ms`` (5 s), and ends with an index of
+``(ts, offset)`` per keyframe.  :class:`Replay` loads the file (a finished
+match is a few hundred KiB), reads that index from the end – or builds it
+with one scan while the match is still being written – and
+:meth:`Replay.seek` jumps to any time: the nearest keyframe at or before it,
+merged (:func:`protocol.merge_state`) with only the deltas in between, as a
+single ``state`` payload.
+
+:class:`Playback` adds a position that moves with the wall clock at
+¼× … 32× and hands out the messages it passes, exactly as
+``client/net.py`` would queue them – ``ClientModel.load_snapshot`` and
+``apply_event`` take them unchanged (``python -m client.main --replay FILE``).
+"""
+from __future__ import annotations
+import bisect, json, pathlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import journal
+from protocol          import merge_state
+from shared.message_schema import unbatch
+from shared.wire_codec import BinaryCodec
+
+SPEEDS    = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+MAX_SPEED = SPEEDS[-1]
+
+Msg = Dict[str, Any]
+
+
+class Replay:
+    """A loaded journal: header, result and the keyframe index."""
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.data = journal.load(path)
+        _, tag, body = next(journal.scan(self.data), (0, b"", b""))
+        if tag != b"H":
+            raise journal.JournalError("no header")
+        self.header: Dict[str, Any] = json.loads(body)
+        self.codec = BinaryCodec(self.header["pieces"], self.header.get("states", []))
+        index = journal.index_of(self.data)
+        if index is not None:
+            self.keys: List[Tuple[int, int]] = [(ts, at) for ts, at in index["keys"]]
+            self.end_ms: int = index["end_ms"]
+        else:
+            self._build_index()
+        if not self.keys:
+            raise journal.JournalError("no keyframe")
+        self.start_ms = self.keys[0][0]
+        self._key_ts  = [ts for ts, _ in self.keys]
+
+    def _build_index(self) -> None:
+        """One pass over a journal without an index (the match is still running)."""
+        self.keys, self.end_ms, good = [], 0, len(self.data)
+        try:
+            for at, tag, body in journal.scan(self.data):
+                good = at + journal.RECORD_HEADER + len(body)
+                if tag in (b"F", b"K"):
+                    ts, frame = journal.split_frame(body)
+                    self.end_ms = max(self.end_ms, ts)
+                    if tag == b"K" or any(m["type"] == "state" and m["payload"].get("key", True)
+                                          for m in self.messages(frame)):
+                        self.keys.append((ts, at))
+        except journal.JournalError:                        # a half-written last record
+            self.data = self.data[:good]
+
+    # ------------------------------------------------ decoding
+    def messages(self, frame: bytes) -> List[Msg]:
+        """One recorded wire frame → ``state`` / ``event`` messages, in order."""
+        msg = json.loads(frame) if frame[:1] == b"{" else self.codec.decode(frame)
+        return unbatch(msg)
+
+    # ------------------------------------------------ seeking
+    def seek(self, ts: int) -> Tuple[Msg, List[Msg], int]:
+        """The ``state`` payload at *ts*, the events since its keyframe and the
+        offset of the first later frame."""
+        i = max(0, bisect.bisect_right(self._key_ts, ts) - 1)
+        state: Optional[Msg] = None
+        events: List[Msg] = []
+        for at, tag, body in journal.scan(self.data, self.keys[i][1]):
+            if tag not in (b"F", b"K"):
+                continue
+            t, frame = journal.split_frame(body)
+            if t > ts and state is not None:
+                return state, events, at
+            for m in self.messages(frame):
+                if m["type"] != "state":
+                    events.append(m)
+                elif state is None or m["payload"].get("key", True):
+                    state = m["payload"]
+                else:
+                    state = merge_state(state, m["payload"])
+        return state, events, len(self.data)
+
+
+# ───────────── playback ───────────────────────────────────────
+class Playback:
+    """A position in a :class:`Replay` that advances with the wall clock."""
+
+    def __init__(self, replay: Replay, speed: float = 1.0) -> None:
+        self.replay   = replay
+        self.position = replay.start_ms
+        self.speed    = 1.0
+        self.paused   = False
+        self._cursor  = replay.keys[0][1]
+        self.set_speed(speed)
+
+    @property
+    def done(self) -> bool:
+        return self.position >= self.replay.end_ms
+
+    def set_speed(self, speed: float) -> float:
+        self.speed = min(max(float(speed), SPEEDS[0]), MAX_SPEED)
+        return self.speed
+
+    def faster(self) -> float:
+        return self.set_speed(next((s for s in SPEEDS if s > self.speed), MAX_SPEED))
+
+    def slower(self) -> float:
+        return self.set_speed(next((s for s in reversed(SPEEDS) if s < self.speed), SPEEDS[0]))
+
+    def seek(self, ts: float) -> List[Msg]:
+        """Jump to *ts* (clamped to the match): one ``state`` message, then the
+        events fast-forwarded over (for the model – not for sounds or logs)."""
+        ts = min(max(int(ts), self.replay.start_ms), self.replay.end_ms)
+        state, events, self._cursor = self.replay.seek(ts)
+        self.position = ts
+        return [{"type": "state", "payload": state}] + events
+
+    def advance(self, wall_ms: float) -> List[Msg]:
+        """Move on by *wall_ms* × speed; the messages of every frame passed."""
+        if self.paused or self.done:
+            return []
+        self.position = min(self.position + wall_ms * self.speed, self.replay.end_ms)
+        out: List[Msg] = []
+        for at, tag, body in journal.scan(self.replay.data, self._cursor):
+            if tag != b"F":                                 # keyframes only serve seeks
+                continue
+            ts, frame = journal.split_frame(body)
+            if ts > self.position:
+                self._cursor = at
+                return out
+            out += self.replay.messages(frame)
+        self._cursor = len(self.replay.data)
+        return out
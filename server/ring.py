@@ -0,0 +1,189 @@
+# =============================================================
+# Filename: server/ring.py  (HEADLESS)
+# =============================================================
+"""ring – one room's outgoing frames in shared memory, for spectator fan-out.
+
+The process that runs a room publishes every frame it broadcasts – already
+encoded, JSON and binary – once into a :class:`FrameRing`; any number of
+``server/fanout.py`` processes on the same machine attach to it by name and
+push the frames to their spectators.  The game process therefore pays the
+same per frame whether a match has no watchers or thousands.
+
+Layout (little-endian, one writer, any number of readers):
+
+    header : magic:4s version:u8 closed:u8 pad:2 slots:u32 slot_size:u32
+             meta_len:u32 head:u64                      (padded to 64 bytes)
+    meta   : meta_len bytes of JSON (the binary codec dictionary)
+    slot   : seq:u64 kind:u8 text_len:u32 bin_len:u32 text bin
+
+``head`` counts records ever published; record *n* lives in slot
+``n % slots`` and is valid while that slot's ``seq`` reads ``n + 1`` both
+before and after a reader copies it out (the writer zeroes ``seq`` first,
+then fills the slot, then stamps it).  A reader that falls a whole ring
+behind skips ahead to the next keyframe.
+"""
+from __future__ import annotations
+import hashlib, json, struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, List, NamedTuple, Optional
+
+from shared import slog
+
+_log = slog.get_logger("ring")
+
+KEY, DELTA, EVENT, OTHER = 1, 2, 3, 4           # record kinds
+
+_MAGIC   = b"KFCR"
+_HDR     = struct.Struct("<4sBB2xIIIQ")
+_HDR_LEN = 64
+_CLOSED  = 5                                    # offset of the closed flag
+_HEAD    = 20                                   # offset of head
+_SLOT    = struct.Struct("<QBII")
+_U64     = struct.Struct("<Q")
+META_MAX = 16 * 1024
+
+_created: set = set()                           # rings this process created
+
+
+def ring_name(room_id: str, prefix: str = "kfc") -> str:
+    """Shared-memory name of *room_id*'s ring (short enough for every OS)."""
+    return f"{prefix}_{hashlib.blake2b(room_id.encode('utf-8'), digest_size=8).hexdigest()}"
+
+
+class Frame(NamedTuple):
+    kind:   int
+    text:   str                                  # JSON text frame
+    binary: Optional[bytes]                      # binary frame, if it has one
+
+
+class FrameRing:
+    """A fixed-size shared-memory ring of encoded frames."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm   = shm
+        self.owner = owner
+        magic, _ver, _closed, self.slots, self.slot_size, self.meta_len, _head = \
+            _HDR.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self._base = _HDR_LEN + META_MAX
+        self._head = _head
+
+    # ------------------------------------------------ lifecycle
+    @classmethod
+    def create(cls, name: str, *, slots: int = 256, slot_size: int = 16 * 1024,
+               meta: str = "") -> "FrameRing":
+        raw = meta.encode("utf-8")
+        if len(raw) > META_MAX:
+            raise ValueError("ring meta too large")
+        size = _HDR_LEN + META_MAX + slots * slot_size
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:                  # left over by a crashed process
+            stale = shared_memory.SharedMemory(name)
+            stale.close(); stale.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        _HDR.pack_into(shm.buf, 0, _MAGIC, 1, 0, slots, slot_size, len(raw), 0)
+        shm.buf[_HDR_LEN:_HDR_LEN + len(raw)] = raw
+        _created.add(shm._name)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        """Open an existing ring (``FileNotFoundError`` if nobody publishes it)."""
+        shm = shared_memory.SharedMemory(name)
+        if shm._name not in _created:
+            # only the creator may unlink it – keep this process's tracker out of it
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        """Writer: mark the ring finished and remove it.  Reader: detach."""
+        if self.owner:
+            self.shm.buf[_CLOSED] = 1
+            self.shm.close()
+            self.shm.unlink()
+            _created.discard(self.shm._name)
+        else:
+            self.shm.close()
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.shm.buf[_CLOSED])
+
+    @property
+    def head(self) -> int:
+        return _U64.unpack_from(self.shm.buf, _HEAD)[0]
+
+    @property
+    def meta(self) -> Any:
+        raw = bytes(self.shm.buf[_HDR_LEN:_HDR_LEN + self.meta_len])
+        return json.loads(raw) if raw else None
+
+    # ------------------------------------------------ writer
+    def publish(self, kind: int, text: str, binary: Optional[bytes] = None) -> bool:
+        """Append one frame; *False* (and nothing written) if it doesn't fit a slot."""
+        txt = text.encode("utf-8")
+        room = self.slot_size - _SLOT.size
+        if binary is not None and len(txt) + len(binary) > room:
+            binary = None                        # readers re-send the text form
+        if len(txt) > room:
+            _log.warn("frame_too_big", bytes=len(txt), slot=room)
+            return False
+        n, buf = self._head, self.shm.buf
+        off = self._base + (n % self.slots) * self.slot_size
+        _SLOT.pack_into(buf, off, 0, kind, len(txt), len(binary or b""))
+        data = off + _SLOT.size
+        buf[data:data + len(txt)] = txt
+        if binary:
+            buf[data + len(txt):data + len(txt) + len(binary)] = binary
+        _U64.pack_into(buf, off, n + 1)
+        self._head = n + 1
+        _U64.pack_into(buf, _HEAD, n + 1)
+        return True
+
+    # ------------------------------------------------ reader
+    def read(self, n: int) -> Optional[Frame]:
+        """Record *n*, or *None* if it has been overwritten (or is being written)."""
+        buf = self.shm.buf
+        off = self._base + (n % self.slots) * self.slot_size
+        seq, kind, tlen, blen = _SLOT.unpack_from(buf, off)
+        if seq != n + 1:
+            return None
+        data  = off + _SLOT.size
+        text  = bytes(buf[data:data + tlen])
+        blob  = bytes(buf[data + tlen:data + tlen + blen]) if blen else None
+        if _U64.unpack_from(buf, off)[0] != seq:
+            return None
+        return Frame(kind, text.decode("utf-8"), blob)
+
+
+class RingReader:
+    """A cursor over a :class:`FrameRing` that starts at the latest keyframe."""
+
+    def __init__(self, ring: FrameRing) -> None:
+        self.ring = ring
+        self.lost = 0                            # times we fell a ring behind
+        self._next = self._latest_key()
+
+    def _latest_key(self) -> int:
+        head = self.ring.head
+        for n in range(head - 1, max(-1, head - 1 - self.ring.slots), -1):
+            f = self.ring.read(n)
+            if f is not None and f.kind == KEY:
+                return n
+        return head
+
+    def poll(self) -> List[Frame]:
+        """Frames published since the last poll (an empty list if none)."""
+        head, out = self.ring.head, []
+        while self._next < head:
+            f = self.ring.read(self._next)
+            if f is None:                        # overwritten – skip to a keyframe
+                self.lost += 1
+                self._next = self._latest_key()
+                head = self.ring.head
+                continue
+            out.append(f)
+            self._next += 1
+        return out
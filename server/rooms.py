@@ -0,0 +1,648 @@
+# =============================================================
+# Filename: server/rooms.py  (HEADLESS)
+# =============================================================
+"""rooms – many independent matches inside one server process.
+
+A :class:`Room` owns everything that used to live in the module globals of
+``server/main.py`` (the ``Game``, its ``EventBus``, the player seats, the
+connected sockets and the three background tasks).  The
+:class:`RoomManager` creates rooms on the first ``join`` that names them and
+garbage-collects rooms that stayed empty for ``idle_ttl`` seconds.
+
+Frames to the clients go through one :class:`outbox.Outbox` per socket, so a
+slow client only delays (and eventually disconnects) itself.  A room can also
+publish its frames into a shared-memory :class:`ring.FrameRing`, from which
+``server/fanout.py`` processes serve spectators without costing the room
+anything per spectator.
+
+The module expects :mod:`server.bootstrap` to have been imported first.
+"""
+from __future__ import annotations
+import asyncio, csv, heapq, hmac, itertools, json, pathlib, time, traceback
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core.engine.Board        import Board
+from core.pieces.PieceFactory import PieceFactory
+from core.game.game           import Game
+from core.engine              import events as ev
+from protocol                 import (SnapshotEncoder, binary_codec_for, encode_batch, encode_event,
+                                       encode_state)
+from ingest                   import CommandIngest, IngestError
+from journal                  import Journal
+from metrics                  import Metrics, peer_name
+from profiler                 import ProfileError, Profiler
+from tracing                  import TRACER
+from outbox                   import Outbox, RateController
+from ring                     import DELTA, EVENT, KEY, OTHER, FrameRing, ring_name
+from scheduler                import FixedStepScheduler, TickStats
+from shared.wire_codec        import BinaryCodec, SUBPROTOCOL_BINARY
+from shared                   import slog
+
+DEFAULT_ROOM   = "default"
+MAX_ROOM_ID    = 32
+COLORS         = ("WHITE", "BLACK")
+
+_log = slog.get_logger("rooms")
+
+#: every event type that is forwarded to the clients of a room
+BROADCAST_EVENTS = (ev.MovePlayed, ev.JumpPlayed, ev.PieceTaken,
+                    ev.ErrorPlayed, ev.GameStarted, ev.GameEnded, ev.StateChanged)
+
+
+class RoomError(Exception):
+    """Raised when a room cannot be opened (bad id, server full …)."""
+
+
+# ───────────── game construction ──────────────────────────────
+def build_game(csv_path: pathlib.Path, pieces_root: pathlib.Path) -> Game:
+    """Create a fresh 8×8 :class:`Game` from the CSV layout."""
+    board   = Board(64, 64, 8, 8)
+    factory = PieceFactory(board, pieces_root)
+    pieces: List[Any] = []
+
+    with csv_path.open(newline="", encoding="utf-8") as fh:
+        for r, row in enumerate(csv.reader(fh)):
+            for c, code in enumerate(row):
+                code = code.strip()
+                if code:
+                    pieces.append(factory.create_piece(code, (r, c)))
+
+    game = Game(pieces, board); board.game = game
+    return game
+
+
+def normalize_room_id(raw: Any) -> str:
+    """Validate the room name a client asked for (empty → default room)."""
+    room_id = str(raw or "").strip() or DEFAULT_ROOM
+    if len(room_id) > MAX_ROOM_ID or not room_id.isprintable():
+        raise RoomError("bad room id")
+    return room_id
+
+
+async def send_error(ws, err: str) -> None:
+    await ws.send(json.dumps({"type": "error", "payload": {"err": err}}))
+
+
+# ───────────── admin channel ──────────────────────────────────
+async def handle_admin(rooms: "RoomManager", ws, payload: Any) -> None:
+    """Operator requests; only honoured when the manager has an admin token.
+
+    ``op="profile"`` (``mode``, ``seconds``, ``room``) answers once the
+    profile file is written; ``op="log"`` (``levels``) changes log levels.
+    """
+    p = payload if isinstance(payload, dict) else {}
+    token = rooms.admin_token
+    if not token or not hmac.compare_digest(str(p.get("token", "")).encode(), token.encode()):
+        await send_error(ws, "forbidden")
+        return
+    op = p.get("op")
+    try:
+        if op == "profile":
+            path = await rooms.profiler.run(str(p.get("mode", "sample")),
+                                            float(p.get("seconds", 10.0)), p.get("room"))
+            reply: Dict[str, Any] = {"op": op, "path": str(path)}
+        elif op == "log":
+            slog.configure(str(p.get("levels", "")))
+            reply = {"op": op, "levels": slog.levels()}
+        else:
+            await send_error(ws, "unknown admin op")
+            return
+    except (ProfileError, ValueError, TypeError) as e:
+        await send_error(ws, str(e))
+        return
+    await ws.send(json.dumps({"type": "admin", "payload": reply}))
+
+
+# ───────────── connection handler ─────────────────────────────
+async def serve_connection(rooms: "RoomManager", ws) -> None:
+    """Drive one client socket: route its *join* to a room, then its commands.
+
+    *ws* is anything that iterates incoming text frames and has an async
+    ``send`` – a real WebSocket or a :class:`cluster.ProxySocket`.
+    """
+    room: Optional[Room] = None
+    spectating = False
+    tr = TRACER
+    try:
+        async for raw in ws:
+            t, tp = (tr.clock() if tr.on else 0), None
+            try:
+                try:
+                    data = rooms.ingest.parse(raw)
+                except IngestError as e:
+                    await send_error(ws, str(e))
+                    continue
+                tp = data.get("type")
+
+                # -------------------- ADMIN -------------------
+                if tp == "admin":
+                    await handle_admin(rooms, ws, data.get("payload"))
+                    continue
+
+                # -------------------- SPECTATE ----------------
+                if tp == "spectate":
+                    if room is None:
+                        try:
+                            room = rooms.get(normalize_room_id((data.get("payload") or {}).get("room")))
+                        except RoomError as e:
+                            await send_error(ws, str(e))
+                            continue
+                        if room is None:
+                            await send_error(ws, "no such room")
+                            continue
+                        spectating = True
+                        await room.add(ws)
+                    continue
+                if spectating:                       # watchers may only ask for a resync
+                    if tp == "resync":
+                        await room.handle(ws, data)
+                    continue
+
+                # -------------------- JOIN --------------------
+                if tp == "join":
+                    payload = data.get("payload") or {}
+                    if room is None:
+                        try:
+                            room = rooms.open(payload.get("room"))
+                        except RoomError as e:
+                            await send_error(ws, str(e))
+                            continue
+                        await room.add(ws)
+                    await room.join(ws, payload)
+                    continue
+
+                # -------------------- COMMAND -----------------
+                if room is None:
+                    await send_error(ws, "join first")
+                    continue
+                await room.handle(ws, data)
+            finally:
+                if t:                            # inbound handling, next to the ticks
+                    tr.span(f"in:{tp}", t, f"in:{peer_name(ws)}")
+    finally:
+        # ניתוק
+        if room is not None:
+            await room.remove(ws)
+
+
+# ───────────── Room ───────────────────────────────────────────
+class Room:
+    """One match: game state, seats, sockets and its background tasks.
+
+    Snapshots go out at up to ``snapshot_hz`` (20 by default, a third of the
+    tick rate); clients interpolate between them
+    (:meth:`client.model.ClientModel.render_pixels`).  Each connection's
+    own rate adapts to its link between ``min_snapshot_hz`` and
+    ``snapshot_hz`` for seated players, ``spectator_hz`` for watchers.
+
+    Game events are buffered and leave together with the next snapshot, as
+    one ``batch`` frame (state first, then the events in emission order).
+    """
+
+    def __init__(self, room_id: str, game: Game, *,
+                 tick_hz: float = 60.0, snapshot_hz: float = 20.0,
+                 keyframe_every: int = 40,
+                 max_queue: int = 256, max_lag: float = 5.0,
+                 min_snapshot_hz: float = 5.0, spectator_hz: float = 10.0,
+                 ingest: Optional[CommandIngest] = None,
+                 metrics: Optional[Metrics] = None,
+                 journal_dir: Optional[str | pathlib.Path] = None) -> None:
+        self.room_id     = room_id
+        self.game        = game
+        self.bus         = game.bus
+        self.players: Dict[str, Dict[str, Any]] = {}   # color ➜ {"name": str, "ws": ws}
+        self.connected: Set[Any] = set()
+        self.outboxes: Dict[Any, Outbox] = {}             # ws ➜ its send queue
+        self.max_queue, self.max_lag = max_queue, max_lag
+        self.min_snapshot_hz = min_snapshot_hz
+        self.spectator_hz    = min(spectator_hz, snapshot_hz)
+        self.piece_by_id = {p.piece_id: p for p in game.pieces}
+        self.ingest      = ingest or CommandIngest(rows=game.board.H_cells, cols=game.board.W_cells)
+        self.metrics     = metrics or Metrics()
+        self._lane       = f"room:{room_id}"                # trace row
+        self.journal_dir = journal_dir                      # None: no command journal
+        self.journal: Optional[Journal] = None              # opened by the first command
+        self.started     = False
+        self.over        = False
+        self.snapshot_hz = snapshot_hz
+        self.scheduler   = FixedStepScheduler(self._step, tick_hz, next_wake=self._next_wake_ms,
+                                              stats=TickStats(self.metrics.tick_ms))
+        self.snapshots   = SnapshotEncoder(keyframe_every)
+        self.codec       = binary_codec_for(game)
+        self.ring: Optional[FrameRing] = None             # spectator fan-out, if published
+        self._lobby: Optional[str] = None                 # last "players" message
+        self.empty_since: Optional[float] = time.monotonic()
+
+        # sleeping tick loop: only pieces that can change are stepped
+        self._awake: Set[Any] = set(game.pieces)          # stepped every tick
+        self._timers: List[Tuple[int, int, Any]] = []     # (due_ms, seq, piece) heap
+        self._timer_seq = itertools.count()
+        self._dirty = asyncio.Event()                     # a step changed something
+
+        self._tasks: List[asyncio.Task] = []
+        self._pending: List[Dict[str, Any]] = []          # events since the last frame
+        for cls in BROADCAST_EVENTS:
+            self.bus.subscribe(cls, self._on_event)
+        self.bus.subscribe(ev.StateChanged, self._on_state_changed)
+
+    # ------------------------------------------------ lifecycle
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self.scheduler.run()),
+            asyncio.create_task(self._snapshot_loop(1.0 / self.snapshot_hz)),
+        ]
+        for t in self._tasks:
+            t.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        """A room loop died: log it and dump what led up to it."""
+        if task.cancelled() or task.exception() is None:
+            return
+        exc = task.exception()
+        _log.error("loop_failed", room=self.room_id, error=repr(exc))
+        slog.dump()
+        traceback.print_exception(exc)
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for box in self.outboxes.values():
+            await box.stop()
+        if self.journal is not None:                      # finished and compressed
+            self.journal.close(None, "closed")
+            await asyncio.get_running_loop().run_in_executor(None, self.journal.join)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def publish(self, ring: FrameRing) -> None:
+        """Also write every frame into *ring*, starting with a keyframe."""
+        self.ring = ring
+        self._publish(self.snapshots.keyframe(self.game), [], {})
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.connected
+
+    def now_ms(self) -> int:
+        """Room time on the tick grid, so commands never postdate the next step."""
+        now = self.scheduler.current_ms()
+        return self.game.game_time_ms() if now is None else now
+
+    # ------------------------------------------------ connections
+    async def add(self, ws) -> None:
+        """Attach a socket as a watcher and send it the initial snapshot."""
+        codec = self._codec_of(ws)
+        box = self.outboxes[ws] = Outbox(
+            ws, lambda state, events: encode_batch(state, events, codec),
+            lambda: self.snapshots.keyframe(self.game),
+            rate=RateController(self.min_snapshot_hz, self.spectator_hz),
+            max_queue=self.max_queue, max_lag=self.max_lag)
+        self.connected.add(ws)
+        self.empty_since = None
+        _log.info("connected", room=self.room_id, clients=len(self.connected))
+        if codec is not None:
+            box.post(json.dumps(self.codec.dictionary()))
+        box.request_keyframe()
+        box.start()
+        await box.flush()
+
+    def send_keyframe(self, ws) -> None:
+        box = self.outboxes.get(ws)
+        if box is not None:
+            box.request_keyframe()
+
+    def _codec_of(self, ws) -> Optional[BinaryCodec]:
+        """The room codec for sockets that negotiated the binary subprotocol."""
+        return self.codec if getattr(ws, "subprotocol", None) == SUBPROTOCOL_BINARY else None
+
+    async def remove(self, ws) -> None:
+        self.connected.discard(ws)
+        self.ingest.forget(ws)
+        box = self.outboxes.pop(ws, None)
+        if box is not None:
+            await box.stop()
+        for clr, info in list(self.players.items()):
+            if info["ws"] is ws:
+                del self.players[clr]
+        if not self.connected:
+            self.empty_since = time.monotonic()
+        self._broadcast_players()
+        _log.info("disconnected", room=self.room_id, clients=len(self.connected))
+
+    async def join(self, ws, payload: Dict[str, Any]) -> None:
+        """Seat *ws* as WHITE / BLACK; starts the match once both are taken."""
+        name  = (payload.get("name") or "").strip() or "Anonymous"
+        color = (payload.get("color") or "").upper()
+        if not color:
+            await send_error(ws, "missing color")
+            return
+        if color in self.players:   # צבע תפוס
+            await send_error(ws, "color taken")
+            return
+
+        self.players[color] = {"name": name, "ws": ws}
+        box = self.outboxes.get(ws)
+        if box is not None:                      # players get the full rate
+            box.rate.set_bounds(self.min_snapshot_hz, self.snapshot_hz)
+        _log.info("joined", room=self.room_id, name=name, color=color)
+        self._broadcast_players()
+
+        # נתחיל משחק כשיש שני צבעים
+        if not self.started and all(self.players.get(c) for c in COLORS):
+            evt = ev.GameStarted(white=self.players["WHITE"]["name"],
+                                 black=self.players["BLACK"]["name"])
+            _log.info("game_started", room=self.room_id, white=evt.white, black=evt.black)
+            self.bus.publish(evt)
+            self.started = True
+            self.over    = False
+
+    async def handle(self, ws, data: Dict[str, Any]) -> None:
+        """Apply one decoded client message (everything except *join*)."""
+        if data.get("type") == "resync":        # client missed a delta
+            self.send_keyframe(ws)
+            return
+
+        if data.get("type") != "command":
+            return
+        try:
+            msg = self.ingest.command(ws, data.get("payload"))
+        except IngestError as e:
+            if str(e) != "rate limited":         # a flood gets no answer
+                await send_error(ws, str(e))
+            return
+        # 🔒 סמכותי: דוחים כל פקודה אחרי סיום משחק
+        if self.over:
+            await send_error(ws, "game over")
+            return
+
+        piece = self.piece_by_id.get(msg.piece_id)
+        if piece:
+            now = self.now_ms()
+            if self.journal is None and self.journal_dir is not None:
+                self.journal = Journal.open(self.journal_dir, self.room_id, self.game,
+                                            self.codec, self.scheduler.hz,
+                                            keyframe=self.snapshots.keyframe(self.game))
+            applied = piece.on_command(msg, now, self.game)
+            if self.journal is not None:
+                self.journal.command(now, msg, applied)
+        else:
+            await send_error(ws, "bad piece_id")
+
+    # ------------------------------------------------ sleeping tick loop
+    def _on_event(self, evt) -> None:
+        self._pending.append(encode_event(evt))
+        # כשהמשחק נגמר – ננעלים סמכותית
+        if isinstance(evt, ev.GameEnded):
+            self.over = True
+            self._end_journal()
+        self._dirty.set()
+
+    def _end_journal(self) -> None:
+        """Write the last journal frame now – the final board and the events
+        still pending (ending with GameEnded) – which closes the journal."""
+        if self.journal is None or self.journal.closed:
+            return
+        final = dict(encode_state(self.game), seq=self.snapshots.seq, key=True)
+        self.journal.frame(final["ts"], final, list(self._pending))
+
+    def _on_state_changed(self, evt: ev.StateChanged) -> None:
+        piece = self.piece_by_id.get(evt.piece_id)
+        if piece is not None:
+            self._awake.add(piece)
+            self.scheduler.wake()
+
+    def _settle(self, piece, now: int) -> None:
+        """After a step: keep *piece* awake, park it on a timer, or let it sleep."""
+        st = piece.current_state
+        if piece.is_captured:
+            self._awake.discard(piece)
+        elif getattr(st.physics, "_moving", False):
+            return                                   # sliding – step every tick
+        elif st.next_state_name and st.next_state_name in st.transitions:
+            due = (st.state_start_time or 0) + st.min_duration_ms
+            if due > now:
+                heapq.heappush(self._timers, (due, next(self._timer_seq), piece))
+                self._awake.discard(piece)
+        else:
+            self._awake.discard(piece)
+
+    def _next_wake_ms(self) -> Optional[int]:
+        """Game time of the next step that can change anything (None: wait for input)."""
+        if self._awake:
+            return 0
+        due = [self._timers[0][0]] if self._timers else []
+        win_at = getattr(self.game, "_win_timer_ms", None)
+        if win_at is not None and not self.over:
+            due.append(win_at + Game.WIN_GRACE_MS + 1)     # _is_win waits strictly longer
+        return min(due) if due else None
+
+    # ------------------------------------------------ background tasks
+    def _step(self, now: int) -> None:
+        """
+        One fixed server tick (driven by :attr:`scheduler`):
+        - advances the pieces that are moving or whose rest timer expired
+        - resolves collisions (including captures)
+        - checks the win condition (king captured)
+        Pieces that cannot change are not touched at all.
+        """
+        game, timers, tr = self.game, self._timers, TRACER
+        t = tr.clock() if tr.on else 0
+        while timers and timers[0][0] <= now:
+            self._awake.add(heapq.heappop(timers)[2])
+
+        if self._awake:
+            for p in list(self._awake):
+                p.update(now)
+            if tr.on: t = tr.span("update", t, self._lane, {"pieces": len(self._awake)})
+            game._resolve_collisions()
+            if tr.on: t = tr.span("collisions", t, self._lane)
+            for p in list(self._awake):
+                self._settle(p, now)
+            self._dirty.set()
+            if tr.on: t = tr.span("settle", t, self._lane)
+        elif getattr(game, "_win_timer_ms", None) is None:
+            return
+
+        try:
+            if not self.over and game._is_win():
+                self.over = True
+        except Exception as e:
+            _log.warn("win_check_failed", room=self.room_id, error=repr(e))
+        if tr.on: tr.span("win_check", t, self._lane)
+
+    async def _snapshot_loop(self, interval: float) -> None:
+        """After steps that changed something, at most every *interval*: one
+        frame with the new snapshot and every event buffered since the last."""
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            events, self._pending = self._pending, []
+            if self.connected or self.ring is not None or self._journaling:
+                t = TRACER.clock() if TRACER.on else 0
+                frame = self.snapshots.next_frame(self.game)
+                if t: TRACER.span("snapshot", t, self._lane, {"events": len(events)})
+                if frame is not None or events:
+                    self._broadcast_batch(frame, events)
+            await asyncio.sleep(interval)
+
+    @property
+    def _journaling(self) -> bool:
+        """A journal is open and still takes frames (until the game ends)."""
+        return self.journal is not None and not self.journal.closed
+
+    def _broadcast_players(self) -> None:
+        payload = {"white": self.players.get("WHITE", {}).get("name"),
+                   "black": self.players.get("BLACK", {}).get("name")}
+        self._lobby = json.dumps({"type": "players", "payload": payload})
+        self._broadcast(self._lobby)
+
+    def _broadcast_batch(self, state: Optional[Dict[str, Any]],
+                         events: List[Dict[str, Any]]) -> None:
+        """Post one tick's snapshot and events, encoded once per wire format."""
+        frames: Dict[bool, str | bytes] = {}
+        for ws, box in list(self.outboxes.items()):
+            codec = self._codec_of(ws)
+            fmt = codec is not None
+            if fmt not in frames:
+                start = time.perf_counter_ns()
+                frames[fmt] = encode_batch(state, events, codec)
+                end, name = time.perf_counter_ns(), "binary" if fmt else "json"
+                self.metrics.observe_frame(name, (end - start) / 1e6, len(frames[fmt]))
+                if TRACER.on:
+                    TRACER.add(f"encode:{name}", self._lane, start, end, {"bytes": len(frames[fmt])})
+            box.post_state(state, frames[fmt], events)
+        if self.ring is not None:
+            t = TRACER.clock() if TRACER.on else 0
+            self._publish(state, events, frames)
+            if t: TRACER.span("ring_publish", t, self._lane)
+        if self._journaling:
+            self.journal.frame(state["ts"] if state else self.game.game_time_ms(), state, events)
+
+    def _publish(self, state: Optional[Dict[str, Any]], events: List[Dict[str, Any]],
+                 frames: Dict[bool, str | bytes]) -> None:
+        """Write one batch into the spectator ring, reusing *frames* already encoded."""
+        text   = frames.get(False) or encode_batch(state, events)
+        binary = frames.get(True) or encode_batch(state, events, self.codec)
+        kind   = EVENT if state is None else KEY if state.get("key") else DELTA
+        self.ring.publish(kind, text, binary if isinstance(binary, bytes) else None)
+        if kind == KEY and self._lobby is not None:      # readers start at a keyframe
+            self.ring.publish(OTHER, self._lobby)
+
+    def _broadcast(self, msg: str) -> None:
+        for box in list(self.outboxes.values()):
+            box.post(msg)
+        if self.ring is not None:
+            self.ring.publish(OTHER, msg)
+
+
+# ───────────── RoomManager ────────────────────────────────────
+class RoomManager:
+    """Creates rooms on demand and reaps the ones nobody is using."""
+
+    def __init__(self,
+                 game_factory: Callable[[], Game],
+                 *,
+                 max_rooms: int = 500,
+                 idle_ttl: float = 30.0,
+                 tick_hz: float = 60.0,
+                 snapshot_hz: float = 20.0,
+                 keyframe_every: int = 40,
+                 max_queue: int = 256,
+                 max_lag: float = 5.0,
+                 min_snapshot_hz: float = 5.0,
+                 spectator_hz: float = 10.0,
+                 ring_prefix: Optional[str] = None,
+                 ingest: Optional[CommandIngest] = None,
+                 metrics: Optional[Metrics] = None,
+                 admin_token: Optional[str] = None,
+                 journal_dir: Optional[str | pathlib.Path] = None) -> None:
+        """*ring_prefix*: publish every room into a shared-memory ring named
+        :func:`ring.ring_name` ``(room_id, ring_prefix)`` for fan-out processes.
+        *admin_token*: accept ``admin`` messages carrying it (none: refuse all).
+        *journal_dir*: write a :mod:`journal` of every match there."""
+        self.game_factory = game_factory
+        self.max_rooms    = max_rooms
+        self.idle_ttl     = idle_ttl
+        self.tick_hz      = tick_hz
+        self.snapshot_hz  = snapshot_hz
+        self.keyframe_every = keyframe_every
+        self.max_queue, self.max_lag = max_queue, max_lag
+        self.min_snapshot_hz, self.spectator_hz = min_snapshot_hz, spectator_hz
+        self.ring_prefix  = ring_prefix
+        self.ingest       = ingest or CommandIngest()        # shared by every room
+        self.metrics      = metrics or Metrics()             # likewise
+        self.admin_token  = admin_token
+        self.journal_dir  = journal_dir
+        self.profiler     = Profiler(self)
+        self.rooms: Dict[str, Room] = {}
+        self._gc_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, room_id: str) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def open(self, raw_id: Any, *, tick_hz: float | None = None) -> Room:
+        """Return the running room called *raw_id*, creating it if needed.
+
+        *tick_hz* overrides the manager's default tick rate for a new room.
+        """
+        room_id = normalize_room_id(raw_id)
+        room = self.rooms.get(room_id)
+        if room is None:
+            if len(self.rooms) >= self.max_rooms:
+                raise RoomError("server full")
+            room = Room(room_id, self.game_factory(), tick_hz=tick_hz or self.tick_hz,
+                        snapshot_hz=self.snapshot_hz, keyframe_every=self.keyframe_every,
+                        max_queue=self.max_queue, max_lag=self.max_lag,
+                        min_snapshot_hz=self.min_snapshot_hz, spectator_hz=self.spectator_hz,
+                        ingest=self.ingest, metrics=self.metrics,
+                        journal_dir=self.journal_dir)
+            self.rooms[room_id] = room
+            if self.ring_prefix:
+                room.publish(FrameRing.create(ring_name(room_id, self.ring_prefix),
+                                              meta=json.dumps(room.codec.dictionary())))
+            room.start()
+            _log.info("opened", room=room_id, active=len(self.rooms))
+        return room
+
+    async def close(self, room_id: str) -> None:
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            await room.stop()
+            _log.info("closed", room=room_id, active=len(self.rooms))
+
+    async def collect(self, now: float | None = None) -> List[str]:
+        """Close every room that has been empty for longer than ``idle_ttl``."""
+        now = time.monotonic() if now is None else now
+        stale = [rid for rid, room in self.rooms.items()
+                 if room.is_empty and room.empty_since is not None
+                 and now - room.empty_since >= self.idle_ttl]
+        for rid in stale:
+            await self.close(rid)
+        return stale
+
+    # ------------------------------------------------ background GC
+    def start(self, interval: float = 5.0) -> None:
+        if self._gc_task is None:
+            self._gc_task = asyncio.create_task(self._gc_loop(interval))
+            self.metrics.start()
+
+    async def stop(self) -> None:
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            self._gc_task = None
+        await self.metrics.stop()
+        for rid in list(self.rooms):
+            await self.close(rid)
+
+    async def _gc_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.collect()
@@ -0,0 +1,177 @@
+# =============================================================
+# Filename: server/scheduler.py  (HEADLESS)
+# =============================================================
+"""scheduler – drift-free fixed-timestep driver for a room's game loop.
+
+``asyncio.sleep(1/60)`` after the work makes the real period *work + 16.6 ms
++ jitter*, so the tick rate sags under load.  :class:`FixedStepScheduler`
+instead steps on absolute deadlines ``origin + n·period``: if it wakes up
+late it runs the missed steps back-to-back (at most ``max_catchup`` per
+wake-up, the rest are skipped and counted) and every step is handed its
+*deadline* as ``now_ms``, so physics and rest timers advance in even steps
+no matter when the step actually ran.
+
+An optional ``next_wake`` callback lets an idle room sleep: it returns the
+game time (ms) at which the next step can change anything, or *None* for
+"not until something external happens".  The scheduler then sleeps until the
+first tick on its grid at or after that time, and :meth:`wake` (called when
+a command arrives) cuts the sleep short.
+"""
+from __future__ import annotations
+import asyncio, math, time
+from typing import Any, Callable, Dict, Optional
+
+
+class TickStats:
+    """Running totals of per-step work time, lateness and skipped steps.
+
+    *work_hist* (a :class:`metrics.Histogram`, or anything with ``observe``)
+    also gets every step's work time.
+    """
+
+    def __init__(self, work_hist: Any = None) -> None:
+        self.work_hist = work_hist
+        self.reset()
+
+    def reset(self) -> None:
+        self.ticks         = 0
+        self.skipped       = 0
+        self.slept         = 0        # grid ticks not run because nothing was due
+        self.overruns      = 0        # steps whose work exceeded the period
+        self.work_ms_total = 0.0
+        self.work_ms_max   = 0.0
+        self.late_ms_total = 0.0
+        self.late_ms_max   = 0.0
+
+    def record(self, work_ms: float, late_ms: float, budget_ms: float) -> None:
+        self.ticks         += 1
+        self.work_ms_total += work_ms
+        self.late_ms_total += late_ms
+        self.work_ms_max    = max(self.work_ms_max, work_ms)
+        self.late_ms_max    = max(self.late_ms_max, late_ms)
+        if work_ms > budget_ms:
+            self.overruns += 1
+        if self.work_hist is not None:
+            self.work_hist.observe(work_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        n = self.ticks or 1
+        return {"ticks": self.ticks, "skipped": self.skipped, "slept": self.slept,
+                "overruns": self.overruns,
+                "work_ms_avg": self.work_ms_total / n, "work_ms_max": self.work_ms_max,
+                "late_ms_avg": self.late_ms_total / n, "late_ms_max": self.late_ms_max}
+
+
+class FixedStepScheduler:
+    """Calls ``step(now_ms)`` ``hz`` times per second on absolute deadlines.
+
+    ``clock`` returns seconds (``time.monotonic`` – the same timebase as
+    ``Game.game_time_ms``), so the ``now_ms`` passed to *step* lines up with
+    the game clock, only quantised to the tick grid.
+    """
+
+    def __init__(self, step: Callable[[int], None], hz: float = 60.0, *,
+                 max_catchup: int = 5,
+                 clock: Callable[[], float] = time.monotonic,
+                 next_wake: Optional[Callable[[], Optional[int]]] = None,
+                 stats: Optional[TickStats] = None) -> None:
+        if hz <= 0:
+            raise ValueError("tick rate must be positive")
+        self.step        = step
+        self.hz          = hz
+        self.period      = 1.0 / hz
+        self.max_catchup = max(1, max_catchup)
+        self.clock       = clock
+        self.next_wake   = next_wake
+        self.stats       = stats or TickStats()
+        self.tick        = 0                      # index of the next step
+        self.now_ms: Optional[int] = None         # tick time of the last step
+        self._last       = -1                     # index of the last step
+        self._origin: Optional[float] = None
+        self._forever    = False                  # idle with nothing scheduled
+        self._wake_evt   = asyncio.Event()
+
+    def deadline(self, n: int) -> float:
+        return self._origin + n * self.period
+
+    def _grid_floor(self, now: float) -> int:
+        return int((now - self._origin) / self.period + 1e-9)
+
+    def current_ms(self) -> Optional[int]:
+        """Time to stamp work arriving between steps – never after the next step."""
+        if self._origin is None:
+            return self.now_ms
+        n = self._grid_floor(self.clock())
+        if not self._forever:
+            n = min(n, self.tick)
+        return int(round(self.deadline(n) * 1000))
+
+    def run_due(self) -> int:
+        """Run every step whose deadline has passed; returns how many ran."""
+        now = self.clock()
+        if self._origin is None:
+            self._origin = now
+        due = self._grid_floor(now) + 1 - self.tick
+        if due <= 0:
+            return 0
+        self.stats.slept += self.tick - self._last - 1       # grid ticks idled through
+        if due > self.max_catchup:                # too far behind – drop the excess
+            self.stats.skipped += due - self.max_catchup
+            self.tick += due - self.max_catchup
+            due = self.max_catchup
+
+        budget_ms = 1000.0 * self.period
+        for _ in range(due):
+            deadline = self.deadline(self.tick)
+            start    = self.clock()
+            self.now_ms = int(round(deadline * 1000))
+            self.step(self.now_ms)
+            self._last = self.tick
+            self.tick += 1
+            self.stats.record(1000.0 * (self.clock() - start),
+                              1000.0 * (start - deadline), budget_ms)
+        return due
+
+    # ------------------------------------------------ idling
+    def plan_idle(self) -> None:
+        """Move the next step to the first grid tick where ``next_wake`` says work is due."""
+        self._forever = False
+        if self.next_wake is None or self._origin is None:
+            return
+        wake_ms = self.next_wake()
+        if wake_ms is None:
+            self._forever = True
+            return
+        n = math.ceil((wake_ms / 1000.0 - self._origin) / self.period - 1e-9)
+        self.tick = max(self.tick, n)
+
+    def wake(self) -> None:
+        """Something external happened – step at the current grid tick."""
+        if self._origin is not None:
+            n = max(self._last + 1, self._grid_floor(self.clock()))
+            if self._forever or n < self.tick:
+                self.tick = n
+        self._forever = False
+        self._wake_evt.set()
+
+    def seconds_until_next(self) -> Optional[float]:
+        """Delay before the next step; *None* while idle with nothing scheduled."""
+        if self._origin is None:
+            return 0.0
+        if self._forever:
+            return None
+        return max(0.0, self.deadline(self.tick) - self.clock())
+
+    async def run(self) -> None:
+        while True:
+            self.run_due()
+            self.plan_idle()
+            delay = self.seconds_until_next()
+            if delay == 0.0:
+                await asyncio.sleep(0)
+                continue
+            self._wake_evt.clear()
+            try:
+                await asyncio.wait_for(self._wake_evt.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
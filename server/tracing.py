@@ -0,0 +1,93 @@
+# =============================================================
+# Filename: server/tracing.py  (HEADLESS)
+# =============================================================
+"""tracing – per-tick phase spans, exported as Chrome trace-event JSON.
+
+The process has one :data:`TRACER`.  While it is off, instrumented code pays
+a single attribute check per phase::
+
+    tr = tracing.TRACER
+    t = tr.clock() if tr.on else 0
+    ...                                     # phase 1
+    if tr.on: t = tr.span("update", t, lane)
+    ...                                     # phase 2 – starts where 1 ended
+    if tr.on: t = tr.span("collisions", t, lane)
+
+:meth:`Tracer.span` records ``(name, lane, start, end, args)`` into a
+bounded ring and returns *end*, so back-to-back phases share one clock read.
+*lane* becomes a row in the viewer (``room:<id>``, ``send:<peer>``,
+``in:<peer>``); the event loop is a single thread, so lanes are what keep the
+interleaving of ticks, sends and inbound commands readable.
+
+:meth:`Tracer.write` produces a file for ``chrome://tracing`` / Perfetto.
+"""
+from __future__ import annotations
+import collections, json, os, pathlib, time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+CAPACITY = 200_000
+
+#: (name, lane, start ns, end ns, args)
+Span = Tuple[str, str, int, int, Optional[Dict[str, Any]]]
+
+
+class Tracer:
+    """Bounded span recorder; :attr:`on` is the only thing hot code checks."""
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self.on = False
+        self.clock = time.perf_counter_ns
+        self.spans: Deque[Span] = collections.deque(maxlen=capacity)
+
+    def start(self, capacity: Optional[int] = None) -> None:
+        """Clear the ring and begin recording."""
+        if capacity is not None:
+            self.spans = collections.deque(maxlen=capacity)
+        self.spans.clear()
+        self.on = True
+
+    def stop(self) -> None:
+        self.on = False
+
+    def span(self, name: str, start: int, lane: str,
+             args: Optional[Dict[str, Any]] = None) -> int:
+        end = self.clock()
+        self.spans.append((name, lane, start, end, args))
+        return end
+
+    def add(self, name: str, lane: str, start: int, end: int,
+            args: Optional[Dict[str, Any]] = None) -> None:
+        """A span timed by the caller (same ``perf_counter_ns`` clock)."""
+        self.spans.append((name, lane, start, end, args))
+
+    # ------------------------------------------------ export
+    def events(self) -> List[Dict[str, Any]]:
+        """The ring as trace events: one ``X`` per span plus lane names."""
+        spans = list(self.spans)
+        if not spans:
+            return []
+        pid, origin = os.getpid(), min(s[2] for s in spans)
+        tids: Dict[str, int] = {}
+        out: List[Dict[str, Any]] = []
+        for name, lane, start, end, args in spans:
+            tid = tids.setdefault(lane, len(tids) + 1)
+            ev = {"name": name, "cat": lane.split(":", 1)[0], "ph": "X", "pid": pid, "tid": tid,
+                  "ts": (start - origin) / 1000.0, "dur": (end - start) / 1000.0}
+            if args:
+                ev["args"] = args
+            out.append(ev)
+        out += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": lane}}
+                for lane, tid in tids.items()]
+        out += [{"name": "thread_sort_index", "ph": "M", "pid": pid, "tid": tid,
+                 "args": {"sort_index": tid}} for tid in tids.values()]
+        return out
+
+    def write(self, path: str | pathlib.Path) -> int:
+        """Write the ring as a trace-event JSON file; returns the number of spans."""
+        events = self.events()
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+        return sum(1 for e in events if e["ph"] == "X")
+
+
+TRACER = Tracer()
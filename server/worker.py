@@ -0,0 +1,113 @@
+# =============================================================
+# Filename: server/worker.py  (HEADLESS)
+# =============================================================
+"""Room-hosting worker process behind ``server/gateway.py``.
+
+Runs its own :class:`rooms.RoomManager` and serves the gateway link; every
+client the gateway routes here is driven by :func:`rooms.serve_connection`
+through a :class:`cluster.ProxySocket`.  Normally spawned by the gateway:
+
+    python -m server.worker --listen unix:/tmp/kfc-workers-x/worker-0.sock
+"""
+from __future__ import annotations
+import argparse, asyncio, functools, os, pathlib, signal, sys
+from typing import Dict
+
+# ───────────── bootstrap PYTHONPATH + graphics stubs ──────────
+from server.bootstrap import graphics_root, csv_path
+
+# ───────────── imports (logic only) ───────────────────────────
+from cluster import BINARY, CLOSE, OPEN, TEXT, ProxySocket, read_frame, serve_link, write_frame
+from rooms import RoomManager, build_game, serve_connection
+from metrics import serve_metrics
+from profiler import install_signal_handlers
+from shared import slog
+
+# ───────────── global state ───────────────────────────────────
+ROOMS: RoomManager | None = None
+
+# ───────────── gateway link ───────────────────────────────────
+async def handle_link(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Demultiplex one gateway link into per-client :class:`ProxySocket`s."""
+    conns: Dict[int, ProxySocket] = {}
+
+    def _finished(conn: int, _task: asyncio.Task) -> None:
+        ws = conns.pop(conn, None)
+        if ws is not None and not writer.is_closing():   # worker side hung up
+            ws.closed = True
+            write_frame(writer, conn, CLOSE)
+
+    try:
+        while True:
+            conn, op, body = await read_frame(reader)
+            if op == OPEN:
+                ws = conns[conn] = ProxySocket(conn, body.decode("utf-8"), writer)
+                task = asyncio.create_task(serve_connection(ROOMS, ws))
+                task.add_done_callback(functools.partial(_finished, conn))
+            elif op == CLOSE:
+                ws = conns.pop(conn, None)
+                if ws is not None:
+                    ws.feed(None)
+            elif op in (TEXT, BINARY):
+                ws = conns.get(conn)
+                if ws is not None:
+                    ws.feed(body.decode("utf-8"))
+    except (asyncio.IncompleteReadError, ConnectionError) as e:
+        print("⛔ gateway link lost:", e.__class__.__name__)
+    finally:
+        for ws in conns.values():
+            ws.feed(None)
+        conns.clear()
+        writer.close()
+
+# ───────────── main bootstrap ─────────────────────────────────
+async def main(listen: str, pieces: pathlib.Path, board: pathlib.Path, max_rooms: int,
+               tick_hz: float = 60.0, ring_prefix: str | None = None,
+               metrics_port: int | None = None) -> None:
+    global ROOMS
+    ROOMS = RoomManager(functools.partial(build_game, board, pieces),
+                        max_rooms=max_rooms, tick_hz=tick_hz, ring_prefix=ring_prefix,
+                        admin_token=os.environ.get("KFC_ADMIN_TOKEN"),
+                        journal_dir=os.environ.get("KFC_JOURNAL_DIR"))
+    ROOMS.start()
+    install_signal_handlers(asyncio.get_running_loop(), ROOMS.profiler)
+    if metrics_port:
+        await serve_metrics(ROOMS, "127.0.0.1", metrics_port)
+
+    server = await serve_link(handle_link, listen)
+    async with server:
+        print(f"🧩 worker listening on {listen}", flush=True)
+        await asyncio.Future()          # run forever
+
+
+def _parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Kungfu-Chess room worker")
+    ap.add_argument("--listen", required=True, help="unix:/path or tcp:host:port")
+    ap.add_argument("--pieces", type=pathlib.Path, default=graphics_root)
+    ap.add_argument("--board", type=pathlib.Path, default=csv_path)
+    ap.add_argument("--max-rooms", type=int, default=500)
+    ap.add_argument("--tick-hz", type=float, default=60.0)
+    ap.add_argument("--ring-prefix", default=None,
+                    help="publish rooms into shared-memory rings for server.fanout")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="serve GET /metrics on 127.0.0.1:PORT")
+    return ap.parse_args()
+
+# ───────────── runner ────────────────────────────────────────
+if __name__ == "__main__":
+    args = _parse_args()
+    flusher = slog.Flusher(watch=os.environ.get("KFC_LOG_FILE")).start()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(main(args.listen, args.pieces, args.board,
+                                 args.max_rooms, args.tick_hz, args.ring_prefix,
+                                 args.metrics_port))
+    if sys.platform != "win32":
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+    try:
+        loop.run_until_complete(task)
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        pass
+    finally:
+        loop.close()
+        flusher.stop()
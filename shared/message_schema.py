@@ -10,10 +10,11 @@ how to interpret *payload* (command, event, system‑ping …).
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, Dict, Any
+from typing import Literal, Dict, Any, List
 # ---------------------------------------------------------------------------
 
-MessageType = Literal["command", "event", "state", "ping", "pong", "error"]
+MessageType = Literal["command", "event", "state", "ping", "pong", "error", "resync",
+                      "spectate", "redirect", "batch", "admin"]
 
 
 @dataclass(slots=True)
@@ -30,4 +31,17 @@ class Message:
 
     @classmethod
     def from_dict(cls, d: Dict[str, Any]) -> "Message":
-        return cls(d["type"], d["payload"], d["ts"])
\ No newline at end of file
+        return cls(d["type"], d["payload"], d["ts"])
+
+
+def unbatch(msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A ``batch`` frame → its ``state`` message, then its ``event`` messages.
+
+    Any other message comes back as a one-element list.
+    """
+    if msg.get("type") != "batch":
+        return [msg]
+    body = msg.get("payload") or {}
+    state = body.get("state")
+    return ([{"type": "state", "payload": state}] if state is not None else []) + \
+        [{"type": "event", "payload": e} for e in body.get("events", [])]
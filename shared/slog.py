@@ -0,0 +1,210 @@
+# =============================================================
+# Filename: shared/slog.py
+# =============================================================
+"""slog – leveled, structured logging that costs nothing when it is off.
+
+Every subsystem asks for its own :class:`Logger` once, at import time::
+
+    _log = slog.get_logger("piece")
+    ...
+    _log.debug("illegal_move", piece=self.piece_id, src=src, dst=dst)
+
+A record is an event name plus keyword fields – nothing is formatted at the
+call site.  The level methods of a logger are rebound whenever its level
+changes: a disabled level is the module-level no-op :func:`_off`, so a call
+below the threshold costs one function call and no string work.
+
+Enabled records go into an in-memory ring (the last :data:`CAPACITY` records,
+for :func:`dump` after an error) and into a pending queue that a background
+:class:`Flusher` thread formats and writes every ``interval`` seconds – the
+tick never waits for stdout.  Fields are formatted when flushed, so pass
+values, not objects that are about to change.
+
+Levels are per subsystem and can change at runtime::
+
+    slog.configure("piece=debug,physics=off,*=info")     # from code
+    KFC_LOG="piece=debug" python -m server.main           # at start-up
+    Flusher(watch="/tmp/kfc-log.conf")                    # re-read on change
+"""
+from __future__ import annotations
+
+import collections, os, sys, threading, time
+from typing import Any, Deque, Dict, IO, List, Optional, Tuple
+
+DEBUG, INFO, WARN, ERROR, OFF = 10, 20, 30, 40, 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warn": WARN, "error": ERROR, "off": OFF}
+_NAMES = {v: k.upper() for k, v in LEVELS.items()}
+
+DEFAULT_LEVEL = INFO
+CAPACITY      = 4096
+
+#: (wall time, level, subsystem, event, fields)
+Record = Tuple[float, int, str, str, Dict[str, Any]]
+
+_ring:    Deque[Record] = collections.deque(maxlen=CAPACITY)
+_pending: Deque[Record] = collections.deque(maxlen=CAPACITY)
+_levels:  Dict[str, int] = {}
+_loggers: Dict[str, "Logger"] = {}
+
+
+def _off(event: str, **fields: Any) -> None:
+    """Stand-in for every disabled level method."""
+
+
+class Logger:
+    """One subsystem's handle; ``debug`` … ``error`` are rebound per level."""
+
+    __slots__ = ("name", "level", "debug", "info", "warn", "error")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.set_level(_level_for(name))
+
+    def set_level(self, level: int) -> None:
+        self.level = level
+        for lvl, meth in ((DEBUG, "debug"), (INFO, "info"), (WARN, "warn"), (ERROR, "error")):
+            setattr(self, meth, self._emitter(lvl) if lvl >= level else _off)
+
+    def enabled(self, level: int) -> bool:
+        """For call sites that must compute a field before logging it."""
+        return level >= self.level
+
+    def _emitter(self, level: int):
+        name = self.name
+
+        def emit(event: str, **fields: Any) -> None:
+            rec = (time.time(), level, name, event, fields)
+            _ring.append(rec)
+            _pending.append(rec)
+        return emit
+
+
+# ───────────── levels ─────────────────────────────────────────
+def get_logger(name: str) -> Logger:
+    log = _loggers.get(name)
+    if log is None:
+        log = _loggers[name] = Logger(name)
+    return log
+
+
+def _level_for(name: str) -> int:
+    return _levels.get(name, _levels.get("*", DEFAULT_LEVEL))
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """``"piece=debug,*=warn"`` → ``{"piece": 10, "*": 30}``; a bare level means ``*``."""
+    out: Dict[str, int] = {}
+    for part in spec.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, lvl = part.rpartition("=")
+        if lvl.lower() not in LEVELS:
+            raise ValueError(f"unknown log level {lvl!r}")
+        out[name.strip() or "*"] = LEVELS[lvl.lower()]
+    return out
+
+
+def configure(spec: str | Dict[str, int], *, reset: bool = False) -> None:
+    """Change subsystem levels of the running process (existing loggers too)."""
+    if reset:
+        _levels.clear()
+    _levels.update(parse_levels(spec) if isinstance(spec, str) else spec)
+    for log in _loggers.values():
+        log.set_level(_level_for(log.name))
+
+
+def levels() -> Dict[str, str]:
+    """Current level of every logger, by name."""
+    return {name: _NAMES[log.level] for name, log in sorted(_loggers.items())}
+
+
+# ───────────── output ─────────────────────────────────────────
+def format_record(rec: Record) -> str:
+    t, level, name, event, fields = rec
+    stamp = time.strftime("%H:%M:%S", time.localtime(t)) + f".{int(t * 1000) % 1000:03d}"
+    kv = " ".join(f"{k}={v!r}" if isinstance(v, str) and " " in v else f"{k}={v}"
+                  for k, v in fields.items())
+    return f"{stamp} {_NAMES[level]:<5} {name} {event}" + (f" {kv}" if kv else "")
+
+
+def recent(n: Optional[int] = None) -> List[Record]:
+    """The last *n* records still in the ring (all of them by default)."""
+    out = list(_ring)
+    return out if n is None else out[-n:]
+
+
+def dump(stream: Optional[IO[str]] = None, n: Optional[int] = None) -> None:
+    """Write the ring – what led up to an error – to *stream* (stderr)."""
+    stream = stream or sys.stderr
+    stream.write("".join(format_record(r) + "\n" for r in recent(n)))
+    stream.flush()
+
+
+def drain(stream: IO[str]) -> int:
+    """Write and forget every pending record; returns how many."""
+    lines = []
+    try:
+        while True:
+            lines.append(format_record(_pending.popleft()))
+    except IndexError:
+        pass
+    if lines:
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+    return len(lines)
+
+
+class Flusher:
+    """Daemon thread that drains pending records to *stream* off the hot path.
+
+    With *watch* it also re-reads that file's level spec (see
+    :func:`configure`) whenever its mtime changes.
+    """
+
+    def __init__(self, stream: Optional[IO[str]] = None, interval: float = 0.25,
+                 watch: Optional[str] = None) -> None:
+        self.stream   = stream or sys.stdout
+        self.interval = interval
+        self.watch    = watch
+        self._mtime: Optional[float] = None
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="slog-flush", daemon=True)
+
+    def start(self) -> "Flusher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        drain(self.stream)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._reload()
+            try:
+                drain(self.stream)
+            except (OSError, ValueError):           # closed stdout – keep the tick alive
+                pass
+
+    def _reload(self) -> None:
+        if self.watch is None:
+            return
+        try:
+            mtime = os.stat(self.watch).st_mtime
+        except FileNotFoundError:                   # not written yet
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            with open(self.watch, encoding="utf-8") as fh:
+                configure(fh.read(), reset=True)
+        except (OSError, ValueError) as e:
+            get_logger("slog").warn("bad_level_file", path=self.watch, error=str(e))
+
+
+if os.environ.get("KFC_LOG"):
+    configure(os.environ["KFC_LOG"])
@@ -0,0 +1,222 @@
+# =============================================================
+# Filename: shared/wire_codec.py
+# =============================================================
+"""wire_codec – compact binary encoding of ``state`` and ``event`` frames.
+
+The JSON envelope repeats every key and every piece id on every frame.  When
+both sides agree on the :data:`SUBPROTOCOL_BINARY` WebSocket subprotocol the
+server sends those two message types as struct-packed binary frames instead.
+
+A per-game *dictionary* (piece ids + state names) is sent once, as a normal
+JSON text frame ``{"type": "dict", "payload": {...}}``, before the first
+binary frame; records then refer to pieces and states by index.
+
+``decode`` returns exactly the dict the JSON path would have produced, so
+nothing above the network layer needs to know which format was used.
+
+Layout (little-endian):
+
+    state  : 'S' flags:u8 seq:u32 ts:u64 rows:u8 cols:u8 n:u16 [base:u32]
+             n × (piece:u16 row:u8 col:u8 x:i16 y:i16 state:u8 captured:u8)
+             (``base`` only with the BASE flag – merged deltas)
+    event  : 'E' ts:u64 kind:u8  fields…   (see :data:`EVENT_SCHEMAS`)
+    batch  : 'B' has_state:u8 n:u16  n × (len:u32 frame)
+             (one tick's ``state`` frame, if any, then its ``event`` frames)
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+SUBPROTOCOL_BINARY = "kfc.bin.1"
+SUBPROTOCOL_JSON   = "kfc.json"
+SUBPROTOCOLS       = (SUBPROTOCOL_BINARY, SUBPROTOCOL_JSON)
+
+_STATE_HDR = struct.Struct("<cBIQBBH")
+_STATE_REC = struct.Struct("<HBBhhBB")
+_EVENT_HDR = struct.Struct("<cQB")
+_BATCH_HDR = struct.Struct("<cBH")
+_U8, _U16, _U32, _I32, _Q = (struct.Struct(f) for f in ("<B", "<H", "<I", "<i", "<q"))
+
+_FLAG_KEY  = 0x01
+_FLAG_BASE = 0x02
+_NONE_STR  = 0xFFFF
+COLORS     = (None, "WHITE", "BLACK")
+
+#: event name → ordered (field, code) pairs.
+#:   p piece id · t state name · s str|None · c color · x cell · i int32 · q int64
+EVENT_SCHEMAS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "MovePlayed":   (("time_ms", "q"), ("move", "s"), ("color", "c")),
+    "PieceTaken":   (("piece_id", "p"), ("cell", "x"), ("by_color", "c"), ("value", "i")),
+    "JumpPlayed":   (("time_ms", "q"), ("color", "c")),
+    "ErrorPlayed":  (("time_ms", "q"), ("reason", "s"), ("piece", "s")),
+    "GameStarted":  (("white", "s"), ("black", "s")),
+    "GameEnded":    (("winner", "s"),),
+    "StateChanged": (("piece_id", "p"), ("new_state", "t"), ("timestamp", "q")),
+}
+_EVENT_IDS   = {name: i for i, name in enumerate(EVENT_SCHEMAS)}
+_EVENT_NAMES = list(EVENT_SCHEMAS)
+
+
+class WireEncodeError(ValueError):
+    """The frame holds something the binary format cannot express – send JSON."""
+
+
+class BinaryCodec:
+    """Encoder / decoder bound to one game's piece-id and state-name tables."""
+
+    def __init__(self, pieces: Sequence[str], states: Sequence[str]) -> None:
+        self.pieces = list(pieces)
+        self.states = list(states)
+        self._piece_idx = {pid: i for i, pid in enumerate(self.pieces)}
+        self._state_idx = {st: i for i, st in enumerate(self.states)}
+
+    # ------------------------------------------------------------ dictionary
+    def dictionary(self) -> Dict[str, Any]:
+        """JSON ``dict`` message announcing the tables to a client."""
+        return {"type": "dict", "payload": {"pieces": self.pieces, "states": self.states}}
+
+    @classmethod
+    def from_dictionary(cls, payload: Dict[str, Any]) -> "BinaryCodec":
+        return cls(payload["pieces"], payload["states"])
+
+    # ------------------------------------------------------------ encoding
+    def encode_state(self, payload: Dict[str, Any]) -> bytes:
+        """``state`` payload (keyframe, delta or legacy full) → bytes."""
+        key   = payload.get("key", True)
+        board = payload.get("board") or {"rows": 0, "cols": 0}
+        recs  = payload["pieces"]
+        base  = None if key else payload.get("base")
+        flags = (_FLAG_KEY if key else 0) | (_FLAG_BASE if base is not None else 0)
+        try:
+            out = [_STATE_HDR.pack(b"S", flags, payload.get("seq") or 0,
+                                   payload["ts"], board["rows"], board["cols"], len(recs))]
+            if base is not None:
+                out.append(_U32.pack(base))
+            for p in recs:
+                (r, c), (x, y) = p["cell"], p["pixel"]
+                out.append(_STATE_REC.pack(self._piece_idx[p["id"]], r, c, int(x), int(y),
+                                           self._state_idx[p["state"]], bool(p["captured"])))
+        except (KeyError, struct.error) as e:
+            raise WireEncodeError(e) from e
+        return b"".join(out)
+
+    def encode_event(self, msg: Dict[str, Any]) -> bytes:
+        """Full ``event`` message dict (see ``protocol.encode_event``) → bytes."""
+        evt  = msg["payload"]
+        name = evt.get("_event_type")
+        if name not in _EVENT_IDS:
+            raise WireEncodeError(f"unknown event {name!r}")
+        try:
+            out = [_EVENT_HDR.pack(b"E", msg["ts"], _EVENT_IDS[name])]
+            for field, code in EVENT_SCHEMAS[name]:
+                out.append(self._pack(code, evt.get(field)))
+        except (KeyError, ValueError, TypeError, struct.error) as e:
+            raise WireEncodeError(e) from e
+        return b"".join(out)
+
+    def encode_batch(self, state: Dict[str, Any] | None, events: Sequence[Dict[str, Any]]) -> bytes:
+        """A ``state`` payload (or *None*) and full ``event`` messages → one frame."""
+        parts = ([self.encode_state(state)] if state is not None else []) + \
+                [self.encode_event(e) for e in events]
+        out = [_BATCH_HDR.pack(b"B", state is not None, len(parts))]
+        for part in parts:
+            out += (_U32.pack(len(part)), part)
+        return b"".join(out)
+
+    def _pack(self, code: str, v: Any) -> bytes:
+        if code == "p":
+            return _U16.pack(self._piece_idx[v])
+        if code == "t":
+            return _U8.pack(self._state_idx[v])
+        if code == "c":
+            return _U8.pack(COLORS.index(v))
+        if code == "x":
+            return bytes((v[0], v[1]))
+        if code == "i":
+            return _I32.pack(v)
+        if code == "q":
+            return _Q.pack(v)
+        if v is None:
+            return _U16.pack(_NONE_STR)
+        raw = str(v).encode("utf-8")
+        return _U16.pack(len(raw)) + raw
+
+    # ------------------------------------------------------------ decoding
+    def decode(self, frame: bytes) -> Dict[str, Any]:
+        """Binary frame → the dict the JSON path would have delivered."""
+        kind = frame[:1]
+        try:
+            if kind == b"S":
+                return {"type": "state", "payload": self._decode_state(frame)}
+            if kind == b"E":                # the event message, inside its frame
+                return {"type": "event", "payload": self._decode_event(frame)}
+            if kind == b"B":
+                return self._decode_batch(frame)
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"corrupt binary frame: {e}") from e
+        raise ValueError(f"unknown binary frame {kind!r}")
+
+    def _decode_state(self, frame: bytes) -> Dict[str, Any]:
+        _, flags, seq, ts, rows, cols, n = _STATE_HDR.unpack_from(frame, 0)
+        off = _STATE_HDR.size
+        if flags & _FLAG_BASE:
+            base = _U32.unpack_from(frame, off)[0]
+            off += _U32.size
+        pieces, states = self.pieces, self.states
+        recs: List[Dict[str, Any]] = [
+            {"id": pieces[i], "cell": [r, c], "pixel": [x, y],
+             "state": states[s], "captured": bool(cap)}
+            for i, r, c, x, y, s, cap in _STATE_REC.iter_unpack(frame[off:])
+        ]
+        if len(recs) != n:
+            raise ValueError("truncated state frame")
+        out: Dict[str, Any] = {"seq": seq, "key": bool(flags & _FLAG_KEY), "pieces": recs, "ts": ts}
+        if flags & _FLAG_KEY:
+            out["board"] = {"rows": rows, "cols": cols}
+        if flags & _FLAG_BASE:
+            out["base"] = base
+        return out
+
+    def _decode_batch(self, frame: bytes) -> Dict[str, Any]:
+        _, has_state, n = _BATCH_HDR.unpack_from(frame, 0)
+        off, parts = _BATCH_HDR.size, []
+        for _ in range(n):
+            size = _U32.unpack_from(frame, off)[0]
+            off += _U32.size
+            parts.append(frame[off:off + size])
+            off += size
+        if off != len(frame):
+            raise ValueError("truncated batch frame")
+        state = self._decode_state(parts.pop(0)) if has_state else None
+        return {"type": "batch",
+                "payload": {"state": state, "events": [self._decode_event(p) for p in parts]}}
+
+    def _decode_event(self, frame: bytes) -> Dict[str, Any]:
+        """One ``E`` frame → the ``event`` message (``encode_event``'s dict)."""
+        _, ts, kind = _EVENT_HDR.unpack_from(frame, 0)
+        name = _EVENT_NAMES[kind]
+        off  = _EVENT_HDR.size
+        evt: Dict[str, Any] = {}
+        for field, code in EVENT_SCHEMAS[name]:
+            evt[field], off = self._unpack(code, frame, off)
+        evt["_event_type"] = name
+        return {"type": "event", "payload": evt, "ts": ts}
+
+    def _unpack(self, code: str, buf: bytes, off: int) -> Tuple[Any, int]:
+        if code == "p":
+            return self.pieces[_U16.unpack_from(buf, off)[0]], off + 2
+        if code == "t":
+            return self.states[buf[off]], off + 1
+        if code == "c":
+            return COLORS[buf[off]], off + 1
+        if code == "x":
+            return [buf[off], buf[off + 1]], off + 2
+        if code == "i":
+            return _I32.unpack_from(buf, off)[0], off + 4
+        if code == "q":
+            return _Q.unpack_from(buf, off)[0], off + 8
+        n = _U16.unpack_from(buf, off)[0]; off += 2
+        if n == _NONE_STR:
+            return None, off
+        return buf[off:off + n].decode("utf-8"), off + n
@@ -57,3 +57,25 @@ def test_iter_rules_returns_all():
 
     all_rules = list(moves.iter_rules())
     assert all_rules == rules
+
+def test_target_mask_and_cache_follow_rules():
+    moves = Moves(txt_path=None, board_size=(8, 8))
+    assert moves.get_moves(0, 0) == [(1, 0), (0, 1)]
+    assert moves.target_mask(0, 0) == (1 << 8) | (1 << 1)
+
+    moves.rules = [MoveRule(1, 1)]                   # replacing the rules drops the cache
+    assert moves.get_moves(0, 0) == [(1, 1)]
+    assert moves.target_mask(0, 0) == 1 << 9
+
+def test_same_rules_share_one_table():
+    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".txt") as f:
+        f.write("1,0:\n2,0:1st\n1,1:capture\n")
+        f.flush()
+        white = [Moves(pathlib.Path(f.name), (8, 8)) for _ in range(2)]
+        black = Moves(pathlib.Path(f.name), (8, 8), invert_y=True)
+
+    assert white[0]._table is white[1]._table
+    assert black._table is not white[0]._table
+    assert black.get_moves(6, 3) == [(5, 3), (4, 3), (5, 4)]
+    assert white[0].get_moves(6, 3, first_move=True) == []
+    assert white[0].get_moves(-1, 3) == [(0, 3), (1, 3), (0, 4)]   # origin off the board
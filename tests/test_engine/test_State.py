@@ -111,3 +111,31 @@ def test_auto_transition_no_target_state(dummy_board):
     phys._moving = False
     result = state.update(now_ms=999999)
     assert result is state
+
+def test_machine_shares_specs_and_builds_states_lazily(idle_state, move_state, dummy_board):
+    from engine.State import Machine, MachineSpec
+    idle_state.set_transition("move", move_state)
+    move_state.next_state_name = "idle"
+    move_state.set_transition("idle", idle_state)
+    spec = MachineSpec.of(idle_state)
+
+    a, b = Machine(spec, dummy_board, "A"), Machine(spec, dummy_board, "B")
+    root = a.root()
+    assert list(a.states) == ["idle"]                  # move not built yet
+    assert "move" in root.transitions and list(a.states) == ["idle"]
+
+    mv = root.transitions["move"]
+    assert mv is a.state("move") and mv.transitions["idle"] is root
+    assert mv.piece_id == "A"
+    other = b.root().transitions["move"]
+    assert other.spec is mv.spec and other.moves is mv.moves
+    assert other.physics is not mv.physics
+
+
+def test_writing_a_spec_field_only_changes_that_state(idle_state, dummy_board):
+    from engine.State import Machine, MachineSpec
+    spec = MachineSpec.of(idle_state)
+    a, b = Machine(spec, dummy_board).root(), Machine(spec, dummy_board).root()
+    a.next_state_name = "move"
+    assert a.next_state_name == "move"
+    assert b.next_state_name == "" and spec.states["idle"].next_state_name == ""
@@ -0,0 +1,36 @@
+# tests/test_engine/test_bitboard.py
+from engine.bitboard import Geometry, geometry, stepped_cells
+
+
+def test_bits_round_trip():
+    geo = Geometry(8, 8)
+    assert geo.bit((0, 0)) == 1
+    assert geo.bit((7, 7)) == 1 << 63
+    assert geo.full == (1 << 64) - 1
+    assert geo.bit((8, 0)) == 0                      # off the board
+    cells = [(0, 3), (2, 5), (7, 1)]
+    assert list(geo.cells(geo.mask(cells))) == cells
+
+
+def test_large_boards_use_wide_ints():
+    geo = geometry(32, 32)
+    assert geo is geometry(32, 32)                   # shared per size
+    assert geo.bit((31, 31)) == 1 << 1023
+    assert list(geo.cells(geo.bit((20, 30)))) == [(20, 30)]
+
+
+def test_path_matches_stepped_walk():
+    geo = Geometry(8, 8)
+    assert stepped_cells((7, 0), (4, 0)) == [(6, 0), (5, 0)]
+    assert geo.path((7, 0), (4, 3)) == geo.mask([(6, 1), (5, 2)])
+    assert geo.path((3, 3), (4, 4)) == 0
+
+
+def test_rays_and_slide_stop_at_first_blocker():
+    geo = Geometry(8, 8)
+    assert geo.rays[(0, 1)][geo.index((0, 5))] == geo.mask([(0, 6), (0, 7)])
+    occupied = geo.mask([(3, 6), (1, 3), (5, 5)])
+    reach = geo.slide((3, 3), occupied, directions=[(0, 1), (-1, 0), (1, 1)])
+    assert reach == geo.mask([(3, 4), (3, 5), (3, 6),        # up to the blocker
+                              (2, 3), (1, 3),
+                              (4, 4), (5, 5)])
@@ -0,0 +1,26 @@
+# tests/test_engine/test_clock.py
+import time
+
+import pytest
+
+from engine.clock import RealClock, VirtualClock
+from engine.Command import Command
+
+def test_virtual_clock_moves_only_when_told():
+    clock = VirtualClock(1000)
+    assert clock.now_ms() == 1000
+    clock.sleep(0.25)
+    assert clock.advance(5) == 1255 == clock.now_ms()
+    with pytest.raises(ValueError):
+        clock.advance(-1)
+
+def test_real_clock_reads_its_source():
+    assert RealClock(lambda: 12.3456).now_ms() == 12345
+    assert abs(RealClock(time.time).now_ms() - time.time() * 1000) < 1000
+
+def test_command_helpers_stamp_from_the_given_clock():
+    clock = VirtualClock(42)
+    assert Command.move("P1", (1, 1), (2, 1), clock=clock).timestamp == 42
+    assert Command.create_jump_command("N1", [(1, 1)], clock=clock).timestamp == 42
+    assert Command.move("P1", (1, 1), (2, 1), ts=0, clock=clock).timestamp == 0   # 0 is a time
+    assert Command.move("P1", (1, 1), (2, 1)).timestamp > 1_600_000_000_000       # epoch ms
@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import MagicMock
 from engine.Command import Command
+from engine.clock import VirtualClock
 from game.game import Game
 
 # -------------------------
@@ -143,3 +144,17 @@ def test_announce_win_white(game):
 
 
 
+
+def test_simulate_runs_on_a_virtual_clock(game):
+    game.clock = VirtualClock(5000)
+    seen = []
+    game.pieces[2].update = seen.append
+    assert game.simulate(100, step_ms=16) is False
+    assert game.game_time_ms() == 5100
+    assert seen[:2] == [5016, 5032] and seen[-1] == 5100
+
+def test_simulate_stops_when_the_game_is_won(game):
+    game.clock = VirtualClock()
+    game.black_king.is_captured = True
+    assert game.simulate(60_000) is True
+    assert 2000 < game.game_time_ms() < 2100       # the 2 s grace period, then done
@@ -0,0 +1,155 @@
+# tests/test_game/test_occupancy.py
+
+import pytest
+from unittest.mock import MagicMock
+from engine.bitboard import geometry
+from engine.Moves import Moves, MoveRule
+from game.game import Game
+from game.occupancy import Occupancy
+
+
+class DummyPhysics:
+    def __init__(self, cell):
+        self.cell = cell
+        self.is_jumping = False
+
+    def get_current_cell(self):
+        return self.cell
+
+
+class DummyPiece:
+    def __init__(self, piece_id, cell, color):
+        self.piece_id = piece_id
+        self.color = color
+        self.is_captured = False
+        self.current_state = MagicMock()
+        self.current_state.physics = DummyPhysics(cell)
+        self.current_state.get_cell = lambda: self.current_state.physics.cell
+        self.current_state.state_start_time = 0
+
+    def move_to(self, cell):
+        self.current_state.physics.cell = cell
+
+
+class DummyBoard:
+    H_cells = W_cells = 8
+
+    def clone(self):
+        return self
+
+
+@pytest.fixture
+def pieces():
+    return [DummyPiece("KW_7_4", (7, 4), "WHITE"),
+            DummyPiece("KB_0_4", (0, 4), "BLACK"),
+            DummyPiece("PW_6_0", (6, 0), "WHITE"),
+            DummyPiece("PB_1_7", (1, 7), "BLACK")]
+
+
+def _colors(p):
+    return p.color
+
+
+def test_lookup_by_cell(pieces):
+    occ = Occupancy(pieces, _colors)
+    assert occ.at((7, 4)) is pieces[0]
+    assert occ.at((3, 3)) is None
+    assert occ.pieces_at((1, 7)) == [pieces[3]]
+    assert not occ.crowded
+
+
+def test_move_refiles_and_tracks_crowded_cells(pieces):
+    occ = Occupancy(pieces, _colors)
+    pw, pb = pieces[2], pieces[3]
+    pw.move_to((1, 7))
+    occ.move(pw)
+    assert occ.at((6, 0)) is None
+    # game order is kept, not arrival order
+    assert occ.pieces_at((1, 7)) == [pw, pb]
+    assert occ.crowded == {(1, 7)}
+
+    occ.remove(pb)
+    assert occ.pieces_at((1, 7)) == [pw]
+    assert not occ.crowded
+
+
+def test_captured_pieces_are_never_returned(pieces):
+    occ = Occupancy(pieces, _colors)
+    pieces[1].is_captured = True             # flipped without telling the index
+    assert occ.at((0, 4)) is None
+    occ.move(pieces[1])
+    assert (0, 4) not in occ._by_cell
+
+
+def test_has_ally_and_color_of(pieces):
+    occ = Occupancy(pieces, _colors)
+    kw, kb, pw, _ = pieces
+    assert occ.color_of(kw) == "WHITE"
+    assert occ.has_ally(kw, (6, 0))
+    assert not occ.has_ally(kb, (6, 0))
+    assert not occ.has_ally(pw, (6, 0))      # a piece is not its own ally
+
+
+def test_game_keeps_index_in_sync(pieces):
+    game = Game(list(pieces), DummyBoard())
+    assert game._piece_at(6, 0) is pieces[2]
+
+    extra = DummyPiece("QW_5_5", (5, 5), "WHITE")
+    game.pieces = game.pieces + [extra]
+    assert game._piece_at(5, 5) is extra
+    assert game.occupancy.color_of(extra) is None
+    game.white_pieces = game.white_pieces + [extra]
+    assert game.occupancy.color_of(extra) == "WHITE"
+
+
+def test_collision_capture_matches_scan(pieces):
+    results = []
+    for indexed in (True, False):
+        ps = [DummyPiece(p.piece_id, p.current_state.physics.cell, p.color) for p in pieces]
+        game = Game(ps, DummyBoard())
+        game.bus = MagicMock()
+        if not indexed:
+            game.occupancy = None
+        ps[3].current_state.state_start_time = 100       # arrived last – wins
+        ps[2].move_to((1, 7))
+        if indexed:
+            game.occupancy.move(ps[2])
+        game._resolve_collisions()
+        results.append([p.is_captured for p in ps])
+        if indexed:
+            assert game._piece_at(1, 7) is ps[3]
+            assert not game.occupancy.crowded
+    assert results[0] == results[1] == [False, False, True, False]
+
+
+def test_bitboards_follow_moves_and_captures(pieces):
+    geo = geometry(8, 8)
+    occ = Occupancy(pieces, _colors, geo)
+    assert occ.bits["WHITE"] == geo.mask([(7, 4), (6, 0)])
+    assert occ.occupied == geo.mask([(7, 4), (0, 4), (6, 0), (1, 7)])
+
+    pw, pb = pieces[2], pieces[3]
+    pw.move_to((1, 7))
+    occ.move(pw)
+    occ.remove(pb)
+    assert occ.bits["WHITE"] == geo.mask([(7, 4), (1, 7)])
+    assert occ.bits["BLACK"] == geo.bit((0, 4))
+    assert occ.has_ally(pieces[0], (1, 7))
+    assert not occ.has_ally(pieces[1], (1, 7))
+
+
+def test_path_blocked_and_reachable(pieces):
+    occ = Occupancy(pieces, _colors, geometry(8, 8))
+    kw, pw = pieces[0], pieces[2]
+    assert occ.path_blocked(kw, (7, 4), (4, 1)) is False
+    assert occ.path_blocked(kw, (7, 0), (4, 0)) is True        # pawn on (6, 0)
+    assert occ.path_blocked(pw, (7, 0), (4, 0)) is False       # ... unless it is the mover
+
+    kw.moves = Moves(txt_path=None, board_size=(8, 8))
+    kw.moves.rules = [MoveRule(0, -3), MoveRule(-7, 0), MoveRule(-1, -4)]
+    # (7, 1) is free; (0, 4) holds the black king – capturable only if the
+    # file between is clear; (6, 0) holds an ally
+    assert list(occ.geometry.cells(occ.reachable(kw, (7, 4)))) == [(0, 4), (7, 1)]
+    pieces[3].move_to((3, 4))
+    occ.move(pieces[3])
+    assert list(occ.geometry.cells(occ.reachable(kw, (7, 4)))) == [(7, 1)]
@@ -21,13 +21,13 @@ pieces_dir   = PROJECT_ROOTT / "pieces"
 
 
 
-import time
 import pytest
 from pathlib import Path
 
 from core.engine.Board         import Board
 from core.pieces.PieceFactory   import PieceFactory
 from core.engine.Command        import Command
+from core.engine.clock          import VirtualClock
 from core.game.game            import Game
 from core.engine.events         import StateChanged
 from graphics.mock_img import MockImg      # ← NEW
@@ -48,7 +48,7 @@ def _make_minimal_game() -> Game:
     rook    = factory.create_piece("RW", (7, 0))
     w_king  = factory.create_piece("KW", (7, 4))
     b_king  = factory.create_piece("KB", (0, 4))
-    game    = Game([rook, w_king, b_king], board)
+    game    = Game([rook, w_king, b_king], board, clock=VirtualClock(1_000))
     game.start()
     return game
 
@@ -59,7 +59,7 @@ def _drive_until(game: Game, ms: int, step: int = 50):
         now = game.game_time_ms()
         for p in game.pieces:
             p.update(now)
-        time.sleep(step / 1000)
+        game.clock.advance(step)
 
 # ---------- הטסט ----------
 def test_move_generates_rest_and_idle():
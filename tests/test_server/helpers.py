@@ -0,0 +1,57 @@
+# tests/test_server/helpers.py
+"""Stand-ins shared by the server tests: a rule-less game and fake sockets."""
+import asyncio
+import json
+
+from core.engine.events import EventBus
+
+
+class DummyGame:
+    """What a Room touches of a Game – pieces, bus, board size, a clock."""
+    def __init__(self, pieces=()):
+        self.pieces, self.bus = list(pieces), EventBus()
+        self.board = type("B", (), {"H_cells": 8, "W_cells": 8})()
+
+    def game_time_ms(self): return 0
+    def _resolve_collisions(self): pass
+    def _is_win(self): return False
+
+
+class FakeSocket:
+    """Records every JSON frame sent to it."""
+    subprotocol = None
+    remote_address = ("10.0.0.7", 5150)
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def of_type(self, tp):
+        return [m for m in self.sent if m["type"] == tp]
+
+
+class ScriptedSocket(FakeSocket):
+    """Yields the given messages, then waits until :meth:`hang_up`."""
+    def __init__(self, *msgs):
+        super().__init__()
+        self._in = asyncio.Queue()
+        for m in msgs:
+            self._in.put_nowait(json.dumps(m))
+
+    def hang_up(self):
+        self._in.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raw = await self._in.get()
+        if raw is None:
+            raise StopAsyncIteration
+        return raw
+
+
+def run(coro):
+    return asyncio.run(coro)
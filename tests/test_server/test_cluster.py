@@ -0,0 +1,115 @@
+# tests/test_server/test_cluster.py
+import asyncio
+import json
+
+from cluster import (BINARY, CLOSE, OPEN, TEXT, HashRing, ProxySocket, read_frame,
+                     write_frame)
+from gateway import Gateway
+from rooms import RoomManager, serve_connection
+from tests.test_server.helpers import DummyGame
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class BufferWriter:
+    """Collects what a StreamWriter would have put on the link."""
+    def __init__(self):
+        self.buf = bytearray()
+
+    def writelines(self, chunks):
+        for c in chunks:
+            self.buf += c
+
+    def is_closing(self): return False
+    async def drain(self): pass
+
+    def frames(self):
+        async def collect():
+            reader = asyncio.StreamReader()
+            reader.feed_data(bytes(self.buf)); reader.feed_eof()
+            out = []
+            try:
+                while True:
+                    out.append(await read_frame(reader))
+            except asyncio.IncompleteReadError:
+                return out
+        return asyncio.run(collect())
+
+class RawSocket:
+    """Yields the given raw frames, records what is sent back."""
+    def __init__(self, *frames):
+        self.frames, self.sent = list(frames), []
+
+    async def send(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self, *a): pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.frames:
+            raise StopAsyncIteration
+        return self.frames.pop(0)
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_hash_ring_is_stable_and_spreads_rooms():
+    ring = HashRing(["w0", "w1", "w2", "w3"])
+    rooms = [f"room-{i}" for i in range(4000)]
+    owner = {r: ring.node_for(r) for r in rooms}
+
+    assert owner == {r: HashRing(["w3", "w2", "w1", "w0"]).node_for(r) for r in rooms}
+    counts = [list(owner.values()).count(n) for n in ring.nodes]
+    assert min(counts) > 0.6 * len(rooms) / 4
+
+
+def test_hash_ring_moves_only_rooms_of_the_new_worker():
+    ring = HashRing(["w0", "w1", "w2"])
+    rooms = [f"room-{i}" for i in range(3000)]
+    before = {r: ring.node_for(r) for r in rooms}
+    ring.add("w3")
+    moved = [r for r in rooms if ring.node_for(r) != before[r]]
+
+    assert all(ring.node_for(r) == "w3" for r in moved)
+    assert len(moved) < 0.4 * len(rooms)
+
+
+def test_link_frames_round_trip():
+    w = BufferWriter()
+    write_frame(w, 7, OPEN, b"kfc.bin.1")
+    write_frame(w, 7, BINARY, b"\x00\x01")
+    write_frame(w, 9, CLOSE)
+    assert w.frames() == [(7, OPEN, b"kfc.bin.1"), (7, BINARY, b"\x00\x01"), (9, CLOSE, b"")]
+
+
+def test_proxy_socket_runs_the_room_handler():
+    w = BufferWriter()
+
+    async def scenario():
+        mgr = RoomManager(DummyGame)
+        ws = ProxySocket(3, "", w)
+        task = asyncio.create_task(serve_connection(mgr, ws))
+        ws.feed(json.dumps({"type": "join", "payload": {"name": "ann", "color": "WHITE", "room": "r"}}))
+        await asyncio.sleep(0.05)
+        ws.feed(None)
+        await task
+        assert len(mgr.get("r").connected) == 0
+        await mgr.stop()
+    asyncio.run(scenario())
+
+    msgs = [json.loads(body) for conn, op, body in w.frames() if op == TEXT and conn == 3]
+    assert [m["type"] for m in msgs][:2] == ["state", "players"]
+
+
+def test_gateway_refuses_bad_handshakes_and_keeps_the_connection():
+    async def scenario():
+        ws = RawSocket("x" * 4096, "{nope", "[]", "1", json.dumps({"type": "command"}))
+        await Gateway({}).handle_socket(ws)
+        return ws.sent
+    assert [m["payload"]["err"] for m in asyncio.run(scenario())] == [
+        "frame too large", "malformed frame", "malformed frame", "malformed frame", "join first"]
@@ -0,0 +1,97 @@
+# tests/test_server/test_ingest.py
+import asyncio
+import pytest
+
+from ingest import CommandIngest, IngestError
+from rooms import Room
+from tests.test_server.helpers import DummyGame, FakeSocket
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class FakeClock:
+    def __init__(self): self.t = 0.0
+    def __call__(self): return self.t
+
+
+def move(pid="PW_6_0", params=([6, 0], [5, 0]), **extra):
+    return dict({"type": "Move", "piece_id": pid, "params": list(params),
+                 "timestamp": 5, "player_id": "WHITE"}, **extra)
+
+
+def reason(fn, *args):
+    with pytest.raises(IngestError) as e:
+        fn(*args)
+    return str(e.value)
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_valid_move_becomes_a_command_with_tuple_cells():
+    ing = CommandIngest()
+    cmd = ing.command("ws", move())
+    assert (cmd.type, cmd.piece_id, cmd.params, cmd.player_id, cmd.timestamp) == \
+        ("Move", "PW_6_0", [(6, 0), (5, 0)], "WHITE", 5)
+    jump = ing.command("ws", {"type": "Jump", "piece_id": "NB_0_1", "params": [[0, 1]]})
+    assert jump.params == [(0, 1)] and jump.player_id is None
+    assert ing.stats() == {"accepted": 2, "rejected": {}}
+
+
+def test_oversized_and_non_json_frames_are_refused_before_parsing():
+    ing = CommandIngest(max_bytes=64)
+    assert reason(ing.parse, "{" + " " * 80 + "}") == "frame too large"
+    assert reason(ing.parse, "{nope") == "malformed frame"
+    assert reason(ing.parse, "[1, 2]") == "malformed frame"
+    assert ing.parse('{"type": "ping"}') == {"type": "ping"}
+
+
+@pytest.mark.parametrize("payload, why", [
+    ([], "malformed command"),
+    (move(type="Castle"), "unsupported command"),
+    (move(pid=""), "bad piece_id"),
+    (move(pid=7), "bad piece_id"),
+    (move(params=([6, 0],)), "bad params"),
+    (move(params=([6, 0], [9, 0])), "bad params"),
+    (move(params=([6, 0], [5, "0"])), "bad params"),
+    (move(params=([6, 0], [5, 0, 1])), "bad params"),
+    (move(timestamp=-1), "bad timestamp"),
+    (move(timestamp="5"), "bad timestamp"),
+    (move(timestamp=2 ** 64), "bad timestamp"),
+    (move(player_id="RED"), "bad player_id"),
+])
+def test_schema_violations_are_rejected_with_a_reason(payload, why):
+    ing = CommandIngest()
+    assert reason(ing.command, "ws", payload) == why
+    assert ing.stats() == {"accepted": 0, "rejected": {why: 1}}
+
+
+def test_each_connection_has_its_own_token_bucket():
+    clock = FakeClock()
+    ing = CommandIngest(rate_hz=2.0, burst=3.0, clock=clock)
+    for _ in range(3):
+        ing.command("flood", move())
+    assert reason(ing.command, "flood", move()) == "rate limited"
+    ing.command("calm", move())                              # not affected by the flood
+    clock.t = 0.5                                            # one token back
+    ing.command("flood", move())
+    assert reason(ing.command, "flood", move()) == "rate limited"
+    ing.forget("flood")                                      # a new connection starts full
+    ing.command("flood", move())
+    assert ing.stats() == {"accepted": 6, "rejected": {"rate limited": 2}}
+
+
+def test_room_answers_a_bad_command_and_keeps_the_connection():
+    async def scenario():
+        ing = CommandIngest(burst=1.0, rate_hz=0.0)
+        room = Room("r", DummyGame(), ingest=ing)
+        ws = FakeSocket()
+        await room.handle(ws, {"type": "command", "payload": move(params=([6, 0],))})
+        await room.handle(ws, {"type": "command", "payload": move(pid="XX_0_0")})
+        await room.handle(ws, {"type": "command", "payload": move(pid="XX_0_0")})
+        await room.stop()
+        return ws.sent, ing.stats()
+    sent, stats = asyncio.run(scenario())
+    assert [m["payload"]["err"] for m in sent] == ["bad params", "bad piece_id"]
+    assert stats == {"accepted": 1, "rejected": {"bad params": 1, "rate limited": 1}}
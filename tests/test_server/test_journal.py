@@ -0,0 +1,129 @@
+# tests/test_server/test_journal.py
+import asyncio
+import gzip
+
+import pytest
+
+from types import SimpleNamespace
+
+from journal import Journal, JournalError, read_journal
+from rooms import Room
+from core.engine.Command import Command
+from core.engine.events import GameEnded
+from tests.test_server import helpers
+from tests.test_server.helpers import FakeSocket
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class DummyPiece:
+    """Takes a Move to an even column, refuses anything else."""
+    def __init__(self, pid, cell):
+        self.piece_id, self.is_captured = pid, False
+        phys = SimpleNamespace(get_current_cell=lambda: cell, current_pixel_pos=(0, 0))
+        self.current_state = SimpleNamespace(state_name="idle", physics=phys, transitions={})
+
+    def on_command(self, cmd, now, game):
+        return cmd.type == "Move" and cmd.params[1][1] % 2 == 0
+
+    def update(self, now): pass
+
+
+class DummyGame(helpers.DummyGame):
+    game_start_ms = 1234
+
+
+def command(piece_id, kind, *cells, player="WHITE"):
+    return {"type": "command", "payload": {"type": kind, "piece_id": piece_id,
+                                           "params": [list(c) for c in cells],
+                                           "player_id": player, "timestamp": 7}}
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_round_trip_through_the_compressed_file(tmp_path):
+    j = Journal(tmp_path / "m.kfcj", {"pieces": ["PW", "KB"], "tick_hz": 60})
+    j.command(100, Command(5, "PW", "Move", [(6, 0), (5, 0)], "WHITE"), True)
+    j.command(130, Command(6, "KB", "Jump", [(0, 4)], None), False)
+    j.close("WHITE")
+    assert j.join(5)
+    assert not (tmp_path / "m.kfcj").exists()
+    header, entries, end = read_journal(j.final_path)
+    assert header["tick_hz"] == 60
+    assert [(e.now_ms, e.command.piece_id, e.command.type, e.command.params,
+             e.command.player_id, e.command.timestamp, e.applied) for e in entries] == [
+        (100, "PW", "Move", [(6, 0), (5, 0)], "WHITE", 5, True),
+        (130, "KB", "Jump", [(0, 4)], None, 6, False)]
+    assert end == {"winner": "WHITE", "reason": "ended", "commands": 2}
+
+
+def test_truncated_and_foreign_files_are_refused(tmp_path):
+    j = Journal(tmp_path / "m.kfcj", {"pieces": ["PW"]}, compress=False)
+    j.command(1, Command(0, "PW", "Move", [(6, 0), (5, 0)]), True)
+    j.close()
+    j.join(5)
+    raw = j.final_path.read_bytes()
+    (tmp_path / "cut.kfcj").write_bytes(raw[:-3])
+    with pytest.raises(JournalError):
+        read_journal(tmp_path / "cut.kfcj")
+    (tmp_path / "x.kfcj").write_bytes(b"GIF89a")
+    with pytest.raises(JournalError):
+        read_journal(tmp_path / "x.kfcj")
+
+
+def test_room_journals_its_match_and_rotates_at_the_end(tmp_path):
+    async def scenario():
+        game = DummyGame([DummyPiece("PW", (6, 0)), DummyPiece("PB", (1, 1))])
+        room = Room("r/1", game, journal_dir=tmp_path)
+        ws = FakeSocket()
+        await room.handle(ws, command("PW", "Move", (6, 0), (5, 0)))
+        await room.handle(ws, command("PB", "Move", (1, 1), (2, 1), player="BLACK"))
+        await room.handle(ws, command("XX", "Move", (1, 1), (2, 1)))      # unknown: not journaled
+        game.bus.publish(GameEnded(winner="WHITE"))
+        await room.handle(ws, command("PW", "Move", (5, 0), (4, 0)))      # game over
+        first = room.journal
+        first.join(5)
+        await room.stop()
+        return first, ws.sent
+    journal, sent = asyncio.run(scenario())
+    assert [m["payload"]["err"] for m in sent] == ["bad piece_id", "game over"]
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == [journal.final_path.name] and files[0].startswith("r_1-")
+    header, entries, end = read_journal(journal.final_path)
+    assert header["room"] == "r/1" and header["game_start_ms"] == 1234
+    assert {p["id"]: p["cell"] for p in header["initial"]["pieces"]} == {"PW": [6, 0], "PB": [1, 1]}
+    assert [(e.command.piece_id, e.applied) for e in entries] == [("PW", True), ("PB", False)]
+    assert end["winner"] == "WHITE" and end["commands"] == 2
+    with gzip.open(journal.final_path, "rb") as fh:
+        assert fh.read(4) == b"KFCJ"
+
+
+def test_oversized_timestamps_never_break_the_room_or_the_journal(tmp_path):
+    async def scenario():
+        room = Room("r", DummyGame([DummyPiece("PW", (6, 0))]), journal_dir=tmp_path)
+        ws = FakeSocket()
+        msg = command("PW", "Move", (6, 0), (5, 0))
+        msg["payload"]["timestamp"] = 2 ** 64
+        await room.handle(ws, msg)                                        # refused by ingest
+        await room.stop()
+        return ws.sent, room.journal
+    sent, journal = asyncio.run(scenario())
+    assert [m["payload"]["err"] for m in sent] == ["bad timestamp"] and journal is None
+
+    j = Journal(tmp_path / "m.kfcj", {"pieces": ["PW"]})
+    j.command(1, Command(2 ** 64, "PW", "Move", [(6, 0), (5, 0)]), True)   # left out, no raise
+    j.command(2, Command(3, "PW", "Move", [(6, 0), (5, 0)]), True)
+    j.close()
+    assert j.join(5)
+    assert [e.command.timestamp for e in read_journal(j.final_path)[1]] == [3]
+
+
+def test_rooms_without_a_journal_dir_write_nothing(tmp_path):
+    async def scenario():
+        room = Room("r", DummyGame([DummyPiece("PW", (6, 0))]))
+        await room.handle(FakeSocket(), command("PW", "Move", (6, 0), (5, 0)))
+        await room.stop()
+        return room.journal
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,91 @@
+# tests/test_server/test_metrics.py
+import asyncio
+
+from metrics import Histogram, Metrics, serve_metrics
+from rooms import Room, RoomManager
+from scheduler import TickStats
+from ingest import IngestError
+from tests.test_server.helpers import DummyGame, FakeSocket
+
+# -------------------------
+# Dummies
+# -------------------------
+
+async def http_get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.0\r\nHost: x\r\n\r\n".encode())
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.decode().partition("\r\n\r\n")
+    return head.splitlines()[0], body
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram((1, 2.5))
+    for v in (0.5, 1, 2, 9):
+        h.observe(v)
+    assert list(h.lines("x_ms", 'k="v"')) == [
+        'x_ms_bucket{k="v",le="1"} 2', 'x_ms_bucket{k="v",le="2.5"} 3',
+        'x_ms_bucket{k="v",le="+Inf"} 4', 'x_ms_sum{k="v"} 12.5', 'x_ms_count{k="v"} 4']
+
+
+def test_room_records_ticks_and_broadcast_frames():
+    m = Metrics()
+    room = Room("r", DummyGame(), metrics=m)
+    assert room.scheduler.stats.work_hist is m.tick_ms
+    room.scheduler.stats.record(0.3, 0.0, 16.7)
+
+    async def scenario():
+        await room.add(FakeSocket())
+        room._broadcast_batch({"seq": 1, "key": False, "base": 0, "pieces": [], "ts": 0}, [])
+        await room.stop()
+    asyncio.run(scenario())
+    assert m.tick_ms.count == 1
+    assert m.frame_bytes["json"].count == 1 and m.frame_bytes["binary"].count == 0
+    assert m.encode_ms["json"].count == 1
+
+
+def test_endpoint_serves_the_text_page():
+    async def scenario():
+        rooms = RoomManager(DummyGame)
+        room = rooms.open("live")
+        ws = FakeSocket()
+        await room.add(ws)
+        try:
+            rooms.ingest.parse("{nope")
+        except IngestError:
+            pass
+        rooms.metrics.observe_frame("binary", 0.02, 300)
+        server = await serve_metrics(rooms, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            page = await http_get(port, "/metrics")
+            missing = await http_get(port, "/")
+        finally:
+            server.close()
+            await server.wait_closed()
+            await rooms.stop()
+        return page, missing
+    (status, body), (status404, _) = asyncio.run(scenario())
+    assert status.endswith("200 OK") and status404.endswith("404 Not Found")
+    lines = body.splitlines()
+    for want in ("# TYPE kfc_tick_duration_ms histogram",
+                 "kfc_rooms 1",
+                 "kfc_connections 1",
+                 'kfc_frame_bytes_bucket{format="binary",le="512"} 1',
+                 "kfc_commands_accepted_total 0",
+                 'kfc_commands_rejected_total{reason="malformed frame"} 1',
+                 'kfc_ticks_skipped_total{room="live"} 0'):
+        assert want in lines, want
+    assert any(l.startswith('kfc_send_queue_depth{room="live",peer="10.0.0.7:5150"} ')
+               for l in lines)
+    assert any(l.startswith("kfc_event_loop_lag_ms_count") for l in lines)
+
+
+def test_scheduler_keeps_its_own_stats_without_a_histogram():
+    stats = TickStats()
+    stats.record(1.0, 0.0, 16.7)
+    assert stats.as_dict()["ticks"] == 1
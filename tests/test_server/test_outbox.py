@@ -0,0 +1,152 @@
+# tests/test_server/test_outbox.py
+import asyncio
+
+from outbox import Outbox, RateController
+from rooms import Room
+from tests.test_server.helpers import DummyGame, FakeSocket, run
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class StuckSocket:
+    """Every send blocks until :attr:`gate` is set."""
+    def __init__(self):
+        self.sent, self.gate, self.closed = [], asyncio.Event(), False
+
+    async def send(self, data):
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+def delta(seq, pid):
+    return {"seq": seq, "key": False, "ts": seq,
+            "pieces": [{"id": pid, "cell": [0, 0], "pixel": [seq, 0], "state": "move", "captured": False}]}
+
+
+def outbox(ws, **kw):
+    """Frames are the payloads themselves, so the test can look inside."""
+    return Outbox(ws, lambda state, events: {"state": state, "events": events} if events else state,
+                  lambda: {"seq": 99, "key": True}, **kw)
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_deltas_posted_while_busy_merge_into_one():
+    async def scenario():
+        ws = StuckSocket()
+        box = outbox(ws)
+        box.start()
+        box.post_state(delta(1, "A"))
+        await asyncio.sleep(0)              # d1 is now in flight
+        for seq, pid in ((2, "A"), (3, "B"), (4, "A")):
+            box.post_state(delta(seq, pid))
+        box.post("evt")
+        ws.gate.set()
+        await asyncio.sleep(0.05)           # the state frame waits for its slot
+        await box.stop()
+        return ws.sent, box.merged
+    sent, merged = run(scenario())
+    assert [f if isinstance(f, str) else f["seq"] for f in sent] == [1, "evt", 4]
+    assert sent[2]["base"] == 1
+    assert {p["id"]: p["pixel"][0] for p in sent[2]["pieces"]} == {"A": 4, "B": 3}
+    assert merged == 2
+
+
+def test_queue_overflow_disconnects():
+    async def scenario():
+        ws = StuckSocket()
+        box = outbox(ws, max_queue=3)
+        box.start()
+        for i in range(10):
+            box.post(f"e{i}")
+        await asyncio.sleep(0)
+        await box.stop()
+        return ws, box
+    ws, box = run(scenario())
+    assert box.closed and ws.closed
+    assert box.backlog == 0
+
+
+def test_send_stuck_past_max_lag_disconnects():
+    async def scenario():
+        ws = StuckSocket()
+        box = outbox(ws, max_lag=0.01)
+        box.start()
+        box.post("e0")
+        await asyncio.sleep(0.03)
+        box.post("e1")
+        await box.stop()
+        return ws, box
+    ws, box = run(scenario())
+    assert box.closed and ws.closed
+
+
+def test_rate_backs_off_on_congestion_and_recovers():
+    rate = RateController(5.0, 20.0, step_hz=1.0, backoff=0.5)
+    rate.on_sent(100, 0.0, backlog=50, rtt=None)
+    assert rate.hz == 10.0
+    rate.on_sent(100, 0.0, backlog=0, rtt=1.0)           # slow round trip
+    assert rate.hz == 5.0
+    rate.on_sent(100, 0.0, backlog=0, rtt=0.05)
+    assert rate.hz == 6.0
+    rate.on_sent(100, 0.1, backlog=0, rtt=0.05)          # 1 kB/s link, 600 B/s wanted
+    assert rate.hz == 5.0
+
+
+def test_slow_client_does_not_hold_up_the_room():
+    async def scenario():
+        room = Room("r", DummyGame(), snapshot_hz=20.0, spectator_hz=20.0)
+        fast, slow = FakeSocket(), StuckSocket()
+        await room.add(fast)
+        room.outboxes[slow] = outbox(slow); room.connected.add(slow)
+        room.outboxes[slow].start()
+        for seq in (1, 2, 3):
+            room._broadcast_batch({"seq": seq, "key": False, "pieces": [], "ts": 0}, [])
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.1)
+        frames = [m["payload"] for m in fast.of_type("state")[1:]]
+        await room.stop()
+        return frames, slow.sent
+    frames, stuck = run(scenario())
+    # the join keyframe took this 50 ms slot: the three deltas arrive as one
+    assert [(f["seq"], f["base"]) for f in frames] == [(3, 0)]
+    assert stuck == []
+
+
+def test_players_get_the_full_rate_watchers_are_capped():
+    async def scenario():
+        room = Room("r", DummyGame(), snapshot_hz=20.0, spectator_hz=10.0)
+        player, watcher = FakeSocket(), FakeSocket()
+        for ws in (player, watcher):
+            await room.add(ws)
+        await room.join(player, {"name": "ann", "color": "WHITE"})
+        bounds = {ws: room.outboxes[ws].rate.max_hz for ws in (player, watcher)}
+        await room.stop()
+        return bounds[player], bounds[watcher]
+    assert run(scenario()) == (20.0, 10.0)
+
+
+def test_events_leave_at_once_together_with_the_pending_state():
+    async def scenario():
+        ws = StuckSocket()
+        box = outbox(ws)
+        box.start()
+        box.post("lobby")
+        await asyncio.sleep(0)              # "lobby" is now in flight
+        box.post_state(delta(1, "A"))
+        box.post_state(delta(2, "B"), events=["e1"])
+        box.post_state(None, events=["e2"])
+        ws.gate.set()
+        await asyncio.sleep(0.01)           # well before the next state slot
+        await box.stop()
+        return ws.sent
+    sent = run(scenario())
+    assert sent[0] == "lobby"
+    assert sent[1]["events"] == ["e1", "e2"]
+    assert {p["id"] for p in sent[1]["state"]["pieces"]} == {"A", "B"}
+    assert len(sent) == 2
@@ -0,0 +1,79 @@
+# tests/test_server/test_profiler.py
+import asyncio
+import pstats
+import threading
+import time
+
+from profiler import Profiler, StackSampler
+from rooms import RoomManager, serve_connection
+from shared import slog
+from tests.test_server.helpers import DummyGame, ScriptedSocket
+
+# -------------------------
+# Dummies
+# -------------------------
+
+def spin_for(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_sampler_sees_what_the_target_thread_is_doing(tmp_path):
+    sampler = StackSampler(threading.get_ident(), interval=0.002).start()
+    spin_for(0.2)
+    sampler.stop()
+    assert sampler.samples > 0
+    assert any("spin_for" in stack for stack in sampler.stacks)
+    out = tmp_path / "p.collapsed"
+    sampler.write_collapsed(out)
+    stack, n = out.read_text().splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack and int(n) >= 1
+
+
+def test_tick_profile_covers_only_the_room_step(tmp_path):
+    async def scenario():
+        rooms = RoomManager(DummyGame)
+        room = rooms.open("r")
+        prof = Profiler(rooms, tmp_path)
+        task = asyncio.create_task(prof.run("ticks", 0.1))
+        await asyncio.sleep(0)
+        room.scheduler.step(16)                          # as the scheduler would
+        path = await task
+        step_after = room.scheduler.step
+        await rooms.stop()
+        return path, step_after, room
+    path, step_after, room = asyncio.run(scenario())
+    assert path.suffix == ".pstats"
+    funcs = {name for (_, _, name) in pstats.Stats(str(path)).stats}
+    assert "_step" in funcs
+    assert step_after == room._step                       # unwrapped afterwards
+
+
+def test_admin_messages_need_the_token():
+    async def scenario(token, *msgs):
+        rooms = RoomManager(DummyGame, admin_token=token)
+        ws = ScriptedSocket(*msgs)
+        ws.hang_up()
+        await serve_connection(rooms, ws)
+        await rooms.stop()
+        return ws.sent
+    saved = dict(slog._levels)
+    try:
+        closed = asyncio.run(scenario(None, {"type": "admin", "payload": {"token": "", "op": "log"}}))
+        sent = asyncio.run(scenario(
+            "s3cret",
+            {"type": "admin", "payload": {"token": "guess", "op": "log", "levels": "t.adm=debug"}},
+            {"type": "admin", "payload": {"token": "s3cret", "op": "log", "levels": "t.adm=debug"}},
+            {"type": "admin", "payload": {"token": "s3cret", "op": "profile", "mode": "bogus"}},
+            {"type": "admin", "payload": {"token": "s3cret", "op": "reboot"}}))
+    finally:
+        slog.configure(saved, reset=True)
+    assert closed == [{"type": "error", "payload": {"err": "forbidden"}}]
+    assert sent[0] == {"type": "error", "payload": {"err": "forbidden"}}
+    assert sent[1]["type"] == "admin" and sent[1]["payload"]["op"] == "log"
+    assert sent[2]["payload"]["err"] == "unknown profile mode 'bogus'"
+    assert sent[3]["payload"]["err"] == "unknown admin op"
@@ -0,0 +1,137 @@
+# tests/test_server/test_protocol.py
+from types import SimpleNamespace
+
+import pytest
+
+from protocol import SnapshotEncoder, encode_state, merge_state
+from client.model import ClientModel
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class DummyPiece:
+    def __init__(self, pid, cell):
+        self.piece_id = pid
+        self.is_captured = False
+        phys = SimpleNamespace(current_pixel_pos=(cell[1] * 64 + 32, cell[0] * 64 + 32))
+        phys.get_current_cell = lambda: cell
+        self.current_state = SimpleNamespace(physics=phys, state_name="idle")
+
+    def slide(self, px):
+        self.current_state.physics.current_pixel_pos = px
+        self.current_state.state_name = "move"
+
+
+class DummyGame:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.board = SimpleNamespace(H_cells=8, W_cells=8)
+        self.now = 1000
+
+    def game_time_ms(self): return self.now
+
+
+@pytest.fixture
+def game():
+    return DummyGame([DummyPiece("PW_6_0", (6, 0)), DummyPiece("PB_1_0", (1, 0))])
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_first_frame_is_keyframe_then_only_changes(game):
+    enc = SnapshotEncoder(keyframe_every=100)
+    key = enc.next_frame(game)
+    assert key["key"] is True and key["seq"] == 1
+    assert len(key["pieces"]) == 2
+
+    assert enc.next_frame(game) is None          # nothing moved
+
+    game.pieces[0].slide((40, 380))
+    delta = enc.next_frame(game)
+    assert delta["key"] is False and delta["seq"] == 2
+    assert [p["id"] for p in delta["pieces"]] == ["PW_6_0"]
+
+
+def test_periodic_keyframe(game):
+    enc = SnapshotEncoder(keyframe_every=3)
+    frames = [enc.next_frame(game) for _ in range(7)]
+    assert [f["key"] for f in frames if f] == [True, True, True]
+
+
+def test_join_keyframe_matches_last_sent_state(game):
+    enc = SnapshotEncoder()
+    enc.next_frame(game)
+    game.pieces[0].slide((40, 380))        # not broadcast yet
+    join = enc.keyframe(game)
+    assert join["seq"] == 1
+    assert join["pieces"][0]["state"] == "idle"
+
+
+def test_client_model_applies_deltas_in_place(game):
+    enc, model = SnapshotEncoder(), ClientModel()
+    model.load_snapshot(enc.next_frame(game))
+    game.pieces[0].slide((40, 380))
+    model.load_snapshot(enc.next_frame(game))
+
+    assert model.seq == 2
+    assert model.pieces["PW_6_0"]["pixel"] == (40, 380)
+    assert model.pieces["PW_6_0"]["state"] == "move"
+    assert model.pieces["PB_1_0"]["state"] == "idle"
+
+
+def test_client_model_flags_gap(game):
+    enc, model = SnapshotEncoder(), ClientModel()
+    model.load_snapshot(enc.next_frame(game))
+    game.pieces[0].slide((40, 380)); enc.next_frame(game)      # lost frame
+    game.pieces[0].slide((40, 370))
+    model.load_snapshot(enc.next_frame(game))
+
+    assert model.resync_needed
+    assert model.pieces["PW_6_0"]["pixel"] == (32, 416)
+    model.load_snapshot(enc.keyframe(game))
+    assert not model.resync_needed
+    assert model.pieces["PW_6_0"]["pixel"] == (40, 370)
+
+
+def test_client_model_applies_merged_delta(game):
+    enc, model = SnapshotEncoder(), ClientModel()
+    model.load_snapshot(enc.next_frame(game))
+    game.pieces[0].slide((40, 380)); d2 = enc.next_frame(game)
+    game.pieces[0].slide((40, 370)); d3 = enc.next_frame(game)
+    model.load_snapshot(merge_state(d2, d3))
+
+    assert not model.resync_needed and model.seq == 3
+    assert model.pieces["PW_6_0"]["pixel"] == (40, 370)
+
+
+def test_legacy_full_snapshot_still_loads(game):
+    model = ClientModel()
+    model.load_snapshot(encode_state(game))
+    assert set(model.pieces) == {"PW_6_0", "PB_1_0"}
+
+
+def test_render_pixels_blend_between_buffered_snapshots(game):
+    enc, model = SnapshotEncoder(), ClientModel(interp_delay_ms=100)
+    model.load_snapshot(enc.next_frame(game), recv_ms=0)          # ts 1000, pixel (32, 416)
+    game.now = 1050; game.pieces[0].slide((32, 316))
+    model.load_snapshot(enc.next_frame(game), recv_ms=50)
+
+    assert model.render_pixels(125)["PW_6_0"] == (32, 366)       # server time 1025
+    assert model.render_pixels(100)["PW_6_0"] == (32, 416)
+    assert model.render_pixels(125)["PB_1_0"] == (32, 96)
+
+
+def test_render_pixels_extrapolate_moving_pieces_briefly(game):
+    enc, model = SnapshotEncoder(), ClientModel(interp_delay_ms=100, max_extrapolate_ms=50)
+    model.load_snapshot(enc.next_frame(game), recv_ms=0)
+    game.now = 1050; game.pieces[0].slide((32, 316))
+    model.load_snapshot(enc.next_frame(game), recv_ms=50)
+
+    assert model.render_pixels(175)["PW_6_0"] == (32, 266)       # 25 ms past the newest
+    assert model.render_pixels(400)["PW_6_0"] == (32, 216)       # capped at 50 ms, then held
+    game.pieces[0].current_state.state_name = "long_rest"
+    game.now = 1100
+    model.load_snapshot(enc.next_frame(game), recv_ms=100)
+    assert model.render_pixels(400)["PW_6_0"] == (32, 316)       # stopped: no overshoot
@@ -0,0 +1,167 @@
+# tests/test_server/test_replay.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import journal
+from journal import Journal, JournalError
+from protocol import encode_event, merge_state
+from rooms import Room
+from core.engine.events import GameEnded, GameStarted
+from replay import MAX_SPEED, Playback, Replay
+from tests.test_server.helpers import DummyGame
+
+# -------------------------
+# Helpers
+# -------------------------
+
+PIECES = ["PW", "KB"]
+STATES = ["idle", "move"]
+
+
+def row(pid, x, state="move"):
+    return {"id": pid, "cell": [x // 64, 0], "pixel": [x, 32], "state": state, "captured": False}
+
+
+def key(seq, ts, *rows):
+    return {"seq": seq, "key": True, "board": {"rows": 8, "cols": 8}, "pieces": list(rows), "ts": ts}
+
+
+def delta(seq, ts, *rows):
+    return {"seq": seq, "key": False, "pieces": list(rows), "ts": ts}
+
+
+def event(msg):
+    """The event dict of an ``event`` message (as the client unwraps it)."""
+    return msg["payload"].get("payload", msg["payload"])
+
+
+def record(path, n=40, step=250, **kw):
+    """A match: keyframe at 0, one delta every *step* ms, GameEnded at the end."""
+    j = Journal(path, {"pieces": PIECES, "states": STATES},
+                keyframe=key(0, 0, row("PW", 0, "idle"), row("KB", 0, "idle")), **kw)
+    for i in range(1, n + 1):
+        j.frame(i * step, delta(i, i * step, row("PW", i)), [])
+    j.frame((n + 1) * step, None, [encode_event(GameEnded(winner="WHITE"))])
+    assert j.join(5)
+    return j.final_path
+
+
+def by_id(state):
+    return {p["id"]: p for p in state["pieces"]}
+
+
+class SlidingPiece:
+    """Jumps 64 px to the right on every command."""
+    def __init__(self, pid):
+        self.piece_id, self.is_captured = pid, False
+        self.phys = SimpleNamespace(get_current_cell=lambda: (6, 0), current_pixel_pos=(0, 0))
+        self.current_state = SimpleNamespace(state_name="idle", physics=self.phys, transitions={})
+
+    def on_command(self, cmd, now, game):
+        x, y = self.phys.current_pixel_pos
+        self.phys.current_pixel_pos = (x + 64, y)
+        return True
+
+    def update(self, now): pass
+
+
+def command(piece_id):
+    return {"type": "command", "payload": {"type": "Move", "piece_id": piece_id,
+                                           "params": [[6, 0], [5, 0]], "player_id": "WHITE"}}
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_finished_journal_is_indexed_from_its_end(tmp_path):
+    path = record(tmp_path / "m.kfcj", keyframe_ms=2_000)
+    index = journal.index_of(journal.load(path))
+    assert [ts for ts, _ in index["keys"]] == [0, 2000, 4000, 6000, 8000, 10000]
+    replay = Replay(path)
+    assert (replay.start_ms, replay.end_ms) == (0, 10250)
+    assert {journal.scan(replay.data, at).__next__()[1] for _, at in replay.keys} == {b"K"}
+
+
+def test_seek_matches_playing_every_frame(tmp_path):
+    replay = Replay(record(tmp_path / "m.kfcj", keyframe_ms=2_000))
+    frames = []
+    for at, tag, body in journal.scan(replay.data):
+        if tag == b"F" or at == replay.keys[0][1]:      # the room's keyframe, then its frames
+            ts, frame = journal.split_frame(body)
+            frames.append((ts, replay.messages(frame)))
+    for target in (0, 1999, 2000, 3100, 7777, 10250):
+        state = None
+        for ts, msgs in frames:
+            if ts > target:
+                break
+            for m in msgs:
+                if m["type"] == "state":
+                    state = m["payload"] if state is None else merge_state(state, m["payload"])
+        got, events, _ = replay.seek(target)
+        assert by_id(got) == by_id(state) and got["ts"] == state["ts"]
+    assert [event(e)["_event_type"] for e in replay.seek(10250)[1]] == ["GameEnded"]
+
+
+def test_playback_advances_with_speed_and_seeks_back(tmp_path):
+    player = Playback(Replay(record(tmp_path / "m.kfcj")), speed=4)
+    assert [m["payload"]["ts"] for m in player.seek(0)] == [0]
+    msgs = player.advance(250)                       # 1 s of the match
+    assert player.position == 1000
+    assert [m["payload"]["ts"] for m in msgs if m["type"] == "state"] == [250, 500, 750, 1000]
+    msgs = player.seek(500)
+    assert [m["type"] for m in msgs] == ["state"] and by_id(msgs[0]["payload"])["PW"]["pixel"] == [2, 32]
+    assert [m["payload"]["ts"] for m in player.advance(100)] == [750]
+    player.paused = True
+    assert player.advance(10_000) == [] and player.position == 900
+    player.paused = False
+    events = [m for m in player.advance(10_000) if m["type"] == "event"]
+    assert player.done and event(events[-1])["winner"] == "WHITE"
+
+
+def test_speed_is_clamped(tmp_path):
+    player = Playback(Replay(record(tmp_path / "m.kfcj", n=4)))
+    assert player.set_speed(100) == MAX_SPEED == 32
+    assert player.faster() == 32
+    assert player.slower() == 16
+
+
+def test_running_journal_is_indexed_by_a_scan(tmp_path):
+    path = record(tmp_path / "m.kfcj", keyframe_ms=2_000, compress=False)
+    data = journal.load(path)
+    last = [at for at, tag, _ in journal.scan(data) if tag == b"F"][-1]
+    (tmp_path / "live.kfcj").write_bytes(data[:last + 7])      # no index, half a record
+    replay = Replay(tmp_path / "live.kfcj")
+    assert replay.keys == Replay(path).keys and replay.end_ms == 10000
+    assert replay.seek(1100)[0]["ts"] == 1000
+    (tmp_path / "x.kfcj").write_bytes(b"GIF89a")
+    with pytest.raises(JournalError):
+        Replay(tmp_path / "x.kfcj")
+
+
+def test_room_journal_ends_with_the_game_ended_frame(tmp_path):
+    async def scenario():
+        game = DummyGame([SlidingPiece("PW")])
+        room = Room("r", game, journal_dir=tmp_path)
+        room.start()
+        await room.handle(None, command("PW"))
+        game.bus.publish(GameStarted(white="a", black="b"))              # wakes the snapshot loop
+        await asyncio.sleep(0.1)
+        await room.handle(None, command("PW"))
+        game.bus.publish(GameEnded(winner="WHITE"))
+        await asyncio.get_running_loop().run_in_executor(None, room.journal.join, 5)
+        seq = room.snapshots.seq
+        game.pieces[0].phys.current_pixel_pos = (999, 0)
+        game.bus.publish(GameStarted(white="a", black="b"))
+        await asyncio.sleep(0.1)
+        idle = room.snapshots.seq == seq                                 # finished, nobody watching
+        await room.stop()
+        return room.journal, idle
+    journal_, idle = asyncio.run(scenario())
+    assert idle
+    replay = Replay(journal_.final_path)
+    state, events, _ = replay.seek(replay.end_ms)
+    assert by_id(state)["PW"]["pixel"] == [128, 0]
+    assert [event(e)["_event_type"] for e in events][-1] == "GameEnded"
+    assert journal.read_journal(journal_.final_path)[2]["winner"] == "WHITE"
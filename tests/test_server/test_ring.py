@@ -0,0 +1,174 @@
+# tests/test_server/test_ring.py
+import asyncio
+import json
+import os
+
+from ring import DELTA, EVENT, KEY, OTHER, FrameRing, RingReader, ring_name
+from fanout import FanOut, RoomFeed, Spectator
+from rooms import Room, RoomManager, serve_connection
+from protocol import encode_batch, encode_event
+from shared.message_schema import unbatch
+from core.engine.events import GameStarted, PieceTaken
+from tests.test_server.helpers import DummyGame, FakeSocket, ScriptedSocket, run
+
+# -------------------------
+# Dummies
+# -------------------------
+
+def new_ring(tag, **kw):
+    return FrameRing.create(ring_name(tag, f"kfct{os.getpid()}"), **kw)
+
+
+def frame(seq, key=False):
+    return json.dumps({"type": "state", "payload": {"seq": seq, "key": key}})
+
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_frames_round_trip_through_an_attached_ring():
+    ring = new_ring("round-trip", meta=json.dumps({"type": "dict", "payload": {"pieces": ["PW"]}}))
+    try:
+        ring.publish(KEY, frame(1, True), b"\x01\x02")
+        ring.publish(DELTA, frame(2))
+        ring.publish(EVENT, '{"type": "event"}')
+        reader_side = FrameRing.attach(ring.shm.name)
+        got = RingReader(reader_side).poll()
+        assert [(f.kind, json.loads(f.text)["type"], f.binary) for f in got] == \
+            [(KEY, "state", b"\x01\x02"), (DELTA, "state", None), (EVENT, "event", None)]
+        assert reader_side.meta["payload"]["pieces"] == ["PW"]
+        assert not reader_side.closed
+    finally:
+        ring.close()
+    assert reader_side.closed                               # still mapped, marked finished
+    reader_side.close()
+
+
+def test_new_reader_starts_at_the_latest_keyframe():
+    ring = new_ring("late", slots=8, slot_size=256)
+    try:
+        for seq in range(1, 7):
+            ring.publish(KEY if seq in (1, 4) else DELTA, frame(seq, seq in (1, 4)))
+        got = RingReader(ring).poll()
+        assert [json.loads(f.text)["payload"]["seq"] for f in got] == [4, 5, 6]
+    finally:
+        ring.close()
+
+
+def test_reader_lapped_by_the_writer_skips_to_a_keyframe():
+    ring = new_ring("lapped", slots=4, slot_size=256)
+    try:
+        ring.publish(KEY, frame(1, True))
+        reader = RingReader(ring)
+        for seq in range(2, 10):
+            ring.publish(KEY if seq == 7 else DELTA, frame(seq, seq == 7))
+        got = reader.poll()
+        assert [json.loads(f.text)["payload"]["seq"] for f in got] == [7, 8, 9]
+        assert reader.lost == 1
+        assert not ring.publish(DELTA, "x" * 300)          # does not fit a slot
+    finally:
+        ring.close()
+
+
+def test_room_publishes_every_frame_once_whoever_is_watching():
+    room = Room("r", DummyGame())
+    ring = new_ring("room")
+    try:
+        room.publish(ring)
+        room._broadcast_batch({"seq": 1, "key": False, "base": 0, "pieces": [], "ts": 0}, [])
+        room._broadcast_batch(None, [encode_event(GameStarted(white="a", black="b"))])
+        room._broadcast_players()
+        reader = RingReader(FrameRing.attach(ring.shm.name))
+        got = reader.poll()
+        assert [f.kind for f in got] == [KEY, DELTA, EVENT, OTHER]
+        assert all(isinstance(f.binary, bytes) for f in got[:2])
+        assert json.loads(got[3].text)["type"] == "players"
+        room._broadcast_batch({"seq": 2, "key": True, "pieces": [], "ts": 0}, [])
+        assert [f.kind for f in reader.poll()] == [KEY, OTHER]   # lobby follows every keyframe
+    finally:
+        run(room.stop())
+    assert room.ring is None
+
+
+def test_feed_catches_a_new_spectator_up_from_the_keyframe():
+    async def scenario():
+        ring = new_ring("feed")
+        ring.publish(DELTA, frame(1))                       # before any keyframe: useless
+        ring.publish(KEY, frame(2, True))
+        ring.publish(OTHER, json.dumps({"type": "players", "payload": {"white": "ann"}}))
+        ring.publish(DELTA, frame(3))
+        feed = RoomFeed("feed", FrameRing.attach(ring.shm.name))
+        ws = FakeSocket()
+        sp = Spectator(ws)
+        feed.add(sp)
+        ring.publish(DELTA, frame(4))
+        feed.step()
+        await asyncio.sleep(0)
+        sp.stop()
+        ring.close()
+        return ws.sent
+    sent = run(scenario())
+    assert [m["type"] for m in sent] == ["players", "state", "state", "state"]
+    assert [m["payload"]["seq"] for m in sent[1:]] == [2, 3, 4]
+
+
+def test_spectator_that_fell_behind_never_gets_an_event_twice():
+    taken = encode_event(PieceTaken(piece_id="PB_1_1", cell=(1, 1), by_color="WHITE", value=1))
+
+    async def scenario():
+        ring = new_ring("behind")
+        ring.publish(KEY, frame(1, True))
+        feed = RoomFeed("behind", FrameRing.attach(ring.shm.name))
+        ws = FakeSocket()
+        sp = Spectator(ws, max_queue=2)
+        feed.add(sp)
+        ring.publish(DELTA, encode_batch({"seq": 2, "key": False}, [taken]))
+        feed.step()
+        await asyncio.sleep(0)                              # the capture reached the watcher
+        for seq in (3, 4, 5):
+            ring.publish(DELTA, frame(seq))
+        feed.step()                                         # 5 overflows: catch up from the keyframe
+        await asyncio.sleep(0)
+        sp.stop()
+        ring.close()
+        return ws.sent
+    sent = run(scenario())
+    msgs = [m for raw in sent for m in unbatch(raw)]
+    assert [m["payload"]["payload"]["_event_type"] for m in msgs if m["type"] == "event"] == ["PieceTaken"]
+    assert [m["payload"]["seq"] for m in msgs if m["type"] == "state"][-4:] == [2, 3, 4, 5]
+
+
+def test_spectate_watches_an_existing_room_without_playing():
+    async def scenario():
+        rooms = RoomManager(DummyGame)
+        rooms.open("live")
+        lost = ScriptedSocket({"type": "spectate", "payload": {"room": "nope"}})
+        watcher = ScriptedSocket({"type": "spectate", "payload": {"room": "live"}},
+                                 {"type": "join", "payload": {"name": "x", "color": "WHITE"}},
+                                 {"type": "command", "payload": {}})
+        tasks = [asyncio.create_task(serve_connection(rooms, ws)) for ws in (lost, watcher)]
+        await asyncio.sleep(0.05)
+        seated = dict(rooms.get("live").players)
+        for ws in (lost, watcher):
+            ws.hang_up()
+        await asyncio.gather(*tasks)
+        await rooms.stop()
+        return lost.sent, watcher.sent, seated
+    lost, watched, seated = run(scenario())
+    assert lost == [{"type": "error", "payload": {"err": "no such room"}}]
+    assert watched[0]["type"] == "state" and watched[0]["payload"]["key"]
+    assert not [m for m in watched if m["type"] == "error"]
+    assert seated == {}
+
+
+def test_fanout_refuses_bad_frames_and_keeps_the_connection():
+    async def scenario():
+        ws = ScriptedSocket()
+        for raw in ("x" * 4096, "{nope", "[]", json.dumps({"type": "join"})):
+            ws._in.put_nowait(raw)
+        ws.hang_up()
+        await FanOut("kfc-test").handle_socket(ws)
+        return ws.sent
+    assert [m["payload"]["err"] for m in run(scenario())] == [
+        "frame too large", "malformed frame", "malformed frame", "spectate first"]
@@ -0,0 +1,135 @@
+# tests/test_server/test_rooms.py
+import asyncio
+import pytest
+
+from types import SimpleNamespace
+
+from rooms import Room, RoomManager, RoomError, normalize_room_id
+from core.engine.events import GameStarted, StateChanged
+from tests.test_server.helpers import DummyGame, FakeSocket, run
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class DummyState:
+    def __init__(self, name, min_ms=0, nxt=""):
+        self.state_name, self.min_duration_ms, self.next_state_name = name, min_ms, nxt
+        self.state_start_time = 0
+        self.transitions = {}
+        self.physics = SimpleNamespace(_moving=False)
+
+
+class DummyPiece:
+    """idle ⇄ long_rest (3 s) – counts how often it is stepped."""
+    def __init__(self, pid):
+        self.piece_id, self.is_captured, self.updates = pid, False, 0
+        self.idle = DummyState("idle")
+        self.rest = DummyState("long_rest", 3000, "idle")
+        self.rest.transitions["idle"] = self.idle
+        self.current_state = self.idle
+
+    def rest_at(self, now):
+        self.rest.state_start_time = now
+        self.current_state = self.rest
+
+    def update(self, now):
+        self.updates += 1
+        st = self.current_state
+        if st.next_state_name and now - st.state_start_time >= st.min_duration_ms:
+            self.current_state = st.transitions[st.next_state_name]
+
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_normalize_room_id_defaults_and_validates():
+    assert normalize_room_id(None) == "default"
+    assert normalize_room_id("  r1 ") == "r1"
+    with pytest.raises(RoomError):
+        normalize_room_id("x" * 100)
+
+
+def test_open_reuses_room_and_respects_limit():
+    async def scenario():
+        mgr = RoomManager(DummyGame, max_rooms=1)
+        a = mgr.open("a")
+        assert mgr.open("a") is a
+        with pytest.raises(RoomError):
+            mgr.open("b")
+        await mgr.stop()
+        assert len(mgr) == 0
+    run(scenario())
+
+
+def test_join_seats_players_and_starts_game():
+    async def scenario():
+        room = Room("r", DummyGame())
+        started = []
+        room.bus.subscribe(GameStarted, started.append)
+        w, b, late = FakeSocket(), FakeSocket(), FakeSocket()
+        for ws in (w, b, late):
+            await room.add(ws)
+        await room.join(w, {"name": "ann", "color": "white"})
+        await room.join(b, {"name": "bob", "color": "BLACK"})
+        await room.join(late, {"name": "eve", "color": "WHITE"})
+
+        assert room.started
+        assert [e.white for e in started] == ["ann"]
+        assert late.of_type("error")[-1]["payload"]["err"] == "color taken"
+        assert w.of_type("state"), "initial snapshot sent on add"
+    run(scenario())
+
+
+def test_collect_closes_rooms_that_stayed_empty():
+    async def scenario():
+        mgr = RoomManager(DummyGame, idle_ttl=10.0)
+        room = mgr.open("a")
+        ws = FakeSocket()
+        await room.add(ws)
+        await room.remove(ws)
+        assert await mgr.collect(now=room.empty_since + 1) == []
+        assert await mgr.collect(now=room.empty_since + 11) == ["a"]
+        assert mgr.get("a") is None
+    run(scenario())
+
+
+def test_idle_room_steps_nothing_until_a_timer_or_command():
+    a, b = DummyPiece("PW_6_0"), DummyPiece("PB_1_0")
+    room = Room("r", DummyGame([a, b]))
+    room._step(1000)                            # first step settles everyone
+    assert room._next_wake_ms() is None
+
+    room._step(1016)
+    assert (a.updates, b.updates) == (1, 1)
+
+    a.rest_at(1016)                             # e.g. a command landed
+    room.bus.publish(StateChanged("PW_6_0", "long_rest", 1016))
+    assert room._next_wake_ms() == 0
+    room._step(1033)
+    assert room._next_wake_ms() == 4016         # parked on its rest timer
+
+    room._step(2000)
+    assert a.updates == 2
+    room._step(4016)
+    assert a.current_state is a.idle and a.updates == 3
+    assert b.updates == 1
+
+
+def test_tick_events_ride_with_the_snapshot_in_one_frame():
+    async def scenario():
+        room = Room("r", DummyGame())
+        ws = FakeSocket()
+        await room.add(ws)
+        room.start()
+        room.bus.publish(StateChanged(piece_id="PW_6_0", new_state="move", timestamp=0))
+        room.bus.publish(GameStarted(white="ann", black="bob"))
+        await asyncio.sleep(0.05)
+        await room.stop()
+        return ws.sent[1:]
+    frames = run(scenario())
+    assert [m["type"] for m in frames] == ["batch"]
+    body = frames[0]["payload"]
+    assert body["state"]["key"]
+    assert [e["payload"]["_event_type"] for e in body["events"]] == ["StateChanged", "GameStarted"]
@@ -0,0 +1,93 @@
+# tests/test_server/test_scheduler.py
+import pytest
+
+from scheduler import FixedStepScheduler
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class FakeClock:
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self): return self.t
+
+    def advance(self, sec): self.t += sec
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make(clock, hz=50.0, **kw):
+    steps = []
+    sched = FixedStepScheduler(steps.append, hz, clock=clock, **kw)
+    return sched, steps
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_steps_land_on_absolute_deadlines(clock):
+    sched, steps = make(clock)
+    sched.run_due()
+    for _ in range(10):
+        clock.advance(0.023)                # wake-ups never line up with the grid
+        sched.run_due()
+    assert steps == [100000 + 20 * i for i in range(len(steps))]
+    assert len(steps) == 1 + int(10 * 0.023 / 0.02)
+
+
+def test_no_step_before_next_deadline(clock):
+    sched, steps = make(clock)
+    sched.run_due()
+    clock.advance(0.019)
+    assert sched.run_due() == 0
+    assert sched.seconds_until_next() == pytest.approx(0.001)
+
+
+def test_catch_up_is_capped_and_skips_are_counted(clock):
+    sched, steps = make(clock, max_catchup=3)
+    sched.run_due()
+    clock.advance(0.2)                      # 10 periods behind
+    assert sched.run_due() == 3
+    assert sched.stats.skipped == 7
+    assert steps[-1] == 100200              # resumes on the grid, at "now"
+    assert sched.stats.as_dict()["late_ms_max"] == pytest.approx(40.0)
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        FixedStepScheduler(lambda now: None, 0)
+
+
+def test_idle_scheduler_sleeps_until_next_wake(clock):
+    wake_at = {"ms": 100100}
+    sched, steps = make(clock, next_wake=lambda: wake_at["ms"])
+    sched.run_due()
+    sched.plan_idle()
+    assert sched.seconds_until_next() == pytest.approx(0.1)
+
+    clock.advance(0.05)
+    assert sched.run_due() == 0             # idle ticks are not run …
+    clock.advance(0.05)
+    sched.run_due()
+    assert steps == [100000, 100100]
+    assert sched.stats.skipped == 0         # … nor counted as skipped
+    assert sched.stats.slept == 4
+
+
+def test_wake_steps_at_current_grid_tick(clock):
+    sched, steps = make(clock, next_wake=lambda: None)
+    sched.run_due()
+    sched.plan_idle()
+    assert sched.seconds_until_next() is None
+
+    clock.advance(1.013)
+    assert sched.current_ms() == 101000     # commands stamped on the grid
+    sched.wake()
+    assert sched.run_due() == 1
+    assert steps == [100000, 101000]
+    assert sched.stats.skipped == 0
@@ -0,0 +1,71 @@
+# tests/test_server/test_slog.py
+import io
+import time
+
+import pytest
+
+from shared import slog
+
+# -------------------------
+# Fixtures
+# -------------------------
+
+@pytest.fixture(autouse=True)
+def clean_slog():
+    saved = dict(slog._levels)
+    slog._ring.clear(); slog._pending.clear()
+    yield
+    slog.configure(saved, reset=True)
+    slog._ring.clear(); slog._pending.clear()
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_disabled_levels_are_the_shared_no_op():
+    slog.configure("t.off=warn")
+    log = slog.get_logger("t.off")
+    assert log.debug is slog._off and log.info is slog._off
+    log.debug("tick", n=1)
+    log.warn("slow", ms=12)
+    assert [(r[1], r[3], r[4]) for r in slog.recent()] == [(slog.WARN, "slow", {"ms": 12})]
+    assert not log.enabled(slog.INFO) and log.enabled(slog.ERROR)
+
+
+def test_levels_change_at_runtime_for_existing_loggers():
+    slog.configure("*=info")
+    a, b = slog.get_logger("t.a"), slog.get_logger("t.b")
+    assert a.debug is slog._off
+    slog.configure("t.a=debug,t.b=off")
+    a.debug("now_on"); b.error("muted")
+    assert [r[3] for r in slog.recent()] == ["now_on"]
+    assert slog.levels()["t.a"] == "DEBUG" and slog.levels()["t.b"] == "OFF"
+    with pytest.raises(ValueError):
+        slog.parse_levels("t.a=loud")
+
+
+def test_ring_keeps_history_after_the_flush_and_dumps_it():
+    log = slog.get_logger("t.ring")
+    log.info("joined", name="ann lee", color="WHITE")
+    out = io.StringIO()
+    assert slog.drain(out) == 1 and slog.drain(out) == 0
+    assert out.getvalue().endswith("INFO  t.ring joined name='ann lee' color=WHITE\n")
+    dumped = io.StringIO()
+    slog.dump(dumped)
+    assert dumped.getvalue() == out.getvalue()              # still in the ring
+
+
+def test_flusher_writes_off_thread_and_follows_the_level_file(tmp_path):
+    conf = tmp_path / "levels"
+    conf.write_text("t.fl=debug")
+    log = slog.get_logger("t.fl")
+    out = io.StringIO()
+    flusher = slog.Flusher(out, interval=0.01, watch=str(conf)).start()
+    try:
+        deadline = time.monotonic() + 2
+        while log.debug is slog._off and time.monotonic() < deadline:
+            time.sleep(0.01)
+        log.debug("step", n=3)
+    finally:
+        flusher.stop()
+    assert "DEBUG t.fl step n=3" in out.getvalue()
@@ -0,0 +1,73 @@
+# tests/test_server/test_tracing.py
+import asyncio
+import json
+
+import pytest
+
+from rooms import Room
+from tracing import TRACER, Tracer
+from tests.test_server.helpers import DummyGame, FakeSocket
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class DummyPiece:
+    piece_id, is_captured, current_state = "PW", True, None
+
+    def update(self, now): pass
+
+
+@pytest.fixture(autouse=True)
+def tracer_off():
+    yield
+    TRACER.stop()
+    TRACER.spans.clear()
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_ring_is_bounded_and_exports_named_lanes():
+    tr = Tracer(capacity=3)
+    tr.start()
+    t = tr.clock()
+    for name in ("a", "b", "c", "d"):
+        t = tr.span(name, t, "room:x" if name != "c" else "send:p")
+    events = tr.events()
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["b", "c", "d"]
+    assert spans[0]["ts"] == 0 and all(e["dur"] >= 0 for e in spans)
+    lanes = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert sorted(lanes.values()) == ["room:x", "send:p"]
+    assert spans[1]["cat"] == "send"
+
+
+def test_a_tick_records_nothing_until_tracing_is_on():
+    room = Room("r", DummyGame([DummyPiece()]))
+    room._step(16)
+    assert not TRACER.spans
+    TRACER.start()
+    room._awake.update(room.game.pieces)
+    room._step(32)
+    assert [s[0] for s in TRACER.spans] == ["update", "collisions", "settle", "win_check"]
+    assert {s[1] for s in TRACER.spans} == {"room:r"}
+    asyncio.run(room.stop())
+
+
+def test_broadcast_and_send_spans_land_in_their_lanes(tmp_path):
+    async def scenario():
+        room = Room("r", DummyGame())
+        ws = FakeSocket()
+        TRACER.start()
+        await room.add(ws)
+        room._broadcast_batch({"seq": 1, "key": False, "base": 0, "pieces": [], "ts": 0}, [])
+        await room.outboxes[ws].flush()
+        await room.stop()
+    asyncio.run(scenario())
+    out = tmp_path / "t.trace.json"
+    assert TRACER.write(out) == len(TRACER.spans)
+    spans = [(e["name"], e["cat"]) for e in json.loads(out.read_text())["traceEvents"]
+             if e["ph"] == "X"]
+    assert ("encode:json", "room") in spans
+    assert ("send:state", "send") in spans
@@ -0,0 +1,148 @@
+# tests/test_server/test_wire_codec.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from protocol import (SnapshotEncoder, binary_codec_for, decode_frame, encode_batch,
+                      encode_event, encode_frame, merge_state)
+from shared.message_schema import unbatch
+from shared.wire_codec import BinaryCodec, WireEncodeError
+from core.engine import events as ev
+
+# -------------------------
+# Dummies
+# -------------------------
+
+class DummyState:
+    def __init__(self, name, physics):
+        self.state_name = name
+        self.physics = physics
+        self.transitions = {}
+
+
+class DummyPiece:
+    def __init__(self, pid, cell):
+        self.piece_id = pid
+        self.is_captured = False
+        phys = SimpleNamespace(current_pixel_pos=(cell[1] * 64 + 32, cell[0] * 64 + 32))
+        phys.get_current_cell = lambda: cell
+        idle, move = DummyState("idle", phys), DummyState("move", phys)
+        idle.transitions["move"], move.transitions["done"] = move, idle
+        self.initial_state = self.current_state = idle
+
+    def slide(self, px):
+        self.current_state.physics.current_pixel_pos = px
+        self.current_state = self.current_state.transitions["move"]
+
+
+class DummyGame:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.board = SimpleNamespace(H_cells=8, W_cells=8)
+
+    def game_time_ms(self): return 1234
+
+
+@pytest.fixture
+def game():
+    return DummyGame([DummyPiece("PW_6_0", (6, 0)), DummyPiece("KB_0_4", (0, 4))])
+
+
+def via_json(tp, payload):
+    return json.loads(encode_frame(tp, payload))
+
+# -------------------------
+# Tests
+# -------------------------
+
+def test_codec_collects_ids_and_every_reachable_state(game):
+    codec = binary_codec_for(game)
+    assert codec.pieces == ["PW_6_0", "KB_0_4"]
+    assert codec.states == ["idle", "move"]
+    again = BinaryCodec.from_dictionary(codec.dictionary()["payload"])
+    assert (again.pieces, again.states) == (codec.pieces, codec.states)
+
+
+def test_state_frames_round_trip_like_json(game):
+    codec, enc = binary_codec_for(game), SnapshotEncoder()
+    key = enc.next_frame(game)
+    game.pieces[0].slide((40, 380))
+    delta = enc.next_frame(game)
+
+    for frame in (key, delta):
+        raw = encode_frame("state", frame, codec)
+        assert isinstance(raw, bytes)
+        assert len(raw) < len(encode_frame("state", frame))
+        assert decode_frame(raw, codec) == via_json("state", frame)
+
+
+def test_merged_delta_keeps_its_base(game):
+    codec, enc = binary_codec_for(game), SnapshotEncoder()
+    enc.next_frame(game)
+    game.pieces[0].slide((40, 380)); d2 = enc.next_frame(game)
+    game.pieces[1].slide((40, 100)); d3 = enc.next_frame(game)
+    merged = merge_state(d2, d3)
+
+    assert merged["base"] == 1 and len(merged["pieces"]) == 2
+    assert decode_frame(encode_frame("state", merged, codec), codec) == via_json("state", merged)
+
+
+@pytest.mark.parametrize("evt", [
+    ev.MovePlayed(time_ms=10, move="e2e4", color="WHITE"),
+    ev.PieceTaken(piece_id="KB_0_4", cell=(0, 4), by_color="WHITE", value=100),
+    ev.JumpPlayed(time_ms=20, color="BLACK"),
+    ev.ErrorPlayed(time_ms=30, reason="blocked", piece=None),
+    ev.GameStarted(white="ann", black="bob"),
+    ev.GameEnded(winner="WHITE"),
+    ev.StateChanged(piece_id="PW_6_0", new_state="move", timestamp=40),
+])
+def test_event_frames_round_trip_like_json(game, evt):
+    codec = binary_codec_for(game)
+    msg = encode_event(evt)
+    raw = encode_frame("event", msg, codec)
+    assert isinstance(raw, bytes)
+    assert decode_frame(raw, codec) == json.loads(encode_batch(None, [msg]))
+
+
+def test_unencodable_frame_falls_back_to_json(game):
+    codec = binary_codec_for(game)
+    frame = SnapshotEncoder().next_frame(game)
+    frame["pieces"][0]["state"] = "teleport"
+    with pytest.raises(WireEncodeError):
+        codec.encode_state(frame)
+    assert isinstance(encode_frame("state", frame, codec), str)
+
+
+def test_corrupt_binary_frame_raises_value_error(game):
+    codec = binary_codec_for(game)
+    raw = encode_frame("state", SnapshotEncoder().next_frame(game), codec)
+    with pytest.raises(ValueError):
+        decode_frame(raw[:-3], codec)
+    with pytest.raises(ValueError):
+        decode_frame(raw)
+
+
+def test_batch_frames_round_trip_like_json(game):
+    codec = binary_codec_for(game)
+    enc = SnapshotEncoder()
+    enc.next_frame(game)
+    game.pieces[0].slide((40, 300))
+    state = enc.next_frame(game)
+    events = [encode_event(ev.StateChanged(piece_id="PW_6_0", new_state="move", timestamp=40)),
+              encode_event(ev.MovePlayed(time_ms=40, move="a2a3", color="WHITE"))]
+    raw = encode_batch(state, events, codec)
+    assert isinstance(raw, bytes)
+    assert decode_frame(raw, codec) == json.loads(encode_batch(state, events))
+    parts = unbatch(decode_frame(raw, codec))
+    assert [m["type"] for m in parts] == ["state", "event", "event"]
+    assert [m["payload"]["payload"]["_event_type"] for m in parts[1:]] == ["StateChanged", "MovePlayed"]
+
+
+def test_lone_state_or_event_is_sent_as_a_plain_frame(game):
+    codec = binary_codec_for(game)
+    state = SnapshotEncoder().next_frame(game)
+    evt = encode_event(ev.GameEnded(winner="WHITE"))
+    assert encode_batch(state, [], codec) == encode_frame("state", state, codec)
+    assert encode_batch(None, [evt], codec) == encode_frame("event", evt, codec)
+    assert json.loads(encode_batch(None, [evt, evt]))["payload"]["state"] is None